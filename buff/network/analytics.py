@@ -0,0 +1,218 @@
+"""buff/network/analytics.py"""
+
+from typing import NamedTuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from buff.store import get_store
+from buff.store.base import UpsertResult, WorkStore
+
+from .graph import CitationGraph
+
+
+class GraphRanks(NamedTuple):
+    """
+    Ranks of the works of a citation graph, indexed by node ID.
+    Edges point from the cited work to the citing work, so the out-degree
+    of a work counts its citations in the graph and its in-degree its references.
+    """
+
+    pagerank: np.ndarray
+    hubs: np.ndarray
+    authorities: np.ndarray
+    in_degree: np.ndarray
+    out_degree: np.ndarray
+
+
+def adjacency(graph: CitationGraph, transpose: bool = False) -> sp.csr_matrix:
+    """
+    Build the sparse adjacency matrix of a graph from its CSR arrays,
+    without copying them into an edge list.
+
+    Args:
+        graph (CitationGraph): The graph
+        transpose (bool): Whether to build the transpose, from the backward CSR
+
+    Returns:
+        sp.csr_matrix: A[i, j] = 1 for each edge i -> j, or its transpose
+    """
+    n = len(graph)
+    indptr, indices = (
+        (graph.in_indptr, graph.in_indices)
+        if transpose
+        else (graph.out_indptr, graph.out_indices)
+    )
+    data = np.ones(len(indices), dtype=np.float64)
+    return sp.csr_matrix((data, indices, indptr), shape=(n, n))
+
+
+def pagerank(
+    graph: CitationGraph,
+    damping: float = 0.85,
+    personalization: np.ndarray | None = None,
+    tol: float = 1e-6,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    Compute the PageRank of the works of a citation graph by power iteration.
+    Each work passes its rank on to the works it cites, and works citing
+    nothing in the graph spread their rank like the random jumps.
+
+    Args:
+        graph (CitationGraph): The graph
+        damping (float): Probability of following a citation rather than jumping
+        personalization (np.ndarray | None): Weight of each work in the jumps.
+            Default: None (uniform).
+        tol (float): Convergence tolerance of the L1 change per work
+        max_iter (int): Maximum number of iterations
+
+    Returns:
+        np.ndarray: PageRank of each work, summing to 1
+    """
+    n = len(graph)
+    if n == 0:
+        return np.zeros(0)
+
+    if personalization is None:
+        jump = np.full(n, 1.0 / n)
+    else:
+        jump = np.asarray(personalization, dtype=np.float64)
+        if jump.sum() <= 0:
+            raise ValueError("Personalization must have a positive sum")
+        jump = jump / jump.sum()
+
+    # A[i, j] = 1 when j cites i, so A @ x moves rank from citing to cited works
+    matrix = adjacency(graph)
+    references = graph.in_degree()
+    dangling = references == 0
+    inverse = np.divide(1.0, references, out=np.zeros(n), where=~dangling)
+
+    rank = jump.copy()
+    for _ in range(max_iter):
+        previous = rank
+        rank = damping * (matrix @ (rank * inverse))
+        rank += (damping * previous[dangling].sum() + 1 - damping) * jump
+        if np.abs(rank - previous).sum() < n * tol:
+            break
+    return rank
+
+
+def personalized_pagerank(
+    graph: CitationGraph, seeds: list[str], damping: float = 0.85, **kwargs
+) -> np.ndarray:
+    """
+    Compute the PageRank of the works of a citation graph personalized on
+    seed works, which every random jump returns to.
+
+    Args:
+        graph (CitationGraph): The graph
+        seeds (list[str]): IDs of the seed works
+        damping (float): Probability of following a citation rather than jumping
+        **kwargs: Options of `pagerank`
+
+    Returns:
+        np.ndarray: Personalized PageRank of each work, summing to 1
+    """
+    nodes = [node for node in map(graph.index, seeds) if node is not None]
+    if not nodes:
+        raise ValueError("None of the seed works are in the graph")
+
+    personalization = np.zeros(len(graph))
+    personalization[nodes] = 1.0
+    return pagerank(graph, damping, personalization, **kwargs)
+
+
+def hits(
+    graph: CitationGraph, tol: float = 1e-8, max_iter: int = 100
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the HITS hub and authority scores of the works of a citation graph
+    by power iteration. Good hubs cite good authorities, e.g. surveys citing
+    the works that shaped a field.
+
+    Args:
+        graph (CitationGraph): The graph
+        tol (float): Convergence tolerance of the L1 change per work
+        max_iter (int): Maximum number of iterations
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Hub and authority scores, each summing to 1
+    """
+    n = len(graph)
+    if n == 0 or graph.num_edges == 0:
+        return np.zeros(n), np.zeros(n)
+
+    # cited[i, j] = 1 when j cites i, and citing is its transpose
+    cited, citing = adjacency(graph), adjacency(graph, transpose=True)
+
+    hubs = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        authorities = cited @ hubs
+        authorities /= authorities.sum()
+        previous, hubs = hubs, citing @ authorities
+        hubs /= hubs.sum()
+        if np.abs(hubs - previous).sum() < n * tol:
+            break
+
+    authorities = cited @ hubs
+    return hubs, authorities / authorities.sum()
+
+
+def rank_graph(graph: CitationGraph, seeds: list[str] | None = None) -> GraphRanks:
+    """
+    Rank the works of a citation graph.
+
+    Args:
+        graph (CitationGraph): The graph
+        seeds (list[str] | None): IDs of the works to personalize PageRank on.
+            Default: None (global PageRank).
+
+    Returns:
+        GraphRanks: PageRank, HITS and degrees of the works
+    """
+    if seeds:
+        rank = personalized_pagerank(graph, seeds)
+    else:
+        rank = pagerank(graph)
+    hubs, authorities = hits(graph)
+    return GraphRanks(
+        pagerank=rank,
+        hubs=hubs,
+        authorities=authorities,
+        in_degree=graph.in_degree(),
+        out_degree=graph.out_degree(),
+    )
+
+
+async def write_ranks(
+    graph: CitationGraph,
+    ranks: GraphRanks,
+    store: WorkStore | None = None,
+    batch_size: int = 10_000,
+) -> UpsertResult:
+    """
+    Save the ranks of the works to their stored documents under `_ranks`,
+    to weigh them in retrieval. Works that are not stored are skipped.
+
+    Args:
+        graph (CitationGraph): The graph
+        ranks (GraphRanks): Ranks of the works of the graph
+        store (WorkStore | None): Store of the works. Default: `get_store()`.
+        batch_size (int): Number of works per write
+
+    Returns:
+        UpsertResult: Number of works modified
+    """
+    store = store or get_store()
+    ids = graph.ids.tolist()
+    columns = {name: values.tolist() for name, values in ranks._asdict().items()}
+
+    result = UpsertResult()
+    for start in range(0, len(ids), batch_size):
+        values = {
+            ids[i]: {"_ranks": {name: column[i] for name, column in columns.items()}}
+            for i in range(start, min(start + batch_size, len(ids)))
+        }
+        result += await store.set_work_fields(values)
+    return result
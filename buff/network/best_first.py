@@ -0,0 +1,163 @@
+"""buff/network/best_first.py"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import NamedTuple
+
+from tqdm import tqdm
+
+from buff.openalex import Work
+from buff.openalex.client import request_count
+from buff.openalex.models import WorkObject
+
+from .crawl import Crawler, work_key
+from .scoring import CitationScorer, Scorer
+
+
+class CrawlBudget(NamedTuple):
+    """Global budget of a crawl. None leaves a limit unbounded."""
+
+    max_works: int | None = None
+    max_requests: int | None = None
+    max_seconds: float | None = None
+
+
+class BestFirstCrawler(Crawler):
+    """
+    Best-first crawler of the citation network around a work, within a budget.
+
+    Instead of expanding every work level by level, the crawl keeps the
+    frontier in a priority queue ordered by the score of each work and
+    expands the best `max_concurrency` works at a time, until the budget of
+    works expanded, API requests or wall time runs out. Works are scored when
+    they are first reached, with the fields the scorer needs fetched along
+    with the links, so scoring costs no extra requests.
+
+    The budget is checked between batches, so a crawl may exceed its request
+    or time budget by one batch.
+    """
+
+    def __init__(
+        self,
+        scorer: Scorer | None = None,
+        budget: CrawlBudget = CrawlBudget(max_works=100),
+        citations_limit: int = 10,
+        references_limit: int = 100,
+        max_concurrency: int = 20,
+        select: list[str] | None = Work.LEAN_FIELDS,
+    ) -> None:
+        """
+        Initialize the BestFirstCrawler object.
+
+        Args:
+            scorer (Scorer | None): Scorer of the works. Default: CitationScorer.
+            budget (CrawlBudget): Budget of the crawl
+            citations_limit (int): Maximum number of citations to follow per work.
+                0 skips the citations.
+            references_limit (int): Maximum number of references to follow per work.
+                0 skips the references.
+            max_concurrency (int): Maximum number of works expanded at once
+            select (list[str] | None): Fields to fetch of the linked works,
+                besides the fields of the scorer
+        """
+        scorer = scorer or CitationScorer()
+        if select is not None:
+            select = Work._select_fields([*select, *scorer.fields])
+
+        super().__init__(
+            citations_limit=citations_limit,
+            references_limit=references_limit,
+            max_concurrency=max_concurrency,
+            select=select,
+        )
+        self.scorer = scorer
+        self.budget = budget
+
+        # Scores of the works reached
+        self.scores: dict[str, float] = {}
+
+    async def crawl(self, entity_id: str, depth: int | None = None) -> tuple[set, set]:
+        """
+        Crawl the network around a work, best works first, until the budget
+        runs out or no work is left to expand.
+
+        Args:
+            entity_id (str): Entity ID or ID URL of the work
+            depth (int | None): Maximum number of links to follow from the work.
+                Default: None (unbounded).
+
+        Returns:
+            tuple[set, set]: Nodes (IDs of the linked works) and edges
+        """
+        started, start_requests = time.monotonic(), request_count()
+
+        root = work_key(entity_id)
+        await self.scorer.prepare(await self.fetch_work(root))
+        self.root = root
+        self.visited.add(root)
+
+        # Entries are (-score, depth, order reached, ID), so ties are broken by
+        # the shallower then the earlier reached work
+        order = itertools.count()
+        queue = [(-math.inf, 0, next(order), root)]
+
+        def remaining() -> int:
+            """Number of works the budget allows to expand next."""
+            budget = self.budget
+            if (
+                budget.max_requests is not None
+                and request_count() - start_requests >= budget.max_requests
+            ) or (
+                budget.max_seconds is not None
+                and time.monotonic() - started >= budget.max_seconds
+            ):
+                return 0
+            if budget.max_works is None:
+                return self.max_concurrency
+            return min(self.max_concurrency, budget.max_works - len(self.expanded))
+
+        with tqdm(
+            desc="Crawling", total=self.budget.max_works, dynamic_ncols=True
+        ) as pbar:
+            while queue and (n := remaining()) > 0:
+                batch = [heapq.heappop(queue) for _ in range(min(n, len(queue)))]
+                results = await asyncio.gather(
+                    *(self.fetch_linked_works(entry[3]) for entry in batch)
+                )
+
+                reached, works = [], {}
+                for (_, hops, _, work_id), links in zip(batch, results):
+                    citations, references, linked_works = links
+                    new = self.add_links(work_id, citations, references)
+                    self.expanded.add(work_id)
+                    works.update(linked_works)
+                    if depth is None or hops + 1 < depth:
+                        reached.extend((linked_id, hops + 1) for linked_id in new)
+                pbar.update(len(batch))
+
+                # Works that failed to load are scored last
+                scores = await self.scorer.score(
+                    [works[work_id] for work_id, _ in reached if work_id in works]
+                )
+                scored = iter(scores)
+                for work_id, hops in reached:
+                    score = next(scored) if work_id in works else -math.inf
+                    self.scores[work_id] = score
+                    heapq.heappush(queue, (-score, hops, next(order), work_id))
+
+        return self.nodes, self.edges
+
+    async def fetch_work(self, work_id: str) -> WorkObject:
+        """
+        Fetch the data of a work with the fields of the scorer.
+
+        Args:
+            work_id (str): Entity ID or ID URL of the work
+
+        Returns:
+            WorkObject: Work data
+        """
+        return await Work(work_id).get(select=self.select)
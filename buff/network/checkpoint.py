@@ -0,0 +1,137 @@
+"""buff/network/checkpoint.py"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+# Version of the checkpoint format, bumped on incompatible changes
+CHECKPOINT_FORMAT_VERSION = 1
+
+
+class CrawlCheckpoint:
+    """
+    On-disk checkpoint of a crawl, so an interrupted crawl can resume.
+
+    The checkpoint is a snapshot of the crawl state plus an append-only log of
+    the works expanded since. Each expanded work is appended to the log as one
+    JSON line, which is cheap, and once the log grows larger than the last
+    snapshot (and `min_log_bytes`) the crawler writes a new snapshot, which
+    truncates the log. Snapshots grow with the crawl, so they are written
+    less and less often, and writing them costs no more than the log overall.
+    Snapshots are written to a temporary file and renamed over the previous
+    one, so a crash leaves either the old or the new snapshot intact.
+
+    Replaying a log record must be idempotent: a crash between writing a
+    snapshot and truncating the log replays records the snapshot holds.
+    """
+
+    def __init__(
+        self, checkpoint_dir: Path | str, min_log_bytes: int = 1 << 20
+    ) -> None:
+        """
+        Initialize the CrawlCheckpoint object.
+
+        Args:
+            checkpoint_dir (Path | str): Directory of the checkpoint
+            min_log_bytes (int): Minimum size of the log before a snapshot is due
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.min_log_bytes = min_log_bytes
+
+        self.snapshot_fp = self.checkpoint_dir.joinpath("snapshot.json")
+        self.log_fp = self.checkpoint_dir.joinpath("log.jsonl")
+
+        self._log = None
+        self._log_bytes = 0
+        self._snapshot_bytes = 0
+
+    def exists(self) -> bool:
+        """Whether a snapshot was saved."""
+        return self.snapshot_fp.exists()
+
+    def load(self) -> tuple[dict | None, list[dict]]:
+        """
+        Load the last snapshot and the log records appended after it.
+        A record torn by a crash mid-write is dropped.
+
+        Returns:
+            tuple[dict | None, list[dict]]: Snapshot of the crawl state,
+                or None if there is none, and the log records in order
+        """
+        if not self.exists():
+            return None, []
+
+        with open(self.snapshot_fp, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != CHECKPOINT_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint format version: {snapshot.get('version')}"
+            )
+
+        records = []
+        if self.log_fp.exists():
+            with open(self.log_fp, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        return snapshot, records
+
+    def append(self, record: dict) -> bool:
+        """
+        Append a record to the log.
+
+        Args:
+            record (dict): Record of an expanded work
+
+        Returns:
+            bool: Whether a snapshot is due
+        """
+        if self._log is None:
+            self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            self._log = open(self.log_fp, "a", encoding="utf-8")
+            # A resumed crawl appends to the log of the previous run
+            self._log_bytes = self.log_fp.stat().st_size
+            if self.exists():
+                self._snapshot_bytes = self.snapshot_fp.stat().st_size
+
+        # Records are ASCII, so their length is their size in bytes
+        line = json.dumps(record) + "\n"
+        self._log.write(line)
+        self._log.flush()
+
+        self._log_bytes += len(line)
+        return self._log_bytes >= max(self.min_log_bytes, self._snapshot_bytes)
+
+    def snapshot(self, state: dict) -> None:
+        """
+        Save a snapshot of the crawl state and truncate the log.
+
+        Args:
+            state (dict): Crawl state, which the snapshot replaces
+        """
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        tmp_fp = self.snapshot_fp.with_suffix(".tmp")
+        with open(tmp_fp, "w", encoding="utf-8") as f:
+            json.dump({"version": CHECKPOINT_FORMAT_VERSION, **state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+            self._snapshot_bytes = f.tell()
+        os.replace(tmp_fp, self.snapshot_fp)
+
+        self.close()
+        open(self.log_fp, "w", encoding="utf-8").close()
+        self._log_bytes = 0
+
+    def close(self) -> None:
+        """Close the log file."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def clear(self) -> None:
+        """Delete the checkpoint."""
+        self.close()
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
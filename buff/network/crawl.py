@@ -0,0 +1,330 @@
+"""buff/network/crawl.py"""
+
+import asyncio
+
+from tqdm import tqdm
+
+from buff.openalex import Work
+from buff.openalex.models import WorkObject
+
+from .checkpoint import CrawlCheckpoint
+from .graph import CitationGraph
+
+
+def work_key(work_id: str) -> str:
+    """Get the ID URL of a work ID, e.g. "W123" or its URL, to deduplicate works."""
+    return work_id if work_id.startswith("https://") else Work.BASE_URL + work_id
+
+
+class Crawler:
+    """
+    Breadth-first crawler of the citation network around a work.
+
+    The crawl expands one level of the frontier at a time, fetching the
+    citations and references of up to `max_concurrency` works at once.
+    Works are expanded once, the first time they are reached, so each work
+    is fetched once however many works link to it.
+
+    Edges point from the cited work to the citing work:
+    `(work, citation)` and `(reference, work)`.
+
+    With a checkpoint, every expanded work is logged and the crawl state is
+    snapshotted when the log outgrows the last snapshot, at the end of each
+    level and when the crawl is interrupted, so `crawl(..., resume=True)`
+    continues where it stopped.
+    """
+
+    def __init__(
+        self,
+        citations_limit: int = 10,
+        references_limit: int = 100,
+        max_concurrency: int = 20,
+        select: list[str] | None = Work.LEAN_FIELDS,
+        checkpoint: CrawlCheckpoint | None = None,
+    ) -> None:
+        """
+        Initialize the Crawler object.
+
+        Args:
+            citations_limit (int): Maximum number of citations to follow per work.
+                0 skips the citations.
+            references_limit (int): Maximum number of references to follow per work.
+                0 skips the references.
+            max_concurrency (int): Maximum number of works expanded at once
+            select (list[str] | None): Fields to fetch of the linked works
+            checkpoint (CrawlCheckpoint | None): Checkpoint to save the crawl to
+        """
+        self.citations_limit = citations_limit
+        self.references_limit = references_limit
+        self.max_concurrency = max_concurrency
+        self.select = select
+        self.checkpoint = checkpoint
+
+        self.nodes: set[str] = set()
+        self.edges: set[tuple[str, str]] = set()
+        self.visited: set[str] = set()
+
+        # Progress of the crawl: the level being expanded, its works and those
+        # already expanded, and the works reached for the next level
+        self.root: str | None = None
+        self.level = 0
+        self.frontier: list[str] = []
+        self.expanded: set[str] = set()
+        self.next_frontier: list[str] = []
+
+    async def crawl(
+        self, entity_id: str, depth: int = 3, resume: bool = False
+    ) -> tuple[set, set]:
+        """
+        Crawl the network around a work, expanding the works up to `depth - 1`
+        links away so the edges reach `depth` links away.
+        The work is labelled by its ID URL, like the works linked to it.
+
+        Args:
+            entity_id (str): Entity ID or ID URL of the work
+            depth (int): Number of links to follow from the work
+            resume (bool): Whether to resume from the checkpoint, if one was saved
+
+        Returns:
+            tuple[set, set]: Nodes (IDs of the linked works) and edges
+        """
+        root = work_key(entity_id)
+        if not (resume and self.restore(root)):
+            if self.checkpoint is not None:
+                self.checkpoint.clear()
+            self.root = root
+            self.visited.add(root)
+            self.frontier = [root]
+
+        try:
+            with tqdm(desc="Crawling", dynamic_ncols=True) as pbar:
+                while self.level < depth and self.frontier:
+                    pending = [w for w in self.frontier if w not in self.expanded]
+                    pbar.total = (pbar.total or 0) + len(pending)
+                    await self.expand_level(pending, pbar)
+
+                    self.level += 1
+                    self.frontier, self.next_frontier = self.next_frontier, []
+                    self.expanded = set()
+                    self.save_checkpoint()
+        except BaseException:
+            # Save the works expanded so far, e.g. on Ctrl-C
+            self.save_checkpoint()
+            raise
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+
+        return self.nodes, self.edges
+
+    async def expand_level(
+        self, frontier: list[str], pbar: tqdm | None = None
+    ) -> list[str]:
+        """
+        Expand works of the current level of the frontier.
+        Each work is added to the network as soon as its links arrive.
+
+        Args:
+            frontier (list[str]): IDs of the works to expand
+            pbar (tqdm | None): Progress bar to update per work expanded
+
+        Returns:
+            list[str]: IDs of the works reached for the first time
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        reached = []
+
+        async def expand(work_id: str) -> None:
+            async with semaphore:
+                citations, references = await self.fetch_links(work_id)
+            reached.extend(self.expand_work(work_id, citations, references))
+            if self.checkpoint is not None:
+                record = {
+                    "level": self.level,
+                    "work": work_id,
+                    "citations": citations,
+                    "references": references,
+                }
+                if self.checkpoint.append(record):
+                    self.save_checkpoint()
+            if pbar is not None:
+                pbar.update(1)
+
+        # Unlike gather, a task group cancels the other works when one fails,
+        # so none of them changes the crawl after it is checkpointed
+        async with asyncio.TaskGroup() as group:
+            for work_id in frontier:
+                group.create_task(expand(work_id))
+        return reached
+
+    async def fetch_links(self, work_id: str) -> tuple[list[str], list[str]]:
+        """
+        Fetch the citations and references of a work, within the limits.
+
+        Args:
+            work_id (str): Entity ID or ID URL of the work
+
+        Returns:
+            tuple[list[str], list[str]]: ID URLs of the citations and references
+        """
+        citations, references, _ = await self.fetch_linked_works(work_id)
+        return citations, references
+
+    async def fetch_linked_works(
+        self, work_id: str
+    ) -> tuple[list[str], list[str], dict[str, WorkObject]]:
+        """
+        Fetch the citations and references of a work, within the limits,
+        with the data of the linked works.
+
+        Args:
+            work_id (str): Entity ID or ID URL of the work
+
+        Returns:
+            tuple[list[str], list[str], dict[str, WorkObject]]:
+                - ID URLs of the citations
+                - ID URLs of the references
+                - Dictionary of {id: WorkObject} of the linked works
+        """
+        work = Work(work_id)
+
+        async def fetch(
+            direction: str, limit: int
+        ) -> tuple[list[str], dict[str, WorkObject]]:
+            if limit <= 0:
+                return [], {}
+            try:
+                if direction == "citations":
+                    return await work.citations(limit, select=self.select)
+                return await work.references(limit, select=self.select)
+            except Exception as e:
+                print(f"Error fetching the {direction} of {work_id}: {e}")
+                return [], {}
+
+        (citations, citing), (references, cited) = await asyncio.gather(
+            fetch("citations", self.citations_limit),
+            fetch("references", self.references_limit),
+        )
+        return citations, references, {**citing, **cited}
+
+    def expand_work(
+        self, work_id: str, citations: list[str], references: list[str]
+    ) -> list[str]:
+        """
+        Add the links of a work of the current level and mark it expanded.
+
+        Args:
+            work_id (str): ID of the expanded work
+            citations (list[str]): ID URLs of its citations
+            references (list[str]): ID URLs of its references
+
+        Returns:
+            list[str]: IDs of the linked works not visited before
+        """
+        new = self.add_links(work_id, citations, references)
+        self.expanded.add(work_id)
+        self.next_frontier.extend(new)
+        return new
+
+    def add_links(
+        self, work_id: str, citations: list[str], references: list[str]
+    ) -> list[str]:
+        """
+        Add the links of an expanded work to the network.
+
+        Args:
+            work_id (str): ID of the expanded work
+            citations (list[str]): ID URLs of its citations
+            references (list[str]): ID URLs of its references
+
+        Returns:
+            list[str]: IDs of the linked works not visited before
+        """
+        new = []
+        for linked_id, edge in [
+            *((citation, (work_id, citation)) for citation in citations),
+            *((reference, (reference, work_id)) for reference in references),
+        ]:
+            self.nodes.add(linked_id)
+            self.edges.add(edge)
+            key = work_key(linked_id)
+            if key not in self.visited:
+                self.visited.add(key)
+                new.append(linked_id)
+        return new
+
+    def graph(self) -> CitationGraph:
+        """
+        Get the network crawled so far as a compact graph.
+
+        Returns:
+            CitationGraph: Graph of the nodes and edges
+        """
+        return CitationGraph.from_edges(self.edges, self.nodes)
+
+    def state(self) -> dict:
+        """
+        Get the state of the crawl, to checkpoint it.
+
+        Returns:
+            dict: JSON-serializable state of the crawl
+        """
+        return {
+            "root": self.root,
+            "level": self.level,
+            "frontier": self.frontier,
+            "expanded": sorted(self.expanded),
+            "next_frontier": self.next_frontier,
+            "visited": sorted(self.visited),
+            "nodes": sorted(self.nodes),
+            "edges": sorted(self.edges),
+        }
+
+    def save_checkpoint(self) -> None:
+        """Snapshot the state of the crawl, if it has a checkpoint."""
+        if self.checkpoint is not None:
+            self.checkpoint.snapshot(self.state())
+
+    def restore(self, root: str) -> bool:
+        """
+        Restore the crawl from its checkpoint: load the snapshot,
+        then replay the works expanded after it.
+
+        Args:
+            root (str): ID URL of the work the crawl is around
+
+        Returns:
+            bool: Whether a checkpoint was restored
+        """
+        if self.checkpoint is None:
+            return False
+        state, records = self.checkpoint.load()
+        if state is None:
+            return False
+        if state["root"] != root:
+            raise ValueError(
+                f"Checkpoint at {self.checkpoint.checkpoint_dir} "
+                f"is of a crawl around {state['root']}, not {root}"
+            )
+
+        self.root = root
+        self.level = state["level"]
+        self.frontier = state["frontier"]
+        self.expanded = set(state["expanded"])
+        self.next_frontier = state["next_frontier"]
+        self.visited = set(state["visited"])
+        self.nodes = set(state["nodes"])
+        self.edges = set(map(tuple, state["edges"]))
+
+        # Records the snapshot already holds are skipped
+        for record in records:
+            if record["level"] == self.level and record["work"] not in self.expanded:
+                self.expand_work(
+                    record["work"], record["citations"], record["references"]
+                )
+
+        print(
+            f"Resuming the crawl around {root} at depth {self.level + 1} "
+            f"with {len(self.visited)} works reached"
+        )
+        return True
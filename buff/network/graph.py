@@ -0,0 +1,327 @@
+"""buff/network/graph.py"""
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+
+# Version of the on-disk graph format, bumped on incompatible changes
+GRAPH_FORMAT_VERSION = 1
+
+GRAPH_ARRAYS = ["out_indptr", "out_indices", "in_indptr", "in_indices"]
+
+
+class StringTable:
+    """
+    Strings packed into one UTF-8 buffer, with the offset of each string.
+    Strings are decoded on access, so a memory-mapped table costs no memory
+    until it is read.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        """
+        Initialize the StringTable object. Use `from_strings` or `load` instead.
+
+        Args:
+            data (np.ndarray): UTF-8 bytes of all the strings, as uint8
+            offsets (np.ndarray): Start of each string in `data`, then the end
+        """
+        self.data = data
+        self.offsets = offsets
+
+        self._index: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.data[self.offsets[i] : self.offsets[i + 1]]).decode()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tolist())
+
+    @classmethod
+    def from_strings(cls, strings: list[str]) -> "StringTable":
+        """
+        Pack strings into a table.
+
+        Args:
+            strings (list[str]): Strings, in index order
+
+        Returns:
+            StringTable: Table of the strings
+        """
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def tolist(self) -> list[str]:
+        """
+        Decode all the strings.
+
+        Returns:
+            list[str]: Strings, in index order
+        """
+        text = bytes(self.data).decode()
+        if text.isascii():
+            # Byte offsets are character offsets
+            bounds = self.offsets.tolist()
+            return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+        return [self[i] for i in range(len(self))]
+
+    def index(self, s: str) -> int | None:
+        """
+        Get the index of a string. The lookup dict is built on first use.
+
+        Args:
+            s (str): String to find
+
+        Returns:
+            int | None: Index of the string, or None if it is not in the table
+        """
+        if self._index is None:
+            self._index = {value: i for i, value in enumerate(self.tolist())}
+        return self._index.get(s)
+
+
+class CitationGraph:
+    """
+    Compact directed graph of works, e.g. the citation network of a crawl.
+
+    Works are interned into int32 node IDs that index `ids`, the string table.
+    Edges are held twice in CSR form: the successors of node `i` are
+    `out_indices[out_indptr[i]:out_indptr[i + 1]]` and its predecessors
+    `in_indices[in_indptr[i]:in_indptr[i + 1]]`, both sorted.
+
+    Graphs are saved as a directory of `.npy` arrays and the packed string
+    table, which `load` memory-maps so large graphs open without being read
+    and share their pages across processes.
+    """
+
+    def __init__(
+        self,
+        ids: StringTable,
+        out_indptr: np.ndarray,
+        out_indices: np.ndarray,
+        in_indptr: np.ndarray,
+        in_indices: np.ndarray,
+    ) -> None:
+        """
+        Initialize the CitationGraph object. Use `from_edges` or `load` instead.
+
+        Args:
+            ids (StringTable): String table of the node IDs
+            out_indptr (np.ndarray): Offsets of the successors of each node
+            out_indices (np.ndarray): Successors of the nodes
+            in_indptr (np.ndarray): Offsets of the predecessors of each node
+            in_indices (np.ndarray): Predecessors of the nodes
+        """
+        self.ids = ids
+        self.out_indptr = out_indptr
+        self.out_indices = out_indices
+        self.in_indptr = in_indptr
+        self.in_indices = in_indices
+
+    def __len__(self) -> int:
+        return len(self.out_indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        """Number of edges of the graph"""
+        return len(self.out_indices)
+
+    @classmethod
+    def from_edges(
+        cls, edges: Iterable[tuple[str, str]], nodes: Iterable[str] = ()
+    ) -> "CitationGraph":
+        """
+        Build a graph from its edges, e.g. the nodes and edges of a crawl.
+        Duplicate edges are dropped.
+
+        Args:
+            edges (Iterable[tuple[str, str]]): (source, target) edges
+            nodes (Iterable[str]): Nodes to include even without edges
+
+        Returns:
+            CitationGraph: The graph
+        """
+        index: dict[str, int] = {}
+        for node in nodes:
+            index.setdefault(node, len(index))
+
+        src, dst = [], []
+        for source, target in edges:
+            src.append(index.setdefault(source, len(index)))
+            dst.append(index.setdefault(target, len(index)))
+
+        return cls.from_arrays(
+            StringTable.from_strings(list(index)),
+            np.array(src, dtype=np.int32),
+            np.array(dst, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls, ids: StringTable, src: np.ndarray, dst: np.ndarray
+    ) -> "CitationGraph":
+        """
+        Build a graph from arrays of interned edges.
+        Duplicate edges are dropped.
+
+        Args:
+            ids (StringTable): String table of the node IDs
+            src (np.ndarray): Source node of each edge
+            dst (np.ndarray): Target node of each edge
+
+        Returns:
+            CitationGraph: The graph
+        """
+        n = len(ids)
+
+        # Sort the edges by source then target, dropping duplicates
+        keys = np.unique(src.astype(np.int64) * n + dst)
+        src, dst = (keys // n).astype(np.int32), (keys % n).astype(np.int32)
+
+        out_indptr, out_indices = _csr(src, dst, n)
+        in_indptr, in_indices = _csr(dst, src, n)
+        return cls(ids, out_indptr, out_indices, in_indptr, in_indices)
+
+    def index(self, work_id: str) -> int | None:
+        """
+        Get the node ID of a work.
+
+        Args:
+            work_id (str): ID of the work
+
+        Returns:
+            int | None: Node ID, or None if the work is not in the graph
+        """
+        return self.ids.index(work_id)
+
+    def successors(self, node: int) -> np.ndarray:
+        """
+        Get the targets of the edges from a node.
+
+        Args:
+            node (int): Node ID
+
+        Returns:
+            np.ndarray: Node IDs of the successors
+        """
+        return self.out_indices[self.out_indptr[node] : self.out_indptr[node + 1]]
+
+    def predecessors(self, node: int) -> np.ndarray:
+        """
+        Get the sources of the edges to a node.
+
+        Args:
+            node (int): Node ID
+
+        Returns:
+            np.ndarray: Node IDs of the predecessors
+        """
+        return self.in_indices[self.in_indptr[node] : self.in_indptr[node + 1]]
+
+    def out_degree(self) -> np.ndarray:
+        """
+        Get the number of edges from each node.
+
+        Returns:
+            np.ndarray: Out-degree per node
+        """
+        return np.diff(self.out_indptr)
+
+    def in_degree(self) -> np.ndarray:
+        """
+        Get the number of edges to each node.
+
+        Returns:
+            np.ndarray: In-degree per node
+        """
+        return np.diff(self.in_indptr)
+
+    def edge_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the edges as arrays of node IDs, sorted by source then target.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Sources and targets of the edges
+        """
+        src = np.repeat(np.arange(len(self), dtype=np.int32), self.out_degree())
+        return src, np.asarray(self.out_indices)
+
+    def edges(self) -> Iterator[tuple[str, str]]:
+        """
+        Iterate over the edges as (source, target) work IDs.
+
+        Yields:
+            tuple[str, str]: Edge
+        """
+        ids = self.ids.tolist()
+        for source, target in zip(*(a.tolist() for a in self.edge_arrays())):
+            yield ids[source], ids[target]
+
+    def save(self, graph_dir: Path | str) -> None:
+        """
+        Save the graph to a directory, replacing any graph saved there.
+
+        Args:
+            graph_dir (Path | str): Directory of the graph
+        """
+        graph_dir = Path(graph_dir)
+        graph_dir.mkdir(parents=True, exist_ok=True)
+
+        for name in GRAPH_ARRAYS:
+            np.save(graph_dir.joinpath(f"{name}.npy"), getattr(self, name))
+        np.save(graph_dir.joinpath("ids_offsets.npy"), self.ids.offsets)
+        np.save(graph_dir.joinpath("ids_data.npy"), self.ids.data)
+
+        meta = {
+            "version": GRAPH_FORMAT_VERSION,
+            "nodes": len(self),
+            "edges": self.num_edges,
+        }
+        with open(graph_dir.joinpath("graph.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, graph_dir: Path | str, mmap: bool = True) -> "CitationGraph":
+        """
+        Load a graph saved with `save`.
+
+        Args:
+            graph_dir (Path | str): Directory of the graph
+            mmap (bool): Whether to memory-map the arrays read-only
+                rather than read them into memory
+
+        Returns:
+            CitationGraph: The graph
+        """
+        graph_dir = Path(graph_dir)
+        with open(graph_dir.joinpath("graph.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["version"] != GRAPH_FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph format version: {meta['version']}")
+
+        mmap_mode = "r" if mmap else None
+
+        def load_array(name: str) -> np.ndarray:
+            return np.load(graph_dir.joinpath(f"{name}.npy"), mmap_mode=mmap_mode)
+
+        ids = StringTable(load_array("ids_data"), load_array("ids_offsets"))
+        return cls(ids, *map(load_array, GRAPH_ARRAYS))
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build the CSR offsets and columns of edges sorted by source then target.
+    The sort by row is stable, so the columns of each row stay sorted both
+    when the rows are the sources and when they are the targets.
+    """
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
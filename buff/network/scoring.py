@@ -0,0 +1,195 @@
+"""buff/network/scoring.py"""
+
+import math
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from buff.openalex.abstract import get_abstracts
+from buff.openalex.models import WorkObject
+
+
+class Scorer(ABC):
+    """
+    Scores works by relevance, to prioritize the frontier of a best-first crawl.
+    Higher scores are expanded first.
+
+    Scorers list the fields they read in `fields`, so the crawl fetches them
+    with the linked works, and may look at the seed work of the crawl in
+    `prepare` before scoring.
+    """
+
+    # Fields of the works the scorer reads
+    fields: list[str] = []
+
+    async def prepare(self, seed: WorkObject) -> None:
+        """
+        Prepare to score the works of a crawl.
+
+        Args:
+            seed (WorkObject): Seed work of the crawl, with `fields`
+        """
+
+    @abstractmethod
+    async def score(self, works: list[WorkObject]) -> list[float]:
+        """
+        Score works.
+
+        Args:
+            works (list[WorkObject]): Works to score, with `fields`
+
+        Returns:
+            list[float]: Score of each work
+        """
+
+
+class CitationScorer(Scorer):
+    """Scores works by their log citation count"""
+
+    fields = ["cited_by_count"]
+
+    async def score(self, works: list[WorkObject]) -> list[float]:
+        return [math.log1p(work.cited_by_count or 0) for work in works]
+
+
+class RecencyScorer(Scorer):
+    """Scores works by recency, halving every `half_life` years"""
+
+    fields = ["publication_year"]
+
+    def __init__(self, half_life: float = 5.0) -> None:
+        """
+        Initialize the RecencyScorer object.
+
+        Args:
+            half_life (float): Number of years over which the score halves
+        """
+        self.half_life = half_life
+
+    async def score(self, works: list[WorkObject]) -> list[float]:
+        year = date.today().year
+        return [
+            (
+                0.0
+                if work.publication_year is None
+                else 0.5 ** (max(year - work.publication_year, 0) / self.half_life)
+            )
+            for work in works
+        ]
+
+
+class ConceptScorer(Scorer):
+    """
+    Scores works by the overlap of their concepts with the concepts of the
+    seed: the weighted Jaccard similarity of their concept scores.
+    """
+
+    fields = ["concepts"]
+
+    def __init__(self) -> None:
+        """Initialize the ConceptScorer object."""
+        self.seed_concepts: dict[str, float] = {}
+
+    @staticmethod
+    def _concepts(work: WorkObject) -> dict[str, float]:
+        """Get the {id: score} of the concepts of a work."""
+        return {
+            str(concept.id): concept.score or 0.0
+            for concept in work.concepts or []
+            if concept.id is not None
+        }
+
+    async def prepare(self, seed: WorkObject) -> None:
+        self.seed_concepts = self._concepts(seed)
+
+    async def score(self, works: list[WorkObject]) -> list[float]:
+        scores = []
+        for work in works:
+            concepts = self._concepts(work)
+            ids = self.seed_concepts.keys() | concepts.keys()
+            pairs = [
+                (self.seed_concepts.get(i, 0.0), concepts.get(i, 0.0)) for i in ids
+            ]
+            union = sum(max(a, b) for a, b in pairs)
+            scores.append(sum(min(a, b) for a, b in pairs) / union if union else 0.0)
+        return scores
+
+
+class EmbeddingScorer(Scorer):
+    """
+    Scores works by the cosine similarity of the embeddings of their title
+    and abstract to the embedding of the seed.
+    """
+
+    fields = ["title", "abstract_inverted_index"]
+
+    def __init__(
+        self, embed: Callable[[list[str]], Awaitable[list[list[float]]]] | None = None
+    ) -> None:
+        """
+        Initialize the EmbeddingScorer object.
+
+        Args:
+            embed (Callable | None): Async function embedding a list of texts.
+                Default: `buff.llm.embed.embed_texts`.
+        """
+        if embed is None:
+            # Imported here since the LLM clients need their API keys
+            from buff.llm.embed import embed_texts
+
+            embed = embed_texts
+        self.embed = embed
+        self.seed_embedding: np.ndarray | None = None
+
+    async def _embed(self, works: list[WorkObject]) -> np.ndarray:
+        """Embed the title and abstract of works, normalized to unit length."""
+        abstracts = get_abstracts(works)
+        texts = [
+            f"{work.title or ''}\n{abstracts[str(work.id)]}".strip() for work in works
+        ]
+        embeddings = np.asarray(await self.embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.where(norms > 0, norms, 1.0)
+
+    async def prepare(self, seed: WorkObject) -> None:
+        self.seed_embedding = (await self._embed([seed]))[0]
+
+    async def score(self, works: list[WorkObject]) -> list[float]:
+        if not works or self.seed_embedding is None:
+            return [0.0] * len(works)
+        return (await self._embed(works) @ self.seed_embedding).tolist()
+
+
+class WeightedScorer(Scorer):
+    """Scores works by the weighted sum of the scores of other scorers"""
+
+    def __init__(self, scorers: list[tuple[Scorer, float]]) -> None:
+        """
+        Initialize the WeightedScorer object.
+
+        Args:
+            scorers (list[tuple[Scorer, float]]): (scorer, weight) pairs
+        """
+        self.scorers = scorers
+        self.fields = sorted({f for scorer, _ in scorers for f in scorer.fields})
+
+    async def prepare(self, seed: WorkObject) -> None:
+        for scorer, _ in self.scorers:
+            await scorer.prepare(seed)
+
+    async def score(self, works: list[WorkObject]) -> list[float]:
+        total = np.zeros(len(works))
+        for scorer, weight in self.scorers:
+            total += weight * np.asarray(await scorer.score(works), dtype=float)
+        return total.tolist()
+
+
+# Scorers by name, e.g. for command-line options
+SCORERS: dict[str, type[Scorer]] = {
+    "citations": CitationScorer,
+    "recency": RecencyScorer,
+    "concepts": ConceptScorer,
+    "embedding": EmbeddingScorer,
+}
@@ -1,9 +1,15 @@
 """buff.openalex package"""
 
+from .client import close_client, openalex_client, start_client
 from .errors import OpenAlexError
+from .table import WorkTable
 from .work import Work
 
 __all__ = [
     "OpenAlexError",
     "Work",
+    "WorkTable",
+    "close_client",
+    "openalex_client",
+    "start_client",
 ]
@@ -0,0 +1,135 @@
+"""buff/openalex/abstract.py"""
+
+from collections import OrderedDict
+from itertools import chain
+from typing import Iterable
+
+import numpy as np
+
+from .models import InvertedIndex, WorkObject
+
+# Abstracts reconstructed before, keyed by work ID URL
+_abstract_cache: OrderedDict[str, str] = OrderedDict()
+ABSTRACT_CACHE_SIZE = 50_000
+
+
+def _terms(index: InvertedIndex | dict | None) -> dict[str, list[int]]:
+    """Get the {word: [positions]} terms of an inverted index."""
+    if isinstance(index, InvertedIndex):
+        index = index.terms
+    return index if isinstance(index, dict) else {}
+
+
+def reconstruct_abstract(index: InvertedIndex | dict | None) -> str:
+    """
+    Reconstruct the text of an abstract from its inverted index,
+    placing each word at its positions in a preallocated token array.
+
+    Args:
+        index (InvertedIndex | dict | None): Inverted index of the abstract,
+            as {word: [positions]}
+
+    Returns:
+        str: Abstract text, or "" if there is no index
+    """
+    terms = _terms(index)
+    size = max((max(p) for p in terms.values() if p), default=-1) + 1
+
+    tokens: list[str | None] = [None] * size
+    for word, positions in terms.items():
+        for position in positions:
+            tokens[position] = word
+    return " ".join(filter(None, tokens))
+
+
+def reconstruct_abstracts(indexes: Iterable[InvertedIndex | dict | None]) -> list[str]:
+    """
+    Reconstruct the text of many abstracts at once.
+    The tokens of all the abstracts are placed with one scatter into a single
+    preallocated array, where each abstract starts at its own offset.
+
+    Args:
+        indexes (Iterable[InvertedIndex | dict | None]): Inverted indexes
+
+    Returns:
+        list[str]: Abstract texts, "" for works without an index
+    """
+    all_terms = [_terms(index) for index in indexes]
+    if not all_terms:
+        return []
+
+    # Words and their positions, for every abstract in order
+    words = list(chain.from_iterable(terms.keys() for terms in all_terms))
+    word_positions = list(chain.from_iterable(terms.values() for terms in all_terms))
+    counts = np.fromiter(map(len, word_positions), dtype=np.int64, count=len(words))
+    positions = np.fromiter(
+        chain.from_iterable(word_positions), dtype=np.int64, count=int(counts.sum())
+    )
+
+    # Length of each abstract, from the highest position of its words
+    words_per_abstract = np.array([len(terms) for terms in all_terms])
+    abstract_of_position = np.repeat(
+        np.repeat(np.arange(len(all_terms)), words_per_abstract), counts
+    )
+    sizes = np.zeros(len(all_terms), dtype=np.int64)
+    np.maximum.at(sizes, abstract_of_position, positions + 1)
+    offsets = np.zeros(len(all_terms) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+
+    # Scatter the words into one array of all the tokens
+    slots = offsets[abstract_of_position] + positions
+    tokens = np.empty(offsets[-1], dtype=object)
+    tokens[slots] = np.array(words, dtype=object)[
+        np.repeat(np.arange(len(words)), counts)
+    ]
+
+    # Drop the positions no word was placed at, then split by abstract
+    placed = np.zeros(offsets[-1], dtype=bool)
+    placed[slots] = True
+    tokens = tokens[placed].tolist()
+    bounds = np.concatenate([[0], np.cumsum(placed)])[offsets].tolist()
+
+    return [" ".join(tokens[start:end]) for start, end in zip(bounds, bounds[1:])]
+
+
+def get_abstracts(works: Iterable[WorkObject]) -> dict[str, str]:
+    """
+    Get the abstracts of many works, reconstructing only the ones
+    not reconstructed before.
+
+    Args:
+        works (Iterable[WorkObject]): Works with their `abstract_inverted_index`
+
+    Returns:
+        dict[str, str]: {id: abstract} of the works, "" for works without one
+    """
+    abstracts, missing = {}, {}
+    for work in works:
+        work_id = str(work.id)
+        if work_id in _abstract_cache:
+            _abstract_cache.move_to_end(work_id)
+            abstracts[work_id] = _abstract_cache[work_id]
+        elif work.abstract_inverted_index is not None:
+            missing[work_id] = work.abstract_inverted_index
+        else:
+            abstracts[work_id] = ""
+
+    for work_id, abstract in zip(missing, reconstruct_abstracts(missing.values())):
+        abstracts[work_id] = _abstract_cache[work_id] = abstract
+    while len(_abstract_cache) > ABSTRACT_CACHE_SIZE:
+        _abstract_cache.popitem(last=False)
+
+    return abstracts
+
+
+def get_abstract(work: WorkObject) -> str:
+    """
+    Get the abstract of a work, reconstructed once and cached.
+
+    Args:
+        work (WorkObject): Work with its `abstract_inverted_index`
+
+    Returns:
+        str: Abstract text, or "" if the work has none
+    """
+    return get_abstracts([work])[str(work.id)]
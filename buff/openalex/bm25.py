@@ -0,0 +1,296 @@
+"""buff/openalex/bm25.py"""
+
+import asyncio
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from buff.store import get_store
+from buff.store.base import WorkStore
+from buff.store.local import MAX_PARAMS
+from config import DATA_DIR
+
+from .abstract import reconstruct_abstracts
+from .models import InvertedIndex
+
+BM25_INDEX_FP = DATA_DIR.joinpath("openalex_bm25.db")
+
+# Fields of the stored works that tell whether a work changed since it was indexed
+VERSION_FIELDS = ["id", "updated_date", "_partial"]
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Common English words that would only bloat the postings
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were which with we our their these those using into than".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split text into lowercase word tokens, without stopwords and single letters.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list[str]: Tokens, in order
+    """
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def _version(doc: dict) -> str:
+    """Get the version of a stored work, which changes whenever the work does."""
+    return json.dumps([doc.get("updated_date"), doc.get("_partial")])
+
+
+class BM25Index:
+    """
+    On-disk inverted index of the titles, abstracts and concept names of the
+    stored works, ranked with BM25.
+
+    Postings live in a SQLite table clustered by term, holding the term
+    frequency and length of each document, so a query reads one contiguous
+    range per term and scores the matches with NumPy.
+    Each indexed work records its version, so building again from the store
+    only re-indexes the works that are new or changed since.
+    """
+
+    def __init__(
+        self, db_fp: Path | str = BM25_INDEX_FP, k1: float = 1.2, b: float = 0.75
+    ) -> None:
+        """
+        Initialize the BM25Index object.
+
+        Args:
+            db_fp (Path | str): Path to the SQLite database, or ":memory:"
+            k1 (float): Term frequency saturation
+            b (float): Document length normalization
+        """
+        self.db_fp = db_fp
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_fp, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "doc INTEGER PRIMARY KEY, id TEXT UNIQUE, version TEXT, length INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT, doc INTEGER, tf INTEGER, length INTEGER, "
+            "PRIMARY KEY (term, doc)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)"
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._stats()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    async def build(
+        self, store: WorkStore | None = None, batch_size: int = 1000
+    ) -> int:
+        """
+        Index the works of the store that are new or changed since the last build.
+
+        Args:
+            store (WorkStore | None): Store of the works. Default: `get_store()`.
+            batch_size (int): Number of works per store lookup and index write
+
+        Returns:
+            int: Number of works indexed
+        """
+        store = store or get_store()
+        indexed = 0
+
+        async def flush(versions: dict[str, str]) -> int:
+            changed = await asyncio.to_thread(self._changed, versions)
+            if not changed:
+                return 0
+            return await self.add_documents(await store.get_works(changed))
+
+        versions = {}
+        async for doc in store.iter_works(VERSION_FIELDS, batch_size=batch_size):
+            versions[doc["id"]] = _version(doc)
+            if len(versions) >= batch_size:
+                indexed += await flush(versions)
+                versions = {}
+        if versions:
+            indexed += await flush(versions)
+
+        return indexed
+
+    async def add_documents(self, docs: list[dict]) -> int:
+        """
+        Index stored work documents, replacing their previous postings.
+
+        Args:
+            docs (list[dict]): Work documents shaped like `WorkObject` JSON
+
+        Returns:
+            int: Number of works indexed
+        """
+        if not docs:
+            return 0
+        return await asyncio.to_thread(self._add, docs)
+
+    async def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """
+        Search the indexed works.
+
+        Args:
+            query (str): Search query
+            k (int): Maximum number of works to return
+
+        Returns:
+            list[tuple[str, float]]: (ID URL, BM25 score) of the best matching
+                works, in descending order of score
+        """
+        return await asyncio.to_thread(self._search, query, k)
+
+    @staticmethod
+    def _texts(docs: list[dict]) -> list[str]:
+        """Get the title, abstract and concept names of the works as text."""
+        indexes = [
+            (
+                InvertedIndex.model_validate(doc["abstract_inverted_index"])
+                if doc.get("abstract_inverted_index")
+                else None
+            )
+            for doc in docs
+        ]
+        texts = []
+        for doc, abstract in zip(docs, reconstruct_abstracts(indexes)):
+            concepts = [c.get("display_name") or "" for c in doc.get("concepts") or []]
+            title = doc.get("title") or doc.get("display_name") or ""
+            texts.append(" ".join([title, abstract, *concepts]))
+        return texts
+
+    def _stats(self) -> tuple[int, int]:
+        """Get the number of documents and their total length."""
+        with self._lock:
+            stats = dict(self._conn.execute("SELECT name, value FROM stats"))
+        return stats.get("docs", 0), stats.get("length", 0)
+
+    def _select_in(self, sql: str, values: list) -> dict:
+        """Run a two-column `IN ({})` query over the values, in batches."""
+        rows = {}
+        with self._lock:
+            for i in range(0, len(values), MAX_PARAMS):
+                batch = values[i : i + MAX_PARAMS]
+                rows.update(
+                    self._conn.execute(sql.format(",".join("?" * len(batch))), batch)
+                )
+        return rows
+
+    def _changed(self, versions: dict[str, str]) -> list[str]:
+        """Get the IDs whose version differs from the indexed version."""
+        ids = list(versions)
+        indexed = self._select_in("SELECT id, version FROM docs WHERE id IN ({})", ids)
+        return [i for i in ids if indexed.get(i) != versions[i]]
+
+    def _add(self, docs: list[dict]) -> int:
+        """Replace the postings of the documents."""
+        texts = self._texts(docs)
+        with self._lock, self._conn:
+            added_docs = added_length = 0
+            for doc, text in zip(docs, texts):
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+
+                row = self._conn.execute(
+                    "SELECT doc, length FROM docs WHERE id = ?", (doc["id"],)
+                ).fetchone()
+                if row is None:
+                    rowid = self._conn.execute(
+                        "INSERT INTO docs (id, version, length) VALUES (?, ?, ?)",
+                        (doc["id"], _version(doc), length),
+                    ).lastrowid
+                    added_docs += 1
+                    added_length += length
+                else:
+                    rowid, previous_length = row
+                    self._conn.execute("DELETE FROM postings WHERE doc = ?", (rowid,))
+                    self._conn.execute(
+                        "UPDATE docs SET version = ?, length = ? WHERE doc = ?",
+                        (_version(doc), length, rowid),
+                    )
+                    added_length += length - previous_length
+
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                    [(term, rowid, tf, length) for term, tf in counts.items()],
+                )
+
+            self._conn.executemany(
+                "INSERT INTO stats VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                [("docs", added_docs), ("length", added_length)],
+            )
+        return len(docs)
+
+    def _search(self, query: str, k: int) -> list[tuple[str, float]]:
+        """Score the documents matching any query term and rank the top k."""
+        n, total_length = self._stats()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not n or not terms or k <= 0:
+            return []
+        avg_length = total_length / n or 1.0
+
+        docs, weights = [], []
+        with self._lock:
+            for term in terms:
+                postings = np.array(
+                    self._conn.execute(
+                        "SELECT doc, tf, length FROM postings WHERE term = ?", (term,)
+                    ).fetchall(),
+                    dtype=np.int64,
+                ).reshape(-1, 3)
+                if not len(postings):
+                    continue
+
+                df = len(postings)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                tf, length = postings[:, 1], postings[:, 2]
+                norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                docs.append(postings[:, 0])
+                weights.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not docs:
+            return []
+
+        # Sum the weights of each document over the query terms
+        unique, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+
+        # Select the top k scores in linear time, then sort only those
+        top = np.arange(len(scores))
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((unique[top], -scores[top]))]
+
+        rowids = unique[top].tolist()
+        ids = self._select_in("SELECT doc, id FROM docs WHERE doc IN ({})", rowids)
+        return [(ids[rowid], float(scores[i])) for rowid, i in zip(rowids, top)]
@@ -0,0 +1,333 @@
+"""buff/openalex/cache.py"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+from config import DATA_DIR
+
+from .models import WorkObject
+
+SEARCH_CACHE_DB_FP = DATA_DIR.joinpath("openalex_search.db")
+
+
+def covers(partial: list[str] | None, select: list[str] | None) -> bool:
+    """
+    Check whether a work fetched with the `partial` fields can serve
+    a request for the `select` fields.
+
+    Args:
+        partial (list[str] | None): Fields the work is limited to,
+            or None if the work is complete
+        select (list[str] | None): Fields requested, or None for all fields
+
+    Returns:
+        bool: True if the work has all the requested fields
+    """
+    if partial is None:
+        return True
+    return select is not None and set(select).issubset(partial)
+
+
+class CachedWork(NamedTuple):
+    """Work held by the WorkCache"""
+
+    work: WorkObject
+    partial: list[str] | None
+    expires: float
+
+
+class WorkCache:
+    """
+    In-process LRU cache of WorkObjects keyed by work ID URL, with a TTL.
+
+    Sits in front of the works store so repeated lookups of the same works
+    skip both the database round-trip and the model validation.
+    """
+
+    def __init__(
+        self, maxsize: int = 10_000, ttl: float | None = 3600, enabled: bool = True
+    ) -> None:
+        """
+        Initialize the WorkCache object.
+
+        Args:
+            maxsize (int): Maximum number of works to hold
+            ttl (float | None): Seconds a work stays valid. None disables expiry.
+            enabled (bool): Whether the cache is used
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._works: OrderedDict[str, CachedWork] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._works)
+
+    def __contains__(self, work_id: str) -> bool:
+        return self._lookup(work_id) is not None
+
+    def get(self, work_id: str, select: list[str] | None = None) -> CachedWork | None:
+        """
+        Get a work from the cache.
+
+        Args:
+            work_id (str): ID URL of the work
+            select (list[str] | None): Fields requested, or None for all fields
+
+        Returns:
+            CachedWork | None: Cached work, or None if it is missing, expired
+                or lacks some of the requested fields
+        """
+        if not self.enabled:
+            return None
+
+        cached = self._lookup(work_id)
+        if cached is None or not covers(cached.partial, select):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._works.move_to_end(work_id)
+        return cached
+
+    def put(self, work: WorkObject, partial: list[str] | None = None) -> None:
+        """
+        Add a work to the cache, evicting the least recently used works if full.
+        A partial work does not replace a complete one.
+
+        Args:
+            work (WorkObject): Work to cache
+            partial (list[str] | None): Fields the work is limited to,
+                or None if the work is complete
+        """
+        if not self.enabled or self.maxsize <= 0 or work.id is None:
+            return
+
+        work_id = str(work.id)
+        cached = self._lookup(work_id)
+        if partial is not None and cached is not None and cached.partial is None:
+            self._works.move_to_end(work_id)
+            return
+
+        expires = float("inf") if self.ttl is None else time.monotonic() + self.ttl
+        self._works[work_id] = CachedWork(work, partial, expires)
+        self._works.move_to_end(work_id)
+
+        while len(self._works) > self.maxsize:
+            self._works.popitem(last=False)
+
+    def put_many(
+        self, works: Iterable[WorkObject], partial: list[str] | None = None
+    ) -> None:
+        """
+        Add many works to the cache.
+
+        Args:
+            works (Iterable[WorkObject]): Works to cache
+            partial (list[str] | None): Fields the works are limited to,
+                or None if the works are complete
+        """
+        for work in works:
+            self.put(work, partial)
+
+    def pop(self, work_id: str) -> None:
+        """
+        Remove a work from the cache.
+
+        Args:
+            work_id (str): ID URL of the work
+        """
+        self._works.pop(work_id, None)
+
+    def clear(self) -> None:
+        """Remove all works from the cache and reset the counters."""
+        self._works.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get the cache statistics.
+
+        Returns:
+            dict[str, int | float]: Size, hits, misses and hit rate of the cache
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._works),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _lookup(self, work_id: str) -> CachedWork | None:
+        """Get a work without counting the lookup, dropping it if expired."""
+        cached = self._works.get(work_id)
+        if cached is not None and cached.expires <= time.monotonic():
+            del self._works[work_id]
+            return None
+        return cached
+
+
+# Shared cache of works for the process
+work_cache = WorkCache()
+
+
+class SearchCache:
+    """
+    Persistent cache of OpenAlex query results, with a TTL.
+
+    Each page of results is stored as JSON in a SQLite database under a key
+    built from the normalized request, so repeated searches are served
+    without an API request, across runs and processes.
+    """
+
+    def __init__(
+        self,
+        ttl: float | None = 86400,
+        db_fp: Path | str = SEARCH_CACHE_DB_FP,
+        enabled: bool = True,
+    ) -> None:
+        """
+        Initialize the SearchCache object.
+
+        Args:
+            ttl (float | None): Seconds a page stays valid. None disables expiry.
+            db_fp (Path | str): Path to the SQLite database
+            enabled (bool): Whether the cache is used
+        """
+        self.ttl = ttl
+        self.db_fp = db_fp
+        self.enabled = enabled
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._initialized = False
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """
+        Build the key of a request from its normalized parameters.
+
+        Args:
+            **request (Any): JSON serializable request parameters
+
+        Returns:
+            str: Hash of the request
+        """
+        return hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    async def get(self, key: str) -> dict | None:
+        """
+        Get a page of results from the cache.
+
+        Args:
+            key (str): Key of the request
+
+        Returns:
+            dict | None: Cached response, or None if it is missing or expired
+        """
+        if not self.enabled:
+            return None
+
+        data = await asyncio.to_thread(self._get, key)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return data
+
+    async def put(self, key: str, data: dict) -> None:
+        """
+        Add a page of results to the cache, replacing any previous one.
+
+        Args:
+            key (str): Key of the request
+            data (dict): Response to cache
+        """
+        if self.enabled:
+            await asyncio.to_thread(self._put, key, data)
+
+    async def clear(self, expired_only: bool = False) -> None:
+        """
+        Remove the cached pages and reset the counters.
+
+        Args:
+            expired_only (bool): Whether to only remove the expired pages
+        """
+        await asyncio.to_thread(self._clear, expired_only)
+        if not expired_only:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get the cache statistics of this process.
+
+        Returns:
+            dict[str, int | float]: Hits, misses and hit rate of the cache
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connect to the database, creating its table if necessary."""
+        conn = sqlite3.connect(self.db_fp, timeout=30, isolation_level=None)
+        if not self._initialized:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "key TEXT PRIMARY KEY, data TEXT, created REAL)"
+            )
+            self._initialized = True
+        return conn
+
+    def _expired_before(self) -> float:
+        """Get the creation time before which the pages are expired."""
+        return float("-inf") if self.ttl is None else time.time() - self.ttl
+
+    def _get(self, key: str) -> dict | None:
+        """Get a page that has not expired."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT data FROM pages WHERE key = ? AND created > ?",
+                (key, self._expired_before()),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _put(self, key: str, data: dict) -> None:
+        """Save a page."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                (key, json.dumps(data), time.time()),
+            )
+
+    def _clear(self, expired_only: bool) -> None:
+        """Delete the pages, or only the expired ones."""
+        with closing(self._connect()) as conn:
+            if expired_only:
+                conn.execute(
+                    "DELETE FROM pages WHERE created <= ?", (self._expired_before(),)
+                )
+            else:
+                conn.execute("DELETE FROM pages")
+
+
+# Shared cache of OpenAlex search results
+search_cache = SearchCache()
@@ -0,0 +1,209 @@
+"""buff/openalex/client.py"""
+
+import asyncio
+import importlib.util
+import weakref
+from contextlib import asynccontextmanager
+from json import JSONDecodeError
+from typing import AsyncIterator
+
+import httpx
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
+from config import EMAIL
+
+from .errors import OpenAlexError, QuotaExceeded, RateLimited
+from .ratelimit import limiter
+from .utils import parse_retry_after
+
+# Connection pool limits shared by every OpenAlex request
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+DEFAULT_TIMEOUT = httpx.Timeout(timeout=30.0, connect=10.0)
+
+# HTTP/2 requires the optional `h2` package (`httpx[http2]`)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+# Start locks of each event loop, since asyncio locks are bound to their loop
+_client_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+# Number of OpenAlex API requests sent by this process, retries included
+_request_count = 0
+
+
+async def start_client(
+    limits: httpx.Limits | None = None,
+    timeout: httpx.Timeout | None = None,
+    http2: bool | None = None,
+) -> httpx.AsyncClient:
+    """
+    Start the shared OpenAlex HTTP client.
+    Any previously started client is closed first.
+
+    Args:
+        limits (httpx.Limits | None): Connection pool limits.
+            Default: DEFAULT_LIMITS.
+        timeout (httpx.Timeout | None): Request timeouts.
+            Default: DEFAULT_TIMEOUT.
+        http2 (bool | None): Whether to use HTTP/2.
+            Default: enabled if `h2` is installed.
+
+    Returns:
+        httpx.AsyncClient: The shared client
+    """
+    async with _client_lock():
+        return await _start_client(limits, timeout, http2)
+
+
+async def _start_client(
+    limits: httpx.Limits | None, timeout: httpx.Timeout | None, http2: bool | None
+) -> httpx.AsyncClient:
+    """Start the shared client. The caller holds the start lock of the loop."""
+    global _client, _client_loop
+
+    await close_client()
+
+    if http2 is None:
+        http2 = HTTP2_AVAILABLE
+
+    _client = httpx.AsyncClient(
+        limits=limits or DEFAULT_LIMITS,
+        timeout=timeout or DEFAULT_TIMEOUT,
+        http2=http2,
+        params={"email": EMAIL},
+        follow_redirects=True,
+    )
+    _client_loop = asyncio.get_running_loop()
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared OpenAlex HTTP client and release its connections."""
+    global _client, _client_loop
+
+    client, loop = _client, _client_loop
+    _client, _client_loop = None, None
+
+    # A client bound to a closed or different event loop cannot be awaited here
+    if client is not None and loop is asyncio.get_running_loop():
+        await client.aclose()
+
+
+async def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared OpenAlex HTTP client.
+    The client is started lazily and restarted if the event loop has changed,
+    e.g. when a script calls `asyncio.run` more than once.
+
+    Returns:
+        httpx.AsyncClient: The shared client
+    """
+    if _client_is_usable():
+        return _client
+
+    # Concurrent callers wait for one client to start, instead of each
+    # starting and closing their own
+    async with _client_lock():
+        if not _client_is_usable():
+            await _start_client(None, None, None)
+        return _client
+
+
+def _client_is_usable() -> bool:
+    """Whether the shared client is open and bound to the running event loop."""
+    return (
+        _client is not None
+        and not _client.is_closed
+        and _client_loop is asyncio.get_running_loop()
+    )
+
+
+def _client_lock() -> asyncio.Lock:
+    """Get the start lock of the running event loop."""
+    return _client_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+
+
+@asynccontextmanager
+async def openalex_client(
+    limits: httpx.Limits | None = None,
+    timeout: httpx.Timeout | None = None,
+    http2: bool | None = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Context manager that starts the shared OpenAlex HTTP client
+    and closes it on exit.
+
+    Args:
+        limits (httpx.Limits | None): Connection pool limits.
+        timeout (httpx.Timeout | None): Request timeouts.
+        http2 (bool | None): Whether to use HTTP/2.
+
+    Yields:
+        httpx.AsyncClient: The shared client
+    """
+    client = await start_client(limits=limits, timeout=timeout, http2=http2)
+    try:
+        yield client
+    finally:
+        await close_client()
+
+
+def request_count() -> int:
+    """
+    Get the number of OpenAlex API requests sent by this process so far.
+    Requests served by the store or the caches are not counted.
+
+    Returns:
+        int: Number of requests, retries included
+    """
+    return _request_count
+
+
+@retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=1, min=2, max=10),
+    retry=(
+        retry_if_exception_type(JSONDecodeError)
+        | retry_if_exception_type(httpx.ConnectTimeout)
+        | retry_if_exception_type(OpenAlexError)
+    )
+    & retry_if_not_exception_type(QuotaExceeded),
+)
+async def get_json(url: str) -> dict:
+    """
+    GET request to the OpenAlex API with the shared client,
+    rate limited and retried on errors.
+
+    Args:
+        url (str): URL to the OpenAlex API endpoint
+
+    Returns:
+        dict: Response object from the OpenAlex API
+    """
+    global _request_count
+
+    client = await get_client()
+    async with limiter:
+        _request_count += 1
+        response = await client.get(url)
+        if response.status_code == 200:
+            return response.json()
+        elif response.status_code == 429:
+            # Slow down every process sharing the limiter
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            await limiter.penalize(retry_after)
+            raise RateLimited(url, retry_after)
+        else:
+            raise OpenAlexError(f"Error {response.status_code}: GET {url}")
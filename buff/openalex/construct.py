@@ -0,0 +1,107 @@
+"""buff/openalex/construct.py"""
+
+import hashlib
+import json
+import types
+from functools import lru_cache
+from typing import Annotated, Any, Union, get_args, get_origin
+
+from pydantic import BaseModel, Field, HttpUrl, create_model
+
+from .models import WorkObject
+
+
+@lru_cache(maxsize=None)
+def get_model_version() -> str:
+    """
+    Get the version of the WorkObject schema that stored documents are tagged with.
+    Derived from the JSON schema so any change to the models invalidates
+    the documents validated against the previous models.
+
+    Returns:
+        str: Hash of the WorkObject JSON schema
+    """
+    schema = WorkObject.model_json_schema()
+    return hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def _trusted_annotation(annotation: Any) -> Any:
+    """
+    Get the annotation that accepts the same JSON without re-checking it:
+    URLs and pattern-constrained strings become plain strings and nested
+    models become their trusted models.
+
+    Args:
+        annotation (Any): Type annotation of a model field
+
+    Returns:
+        Any: Trusted type annotation
+    """
+    origin = get_origin(annotation)
+
+    if origin is Annotated:
+        return _trusted_annotation(get_args(annotation)[0])
+    if origin in (Union, types.UnionType):
+        args = dict.fromkeys(_trusted_annotation(arg) for arg in get_args(annotation))
+        return Union[tuple(args)]
+    if origin is list:
+        return list[_trusted_annotation(get_args(annotation)[0])]
+    if origin is dict:
+        key, value = get_args(annotation)
+        return dict[_trusted_annotation(key), _trusted_annotation(value)]
+
+    if annotation is HttpUrl:
+        return str
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return trusted_model(annotation)
+    return annotation
+
+
+@lru_cache(maxsize=None)
+def trusted_model(model: type[BaseModel]) -> type[BaseModel]:
+    """
+    Get the trusted subclass of a model, built once per model.
+    It has the same fields as the model but skips the regex and URL checks,
+    so data validated before loads at a fraction of the cost.
+    Its URL fields hold strings, which dump to the same JSON as the URLs.
+
+    Args:
+        model (type[BaseModel]): Model to derive
+
+    Returns:
+        type[BaseModel]: Trusted subclass of the model
+    """
+    fields = {}
+    for name, field in model.model_fields.items():
+        annotation = _trusted_annotation(field.annotation)
+        if annotation == field.annotation:
+            continue
+        if field.default_factory is not None:
+            fields[name] = (annotation, Field(default_factory=field.default_factory))
+        else:
+            fields[name] = (annotation, field.default)
+
+    return create_model(
+        f"Trusted{model.__name__}",
+        __base__=model,
+        __doc__=model.__doc__,
+        **fields,
+    )
+
+
+def load_work(data: dict) -> WorkObject:
+    """
+    Load a WorkObject from a stored work document.
+    Documents tagged with the current model version are trusted and loaded
+    as a `trusted_model(WorkObject)`, skipping the regex and URL checks.
+    Older or untagged documents are validated.
+
+    Args:
+        data (dict): Stored work document
+
+    Returns:
+        WorkObject: The work
+    """
+    if data.get("_model_version") == get_model_version():
+        return trusted_model(WorkObject)(**data)
+    return WorkObject(**data)
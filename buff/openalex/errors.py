@@ -11,3 +11,20 @@ class InvalidEntityID(OpenAlexError):
     def __init__(self, entity_id: str):
         self.entity_id = entity_id
         super().__init__(f"Invalid OpenAlex Entity ID: {entity_id}")
+
+
+class RateLimited(OpenAlexError):
+    """OpenAlex API responded with 429 Too Many Requests"""
+
+    def __init__(self, url: str, retry_after: float | None = None):
+        self.url = url
+        self.retry_after = retry_after
+        super().__init__(f"Rate limited: GET {url} (Retry-After: {retry_after})")
+
+
+class QuotaExceeded(OpenAlexError):
+    """OpenAlex daily request quota exceeded"""
+
+    def __init__(self, quota: int):
+        self.quota = quota
+        super().__init__(f"OpenAlex daily quota of {quota} requests exceeded")
@@ -1,9 +1,9 @@
 """buff/openalex/models.py"""
 
 from datetime import date, datetime
-from typing import Annotated, Optional, Union
+from typing import Annotated, Any, Optional, Union
 
-from pydantic import BaseModel, HttpUrl, StringConstraints
+from pydantic import BaseModel, HttpUrl, StringConstraints, model_validator
 
 # fmt: off
 WorkID = Annotated[str, StringConstraints(pattern=r'^https://openalex\.org/W\d{4,10}$')]
@@ -34,6 +34,16 @@ class InvertedIndex(BaseModel):
 
     terms: Optional[dict[str, list[int]] | list[int]] = None
 
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_terms(cls, data: Any) -> Any:
+        """Wrap the {word: [positions]} index returned by the API under `terms`"""
+        if isinstance(data, dict) and not (
+            set(data) == {"terms"} and not isinstance(data["terms"], list)
+        ):
+            return {"terms": data}
+        return data
+
 
 class Author(BaseModel):
     """Author of a paper"""
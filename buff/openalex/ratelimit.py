@@ -0,0 +1,261 @@
+"""buff/openalex/ratelimit.py"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config import DATA_DIR
+
+from .errors import QuotaExceeded
+
+RATELIMIT_DB_FP = DATA_DIR.joinpath("openalex_ratelimit.db")
+
+# OpenAlex allows 100,000 requests per day, reset at midnight UTC
+DAILY_QUOTA = 100_000
+
+
+class RateLimiter:
+    """
+    Adaptive token bucket rate limiter shared across processes.
+
+    The bucket state lives in a SQLite database, so every process on the host
+    that uses the same database draws from one request budget.
+    The rate is halved whenever the API responds with 429 and recovers linearly
+    back to the maximum rate afterwards.
+    Requests are counted against the OpenAlex daily quota.
+
+    Each process keeps one connection to the database. Waiters within a
+    process queue on a lock, so only the first of them polls the bucket.
+
+    Usage:
+        limiter = RateLimiter(max_rate=10, time_period=1)
+        async with limiter:
+            ...
+    """
+
+    def __init__(
+        self,
+        max_rate: float = 10,
+        time_period: float = 1,
+        daily_quota: int | None = DAILY_QUOTA,
+        recovery_time: float = 60,
+        db_fp: Path = RATELIMIT_DB_FP,
+        name: str = "openalex",
+    ) -> None:
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_rate (float): Maximum number of requests per time period
+            time_period (float): Time period in seconds
+            daily_quota (int | None): Maximum number of requests per UTC day.
+                None disables the quota.
+            recovery_time (float): Seconds to recover from the minimum rate
+                back to the maximum rate after a 429
+            db_fp (Path): Path to the SQLite database shared by the processes
+            name (str): Name of the bucket within the database
+        """
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self.daily_quota = daily_quota
+        self.recovery_time = recovery_time
+        self.db_fp = db_fp
+        self.name = name
+
+        # Requests per second
+        self.rate = max_rate / time_period
+        self.min_rate = self.rate / 10
+
+        self._conn: sqlite3.Connection | None = None
+        self._conn_pid: int | None = None
+        self._conn_lock = threading.Lock()
+
+        # Waiters of each event loop, since asyncio locks are bound to their loop
+        self._waiters: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    async def acquire(self) -> None:
+        """
+        Wait until a request can be made.
+
+        Raises:
+            QuotaExceeded: If the daily quota has been used up
+        """
+        loop = asyncio.get_running_loop()
+        waiters = self._waiters.setdefault(loop, asyncio.Lock())
+        async with waiters:
+            while True:
+                wait = await asyncio.to_thread(self._try_acquire)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    async def penalize(self, retry_after: float | None = None) -> None:
+        """
+        Slow down after the API responded with 429 Too Many Requests.
+        Halves the shared rate and blocks all requests until `retry_after`.
+
+        Args:
+            retry_after (float | None): Seconds to wait before the next request,
+                from the `Retry-After` header. Default: one time period.
+        """
+        if retry_after is None:
+            retry_after = self.time_period
+        await asyncio.to_thread(self._penalize, retry_after)
+
+    async def usage(self) -> int:
+        """
+        Get the number of requests made today (UTC) by all processes.
+
+        Returns:
+            int: Number of requests made today
+        """
+        return await asyncio.to_thread(self._usage)
+
+    def close(self) -> None:
+        """Close the connection of this process to the shared database."""
+        with self._conn_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn, self._conn_pid = None, None
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Get the connection of this process to the shared database, connecting
+        and creating its tables on first use. Must be called with `_conn_lock`.
+        """
+        # A connection inherited from a forked parent must not be used
+        if self._conn is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(
+                self.db_fp, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                "name TEXT PRIMARY KEY, tokens REAL, rate REAL, "
+                "updated REAL, blocked_until REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS quota ("
+                "name TEXT, day TEXT, count INTEGER, PRIMARY KEY (name, day))"
+            )
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _load(self, conn: sqlite3.Connection, now: float) -> tuple[float, ...]:
+        """Load the bucket state, refilled up to `now`."""
+        row = conn.execute(
+            "SELECT tokens, rate, updated, blocked_until FROM bucket WHERE name = ?",
+            (self.name,),
+        ).fetchone()
+        if row is None:
+            return self.max_rate, self.rate, now, 0.0
+
+        tokens, rate, updated, blocked_until = row
+        elapsed = max(0.0, now - updated)
+
+        # Recover the rate linearly, then refill the tokens at that rate
+        rate = min(self.rate, rate + self.rate * elapsed / self.recovery_time)
+        tokens = min(self.max_rate, tokens + elapsed * rate)
+        return tokens, rate, now, blocked_until
+
+    def _save(
+        self,
+        conn: sqlite3.Connection,
+        tokens: float,
+        rate: float,
+        updated: float,
+        blocked_until: float,
+    ) -> None:
+        """Save the bucket state."""
+        conn.execute(
+            "INSERT OR REPLACE INTO bucket VALUES (?, ?, ?, ?, ?)",
+            (self.name, tokens, rate, updated, blocked_until),
+        )
+
+    def _try_acquire(self) -> float:
+        """
+        Try to take a token from the shared bucket.
+
+        Returns:
+            float: 0 if a token was taken, else the seconds to wait before retrying
+        """
+        day = datetime.now(timezone.utc).date().isoformat()
+
+        with self._conn_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Read the clock only once the lock is held
+                now = time.time()
+                tokens, rate, updated, blocked_until = self._load(conn, now)
+
+                if self.daily_quota is not None:
+                    row = conn.execute(
+                        "SELECT count FROM quota WHERE name = ? AND day = ?",
+                        (self.name, day),
+                    ).fetchone()
+                    if row is not None and row[0] >= self.daily_quota:
+                        raise QuotaExceeded(self.daily_quota)
+
+                if now < blocked_until:
+                    wait = blocked_until - now
+                elif tokens >= 1:
+                    tokens -= 1
+                    wait = 0.0
+                    conn.execute(
+                        "INSERT INTO quota VALUES (?, ?, 1) "
+                        "ON CONFLICT (name, day) DO UPDATE SET count = count + 1",
+                        (self.name, day),
+                    )
+                else:
+                    wait = (1 - tokens) / rate
+
+                self._save(conn, tokens, rate, updated, blocked_until)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return wait
+
+    def _penalize(self, retry_after: float) -> None:
+        """Halve the shared rate and block requests for `retry_after` seconds."""
+        with self._conn_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                _, rate, updated, blocked_until = self._load(conn, now)
+                rate = max(self.min_rate, rate / 2)
+                blocked_until = max(blocked_until, now + retry_after)
+                self._save(conn, 0.0, rate, updated, blocked_until)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _usage(self) -> int:
+        """Get the number of requests made today (UTC)."""
+        day = datetime.now(timezone.utc).date().isoformat()
+
+        with self._conn_lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT count FROM quota WHERE name = ? AND day = ?",
+                (self.name, day),
+            ).fetchone()
+        return row[0] if row else 0
+
+
+# Shared limiter for all OpenAlex API requests
+limiter = RateLimiter(max_rate=10, time_period=1)
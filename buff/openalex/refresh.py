@@ -0,0 +1,271 @@
+"""buff/openalex/refresh.py"""
+
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from pydantic import ValidationError
+
+from buff.store import get_store
+from buff.store.base import WorkStore, fetch_timestamp
+
+from .cache import work_cache
+from .client import get_json
+from .models import WorkObject
+from .utils import parse_id_from_url
+from .work import Work
+
+# Works fetched longer ago than this are checked for changes
+DEFAULT_MAX_AGE = timedelta(days=7)
+
+# Fields of the stored works needed to decide what to refresh
+REFRESH_FIELDS = ["id", "updated_date", "cited_by_count", "_partial", "_fetched_at"]
+
+
+class RefreshResult(NamedTuple):
+    """Result of refreshing stored works"""
+
+    checked: int = 0
+    changed: int = 0
+    citations: int = 0
+
+    def __add__(self, other: "RefreshResult") -> "RefreshResult":
+        return RefreshResult(*(a + b for a, b in zip(self, other)))
+
+
+async def find_stale_works(
+    max_age: timedelta = DEFAULT_MAX_AGE, store: WorkStore | None = None
+) -> list[dict]:
+    """
+    Find the stored works fetched longer ago than `max_age`,
+    or never stamped with a fetch time.
+
+    Args:
+        max_age (timedelta): Maximum age of a fetch
+        store (WorkStore | None): Store of the works. Default: `get_store()`.
+
+    Returns:
+        list[dict]: Works projected on `REFRESH_FIELDS`
+    """
+    store = store or get_store()
+    before = (datetime.now(timezone.utc) - max_age).isoformat(timespec="seconds")
+    return [
+        doc
+        async for doc in store.iter_works(REFRESH_FIELDS)
+        if doc.get("_fetched_at") is None or doc["_fetched_at"] <= before
+    ]
+
+
+async def refresh_works(
+    work_ids: list[str] | None = None,
+    max_age: timedelta = DEFAULT_MAX_AGE,
+    batch_size: int = 50,
+    citations: bool = True,
+    citation_select: list[str] | None = None,
+    store: WorkStore | None = None,
+) -> RefreshResult:
+    """
+    Refresh the stored works that changed in OpenAlex since they were fetched.
+
+    The works are checked in batches with the `openalex_id` OR filter,
+    selecting only their IDs and update times, which are compared with the
+    stored ones. Only the works that changed are fetched and saved again,
+    while the unchanged works are stamped as fetched. Partial works are
+    refreshed with their own fields.
+
+    When the citation count of a work grew and its complete citation list is
+    stored, only the works citing it published since the list was fetched are
+    pulled and added to the list. Filtering by update time instead would need
+    an OpenAlex premium API key, so citing works published earlier but added
+    to OpenAlex later are missed until the list is fetched again.
+
+    Args:
+        work_ids (list[str] | None): ID URLs of the works to refresh.
+            Default: the works fetched longer ago than `max_age`.
+        max_age (timedelta): Maximum age of a fetch, when no IDs are given
+        batch_size (int): Number of works to check per API request.
+            Default: 50. Maximum: 50 (OpenAlex OR filter limit).
+        citations (bool): Whether to add the new citations of the changed works
+        citation_select (list[str] | None): Fields to fetch of the new citations.
+            Default: None (all fields).
+        store (WorkStore | None): Store of the works. Default: `get_store()`.
+
+    Returns:
+        RefreshResult: Number of works checked and changed,
+            and of citations added
+    """
+    store = store or get_store()
+    batch_size = max(1, min(batch_size, 50))
+
+    if work_ids is None:
+        docs = await find_stale_works(max_age, store)
+    else:
+        docs = await store.get_works(work_ids)
+
+    # Batch the works fetched with the same fields, so each batch is
+    # fetched again with one select
+    groups = defaultdict(list)
+    for doc in docs:
+        groups[tuple(doc.get("_partial") or ())].append(doc)
+
+    batches = []
+    for partial, group in groups.items():
+        for i in range(0, len(group), batch_size):
+            batches.append((list(partial) or None, group[i : i + batch_size]))
+
+    results = await asyncio.gather(
+        *(_refresh_batch(batch, partial, store) for partial, batch in batches)
+    )
+    changed = [work for works in results for work in works]
+    result = RefreshResult(checked=len(docs), changed=len(changed))
+
+    if citations and changed:
+        stored = {doc["id"]: doc for doc in docs}
+        grown = [
+            work
+            for work in changed
+            if (work.cited_by_count or 0)
+            > (stored[str(work.id)].get("cited_by_count") or 0)
+        ]
+        result += RefreshResult(
+            citations=await _refresh_citations(grown, stored, citation_select, store)
+        )
+
+    return result
+
+
+async def _refresh_batch(
+    docs: list[dict], partial: list[str] | None, store: WorkStore
+) -> list[WorkObject]:
+    """
+    Fetch the works of a batch updated since they were stored and save them.
+
+    Args:
+        docs (list[dict]): Stored works, projected on `REFRESH_FIELDS`
+        partial (list[str] | None): Fields the works are limited to
+        store (WorkStore): Store of the works
+
+    Returns:
+        list[WorkObject]: Works that changed
+    """
+    stored = {doc["id"]: doc for doc in docs}
+    filter_ = "openalex_id:" + "|".join(parse_id_from_url(i) for i in stored)
+    url = f"https://api.openalex.org/works?filter={filter_}&per-page={len(docs)}"
+
+    # Compare the update times first, so unchanged works are not downloaded.
+    # Works stored without an update time are fetched again regardless.
+    try:
+        data = await get_json(url + "&select=id,updated_date")
+    except Exception as e:
+        print(f"Error refreshing works: {e}")
+        return []
+
+    # Serialized like the stored works, so the update times compare equal
+    outdated = []
+    for result in data["results"]:
+        try:
+            work = WorkObject(**result).model_dump(mode="json")
+        except ValidationError:
+            continue
+        doc = stored.get(work["id"])
+        if doc is not None and (
+            doc.get("updated_date") is None
+            or work["updated_date"] != doc["updated_date"]
+        ):
+            outdated.append(work["id"])
+
+    changed = []
+    if outdated:
+        filter_ = "openalex_id:" + "|".join(parse_id_from_url(i) for i in outdated)
+        url = (
+            f"https://api.openalex.org/works?filter={filter_}&per-page={len(outdated)}"
+        )
+        select = None
+        if partial is not None:
+            select = Work._select_fields([*partial, "updated_date", "cited_by_count"])
+            url += f"&{Work._select_param(select)}"
+
+        try:
+            data = await get_json(url)
+        except Exception as e:
+            print(f"Error refreshing works: {e}")
+            return []
+
+        for result in data["results"]:
+            try:
+                changed.append(WorkObject(**result))
+            except ValidationError:
+                continue
+
+    if changed:
+        # Saved with the fields fetched, which include the refresh fields
+        await store.upsert_works(changed, partial=select)
+    for work in changed:
+        work_cache.pop(str(work.id))
+
+    changed_ids = {str(work.id) for work in changed}
+    await store.mark_fetched("works", [i for i in stored if i not in changed_ids])
+    return changed
+
+
+async def _refresh_citations(
+    works: list[WorkObject],
+    stored: dict[str, dict],
+    select: list[str] | None,
+    store: WorkStore,
+) -> int:
+    """
+    Add the new citations of the works to their complete stored citation lists.
+
+    Args:
+        works (list[WorkObject]): Works whose citation count grew
+        stored (dict[str, dict]): {id: stored work} before the refresh
+        select (list[str] | None): Fields to fetch of the new citations
+        store (WorkStore): Store of the works
+
+    Returns:
+        int: Number of citations added
+    """
+    docs = await store.get_many_citations([str(work.id) for work in works])
+
+    async def refresh(doc: dict) -> int:
+        # Lists saved before fetch times were recorded fall back to the update
+        # time of the stored work; citations already listed are skipped
+        since = doc.get("_fetched_at") or stored[doc["id"]].get("updated_date")
+        if since is None:
+            return 0
+
+        filter_ = (
+            f"cites:{parse_id_from_url(doc['id'])},from_publication_date:{since[:10]}"
+        )
+        try:
+            citing = [str(w.id) async for w in Work._iter_works(filter_, select=select)]
+        except Exception as e:
+            print(f"Error refreshing citations of {doc['id']}: {e}")
+            return 0
+
+        known = doc.get("citations", [])
+        listed = set(known)
+        new = [work_id for work_id in citing if work_id not in listed]
+
+        # The new citations are appended out of the sorted page order, so the
+        # list is recorded as fully fetched and never topped up from an offset
+        ids = [*known, *new]
+        await store.upsert_citations(
+            [
+                {
+                    "id": doc["id"],
+                    "citations": ids,
+                    "limit": len(ids),
+                    "count": len(ids),
+                    "complete": True,
+                    "_fetched_at": fetch_timestamp(),
+                }
+            ]
+        )
+        return len(new)
+
+    # Lists built from snapshots are incomplete and not refreshed
+    complete = [doc for doc in docs if doc.get("complete", True)]
+    return sum(await asyncio.gather(*map(refresh, complete)))
@@ -1,28 +1,216 @@
 """buff/openalex/search.py"""
 
-import urllib.parse
+from typing import Any, AsyncIterator, NamedTuple
+from urllib.parse import urlencode
 
-import httpx
+from pydantic import ValidationError
 
+from .cache import search_cache, work_cache
+from .client import get_json
+from .models import WorkObject
+from .work import Work
 
-async def search_works(query: str, n: int = 10) -> list:
-    """Search for works."""
-    base_url = "https://api.openalex.org/works"
+SEARCH_URL = "https://api.openalex.org/works"
 
-    # URL-encode the query string
-    query = urllib.parse.quote(query)
 
-    # Construct the URL
-    url = f"{base_url}?search={query}"
+class SearchPage(NamedTuple):
+    """Page of search results"""
 
-    # Limit the number of results
-    if n is not None:
-        url += f"&q={n}"
+    works: list[WorkObject]
+    count: int
+    next_cursor: str | None
 
-    # Make the request
-    async with httpx.AsyncClient() as client:
-        print(f"GET {url}")
-        response = await client.get(url)
 
-    # Return the list of works
-    return response.json().get("results", [])
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query. OpenAlex search ignores case and extra whitespace,
+    so queries that differ only by those share their cached results.
+
+    Args:
+        query (str): Search query
+
+    Returns:
+        str: Lowercase query with single spaces
+    """
+    return " ".join(query.lower().split())
+
+
+def _filter_value(value: Any) -> str:
+    """Format a filter value. Lists of values are ORed."""
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return "|".join(sorted(map(_filter_value, value)))
+    return str(value)
+
+
+def normalize_filters(filters: dict[str, Any] | None) -> str | None:
+    """
+    Build the `filter` parameter of a search, with the filters sorted by name.
+
+    Args:
+        filters (dict[str, Any] | None): {name: value} of the filters,
+            e.g. {"publication_year": ">2020", "concepts.id": ["C1", "C2"]}
+
+    Returns:
+        str | None: `name:value,...` filter, or None if there are no filters
+    """
+    if not filters:
+        return None
+    return ",".join(
+        f"{name}:{_filter_value(value)}" for name, value in sorted(filters.items())
+    )
+
+
+async def search_page(
+    query: str,
+    filters: dict[str, Any] | None = None,
+    per_page: int = 25,
+    cursor: str = "*",
+    select: list[str] | None = None,
+    save: bool = True,
+    cache: bool = True,
+) -> SearchPage:
+    """
+    Get a page of the works matching a search, sorted by relevance.
+    Pages are cached by their normalized query, filters, projection,
+    page size and cursor, so repeated searches skip the API.
+
+    Args:
+        query (str): Search query over the titles, abstracts and full texts
+        filters (dict[str, Any] | None): {name: value} of OpenAlex filters
+        per_page (int): Number of works per page. Maximum: 200.
+        cursor (str): Cursor of the page, "*" for the first page
+        select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+            Default: None (all fields).
+        save (bool): Whether to save the works fetched from the API to the store
+        cache (bool): Whether to use the cached search results
+
+    Returns:
+        SearchPage: Works of the page, total count and cursor of the next page
+    """
+    per_page = max(1, min(per_page, 200))  # OpenAlex supports 1-200 per page
+    select = Work._select_fields(select)
+    query = normalize_query(query)
+    filter_ = normalize_filters(filters)
+
+    params = {
+        "search": query or None,
+        "filter": filter_,
+        "select": None if select is None else ",".join(select),
+        "per-page": per_page,
+        "cursor": cursor,
+    }
+    params = {name: value for name, value in params.items() if value is not None}
+
+    key = search_cache.make_key(**params)
+    data = await search_cache.get(key) if cache else None
+    fetched = data is None
+    if fetched:
+        response = await get_json(f"{SEARCH_URL}?{urlencode(params)}")
+        data = {
+            "results": response["results"],
+            "count": response["meta"]["count"],
+            "next_cursor": response["meta"].get("next_cursor"),
+        }
+        if cache:
+            await search_cache.put(key, data)
+
+    works = []
+    for result in data["results"]:
+        try:
+            works.append(WorkObject(**result))
+        except ValidationError:
+            pass
+
+    # Cached pages were saved when they were fetched
+    if fetched and save:
+        await Work._save_works(works, select=select)
+    work_cache.put_many(works, select)
+
+    next_cursor = data["next_cursor"] if data["results"] else None
+    return SearchPage(works, data["count"], next_cursor)
+
+
+async def iter_search(
+    query: str,
+    filters: dict[str, Any] | None = None,
+    limit: int | None = None,
+    per_page: int = 200,
+    select: list[str] | None = None,
+    save: bool = True,
+    cache: bool = True,
+) -> AsyncIterator[WorkObject]:
+    """
+    Iterate over the works matching a search using cursor pagination,
+    yielding the works of each page as soon as it arrives.
+
+    Args:
+        query (str): Search query over the titles, abstracts and full texts
+        filters (dict[str, Any] | None): {name: value} of OpenAlex filters
+        limit (int | None): Maximum number of works to yield.
+            Default: None (all matching works).
+        per_page (int): Number of works per page. Maximum: 200.
+        select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+            Default: None (all fields).
+        save (bool): Whether to save the works fetched from the API to the store
+        cache (bool): Whether to use the cached search results
+
+    Yields:
+        WorkObject: Work matching the search, by relevance
+    """
+    count = 0
+    cursor = "*"
+    while cursor and (limit is None or count < limit):
+        page = await search_page(
+            query,
+            filters=filters,
+            per_page=per_page,
+            cursor=cursor,
+            select=select,
+            save=save,
+            cache=cache,
+        )
+
+        works = page.works if limit is None else page.works[: limit - count]
+        for work in works:
+            yield work
+        count += len(works)
+
+        cursor = page.next_cursor
+
+
+async def search_works(
+    query: str,
+    n: int = 10,
+    filters: dict[str, Any] | None = None,
+    select: list[str] | None = None,
+    cache: bool = True,
+) -> list[WorkObject]:
+    """
+    Search for works.
+
+    Args:
+        query (str): Search query over the titles, abstracts and full texts
+        n (int): Maximum number of works to return
+        filters (dict[str, Any] | None): {name: value} of OpenAlex filters
+        select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+            Default: None (all fields).
+        cache (bool): Whether to use the cached search results
+
+    Returns:
+        list[WorkObject]: Works matching the search, by relevance
+    """
+    if n <= 0:
+        return []
+    return [
+        work
+        async for work in iter_search(
+            query,
+            filters=filters,
+            limit=n,
+            per_page=min(n, 200),
+            select=select,
+            cache=cache,
+        )
+    ]
@@ -0,0 +1,56 @@
+"""buff/openalex/singleflight.py"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into a single call.
+
+    While a call for a key is in flight, every other caller asking for the same
+    key awaits its result instead of starting a duplicate call.
+    Once the call finishes, the next caller starts a new one.
+
+    Usage:
+        flight = SingleFlight()
+        data = await flight.do(("work", entity_id), lambda: fetch(entity_id))
+    """
+
+    def __init__(self) -> None:
+        """Initialize the SingleFlight object."""
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        """Number of calls in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` unless a call with the same key is already in flight,
+        in which case wait for that call's result instead.
+
+        Args:
+            key (Hashable): Key identifying the call
+            fn (Callable[[], Awaitable[T]]): Function starting the call
+
+        Returns:
+            T: Result of the call
+        """
+        loop = asyncio.get_running_loop()
+
+        future = self._calls.get(key)
+        if future is None or future.get_loop() is not loop:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+
+        # Shield the shared call so one cancelled caller does not cancel the rest
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """Remove a finished call, unless it has already been replaced."""
+        if self._calls.get(key) is future:
+            del self._calls[key]
@@ -0,0 +1,310 @@
+"""buff/openalex/snapshot.py"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from pydantic import ValidationError
+from tqdm import tqdm
+
+from buff.store import get_store
+from config import DATA_DIR
+
+from .models import WorkObject
+
+SNAPSHOT_PROGRESS_FP = DATA_DIR.joinpath("snapshot_progress.json")
+
+OPENALEX_URL = "https://openalex.org/"
+
+
+def _to_url(entity_id: str) -> str:
+    """Get the ID URL of an OpenAlex entity ID, e.g. "W123" or its URL."""
+    return entity_id if entity_id.startswith("http") else OPENALEX_URL + entity_id
+
+
+class SnapshotFilter(NamedTuple):
+    """Works to ingest from a snapshot. Works must match every condition given."""
+
+    concepts: frozenset[str] | None = None
+    min_year: int | None = None
+    max_year: int | None = None
+    work_ids: frozenset[str] | None = None
+
+    @classmethod
+    def create(
+        cls,
+        concepts: list[str] | None = None,
+        min_year: int | None = None,
+        max_year: int | None = None,
+        work_ids: list[str] | None = None,
+    ) -> "SnapshotFilter":
+        """
+        Create a filter, normalizing the IDs to ID URLs.
+
+        Args:
+            concepts (list[str] | None): IDs of concepts, works must have one
+            min_year (int | None): Minimum publication year
+            max_year (int | None): Maximum publication year
+            work_ids (list[str] | None): IDs of the works to ingest
+
+        Returns:
+            SnapshotFilter: The filter
+        """
+        return cls(
+            concepts=None if concepts is None else frozenset(map(_to_url, concepts)),
+            min_year=min_year,
+            max_year=max_year,
+            work_ids=None if work_ids is None else frozenset(map(_to_url, work_ids)),
+        )
+
+    def matches(self, doc: dict) -> bool:
+        """
+        Check whether a raw work document matches the filter.
+
+        Args:
+            doc (dict): Work document from the snapshot
+
+        Returns:
+            bool: True if the work should be ingested
+        """
+        if self.work_ids is not None and doc.get("id") not in self.work_ids:
+            return False
+
+        year = doc.get("publication_year")
+        if self.min_year is not None and (year is None or year < self.min_year):
+            return False
+        if self.max_year is not None and (year is None or year > self.max_year):
+            return False
+
+        if self.concepts is not None:
+            concepts = {concept.get("id") for concept in doc.get("concepts") or []}
+            if self.concepts.isdisjoint(concepts):
+                return False
+
+        return True
+
+    def key(self) -> str:
+        """Get a stable hash of the filter, to track the progress of each filter."""
+        filter_ = {
+            "concepts": None if self.concepts is None else sorted(self.concepts),
+            "min_year": self.min_year,
+            "max_year": self.max_year,
+            "work_ids": None if self.work_ids is None else sorted(self.work_ids),
+        }
+        return hashlib.sha1(json.dumps(filter_).encode()).hexdigest()[:16]
+
+
+class PartitionResult(NamedTuple):
+    """Result of ingesting a snapshot partition"""
+
+    partition: str
+    works: int
+    invalid: int
+    inserted: int
+    modified: int
+
+
+def find_partitions(snapshot_dir: Path | str) -> list[Path]:
+    """
+    Find the gzipped JSON Lines partitions of the works of a snapshot.
+
+    Args:
+        snapshot_dir (Path | str): Snapshot directory, its `data/works` directory,
+            or a directory of partitions
+
+    Returns:
+        list[Path]: Partition files, in order
+    """
+    snapshot_dir = Path(snapshot_dir)
+    works_dir = snapshot_dir.joinpath("data", "works")
+    if works_dir.is_dir():
+        snapshot_dir = works_dir
+    return sorted(snapshot_dir.glob("**/*.gz"))
+
+
+def read_partition(partition: Path | str, filter_: SnapshotFilter) -> Iterator[dict]:
+    """
+    Stream the works of a partition that match the filter.
+
+    Args:
+        partition (Path | str): Partition file
+        filter_ (SnapshotFilter): Works to keep
+
+    Yields:
+        dict: Raw work documents
+    """
+    with gzip.open(partition, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            if filter_.matches(doc):
+                yield doc
+
+
+def ingest_partition(
+    partition: str, filter_: SnapshotFilter, batch_size: int = 1000
+) -> PartitionResult:
+    """
+    Validate the matching works of a partition and bulk-load them into the store,
+    along with their references and the citations they add to the works they cite.
+    Runs in a worker process, with the store configured from the environment.
+
+    Args:
+        partition (str): Partition file
+        filter_ (SnapshotFilter): Works to ingest
+        batch_size (int): Number of works per bulk write
+
+    Returns:
+        PartitionResult: Counts of the works ingested
+    """
+    return asyncio.run(_ingest_partition(partition, filter_, batch_size))
+
+
+async def _ingest_partition(
+    partition: str, filter_: SnapshotFilter, batch_size: int
+) -> PartitionResult:
+    """Ingest a partition. See `ingest_partition`."""
+    store = get_store()
+    works = invalid = inserted = modified = 0
+
+    async def flush(batch: list[WorkObject]) -> None:
+        nonlocal inserted, modified
+        result = await store.upsert_works(batch, batch_size=batch_size)
+        inserted, modified = inserted + result.inserted, modified + result.modified
+
+        # Referenced works are complete, while citations only grow as works are seen
+        references, citations = [], defaultdict(list)
+        for work in batch:
+            work_id = str(work.id)
+            referenced = [str(ref) for ref in work.referenced_works or []]
+            references.append({"id": work_id, "references": referenced})
+            for ref in referenced:
+                citations[ref].append(work_id)
+        await store.upsert_references(references)
+        await store.add_citations(dict(citations))
+
+    batch = []
+    for doc in read_partition(partition, filter_):
+        try:
+            batch.append(WorkObject(**doc))
+        except ValidationError:
+            invalid += 1
+            continue
+
+        works += 1
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    return PartitionResult(partition, works, invalid, inserted, modified)
+
+
+def load_progress(progress_fp: Path, filter_: SnapshotFilter) -> dict[str, dict]:
+    """
+    Load the partitions already ingested with the filter.
+
+    Args:
+        progress_fp (Path): Progress file
+        filter_ (SnapshotFilter): Filter of the ingest
+
+    Returns:
+        dict[str, dict]: {partition: counts} of the partitions ingested
+    """
+    if not progress_fp.exists():
+        return {}
+    with open(progress_fp, "r", encoding="utf-8") as f:
+        return json.load(f).get(filter_.key(), {})
+
+
+def save_progress(
+    progress_fp: Path, filter_: SnapshotFilter, result: PartitionResult
+) -> None:
+    """
+    Record a partition as ingested with the filter.
+    The file is replaced atomically so an interrupted ingest keeps its progress.
+
+    Args:
+        progress_fp (Path): Progress file
+        filter_ (SnapshotFilter): Filter of the ingest
+        result (PartitionResult): Result of the partition
+    """
+    progress = {}
+    if progress_fp.exists():
+        with open(progress_fp, "r", encoding="utf-8") as f:
+            progress = json.load(f)
+
+    counts = result._asdict()
+    progress.setdefault(filter_.key(), {})[counts.pop("partition")] = counts
+
+    tmp_fp = progress_fp.with_suffix(".tmp")
+    with open(tmp_fp, "w", encoding="utf-8") as f:
+        json.dump(progress, f, indent=2)
+    tmp_fp.replace(progress_fp)
+
+
+def ingest_snapshot(
+    snapshot_dir: Path | str,
+    filter_: SnapshotFilter = SnapshotFilter(),
+    processes: int | None = None,
+    batch_size: int = 1000,
+    progress_fp: Path = SNAPSHOT_PROGRESS_FP,
+    resume: bool = True,
+) -> list[PartitionResult]:
+    """
+    Ingest the works of a snapshot into the store, one partition per worker process.
+    Partitions already ingested with the same filter are skipped when resuming.
+
+    Args:
+        snapshot_dir (Path | str): Snapshot directory
+        filter_ (SnapshotFilter): Works to ingest. Default: all works.
+        processes (int | None): Number of worker processes. Default: CPU count.
+            0 ingests in the current process.
+        batch_size (int): Number of works per bulk write
+        progress_fp (Path): File tracking the partitions ingested
+        resume (bool): Whether to skip the partitions already ingested
+
+    Returns:
+        list[PartitionResult]: Results of the partitions ingested in this run
+    """
+    partitions = [str(p) for p in find_partitions(snapshot_dir)]
+    done = load_progress(progress_fp, filter_) if resume else {}
+    pending = [p for p in partitions if p not in done]
+    print(
+        f"Partitions: {len(partitions)}, "
+        f"already ingested: {len(partitions) - len(pending)}"
+    )
+
+    results = []
+    with tqdm(total=len(pending), desc="Ingesting", dynamic_ncols=True) as pbar:
+
+        def record(result: PartitionResult) -> None:
+            save_progress(progress_fp, filter_, result)
+            results.append(result)
+            pbar.set_postfix(works=sum(r.works for r in results))
+            pbar.update(1)
+
+        if processes == 0:
+            for partition in pending:
+                record(ingest_partition(partition, filter_, batch_size))
+            return results
+
+        # Spawn the workers so they open their own store connections
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as pool:
+            futures = [
+                pool.submit(ingest_partition, partition, filter_, batch_size)
+                for partition in pending
+            ]
+            for future in as_completed(futures):
+                record(future.result())
+
+    return results
@@ -0,0 +1,328 @@
+"""buff/openalex/table.py"""
+
+from typing import AsyncIterable, Iterable
+
+import numpy as np
+
+from .models import WorkObject
+
+# Fields of the works held by the WorkTable, e.g. to `select` or project them
+TABLE_FIELDS = ["id", "doi", "publication_year", "cited_by_count", "referenced_works"]
+
+
+class WorkTable:
+    """
+    Compact columnar table of the metadata of many works.
+
+    Work IDs are interned into integers that index `ids`, the string table.
+    Each row holds the interned ID, DOI, publication year and citation count
+    of a work in NumPy columns, and the interned IDs of its referenced works
+    packed in CSR form: the references of row `i` are
+    `ref_indices[ref_indptr[i]:ref_indptr[i + 1]]`.
+    Unknown publication years and citation counts are 0.
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        work: np.ndarray,
+        doi: np.ndarray,
+        publication_year: np.ndarray,
+        cited_by_count: np.ndarray,
+        ref_indptr: np.ndarray,
+        ref_indices: np.ndarray,
+    ) -> None:
+        """
+        Initialize the WorkTable object. Use the `from_*` constructors instead.
+
+        Args:
+            ids (list[str]): String table of the interned work IDs
+            work (np.ndarray): Interned ID of each row
+            doi (np.ndarray): DOI of each row, or None
+            publication_year (np.ndarray): Publication year of each row
+            cited_by_count (np.ndarray): Citation count of each row
+            ref_indptr (np.ndarray): Offsets of the references of each row
+            ref_indices (np.ndarray): Interned IDs of the references
+        """
+        self.ids = ids
+        self.work = work
+        self.doi = doi
+        self.publication_year = publication_year
+        self.cited_by_count = cited_by_count
+        self.ref_indptr = ref_indptr
+        self.ref_indices = ref_indices
+
+        self._index: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.work)
+
+    def __getitem__(self, rows: np.ndarray | slice | list[int]) -> "WorkTable":
+        return self.take(rows)
+
+    @classmethod
+    def from_documents(cls, docs: Iterable[dict]) -> "WorkTable":
+        """
+        Build a table from work documents, e.g. API results or stored works.
+
+        Args:
+            docs (Iterable[dict]): Work documents shaped like `WorkObject` JSON
+
+        Returns:
+            WorkTable: Table of the works
+        """
+        builder = _TableBuilder()
+        for doc in docs:
+            builder.add_document(doc)
+        return builder.build()
+
+    @classmethod
+    async def from_cursor(cls, docs: AsyncIterable[dict]) -> "WorkTable":
+        """
+        Build a table from an async iterable of work documents,
+        e.g. a MongoDB cursor projected on `TABLE_FIELDS`.
+
+        Args:
+            docs (AsyncIterable[dict]): Work documents shaped like `WorkObject` JSON
+
+        Returns:
+            WorkTable: Table of the works
+        """
+        builder = _TableBuilder()
+        async for doc in docs:
+            builder.add_document(doc)
+        return builder.build()
+
+    @classmethod
+    def from_works(cls, works: Iterable[WorkObject]) -> "WorkTable":
+        """
+        Build a table from WorkObjects.
+
+        Args:
+            works (Iterable[WorkObject]): Works to add
+
+        Returns:
+            WorkTable: Table of the works
+        """
+        builder = _TableBuilder()
+        for work in works:
+            builder.add(
+                str(work.id),
+                None if work.doi is None else str(work.doi),
+                work.publication_year,
+                work.cited_by_count,
+                work.referenced_works,
+            )
+        return builder.build()
+
+    def row(self, work_id: str) -> int | None:
+        """
+        Get the row of a work.
+
+        Args:
+            work_id (str): ID URL of the work
+
+        Returns:
+            int | None: Row of the work, or None if it is not in the table
+        """
+        if self._index is None:
+            self._index = {self.ids[i]: row for row, i in enumerate(self.work)}
+        return self._index.get(work_id)
+
+    def work_ids(self) -> list[str]:
+        """
+        Get the IDs of the works of the table, in row order.
+
+        Returns:
+            list[str]: ID URLs of the works
+        """
+        return [self.ids[i] for i in self.work]
+
+    def references(self, row: int) -> list[str]:
+        """
+        Get the referenced works of a row.
+
+        Args:
+            row (int): Row of the work
+
+        Returns:
+            list[str]: ID URLs of the referenced works
+        """
+        start, end = self.ref_indptr[row], self.ref_indptr[row + 1]
+        return [self.ids[i] for i in self.ref_indices[start:end]]
+
+    def reference_counts(self) -> np.ndarray:
+        """
+        Get the number of referenced works of each row.
+
+        Returns:
+            np.ndarray: Number of references per row
+        """
+        return np.diff(self.ref_indptr)
+
+    def take(self, rows: np.ndarray | slice | list[int]) -> "WorkTable":
+        """
+        Select rows, given as a boolean mask, indices or a slice.
+        The string table is shared with the new table.
+
+        Args:
+            rows (np.ndarray | slice | list[int]): Rows to select
+
+        Returns:
+            WorkTable: Table of the selected rows, in the given order
+        """
+        rows = np.arange(len(self))[rows]
+
+        # Gather the reference lists of the rows into a new CSR
+        starts, ends = self.ref_indptr[rows], self.ref_indptr[rows + 1]
+        lengths = ends - starts
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        positions = np.arange(indptr[-1]) - np.repeat(indptr[:-1] - starts, lengths)
+
+        return WorkTable(
+            self.ids,
+            self.work[rows],
+            self.doi[rows],
+            self.publication_year[rows],
+            self.cited_by_count[rows],
+            indptr,
+            self.ref_indices[positions],
+        )
+
+    def filter(
+        self,
+        min_year: int | None = None,
+        max_year: int | None = None,
+        min_cited_by_count: int | None = None,
+        has_doi: bool | None = None,
+    ) -> "WorkTable":
+        """
+        Select the rows matching all the given conditions.
+
+        Args:
+            min_year (int | None): Minimum publication year
+            max_year (int | None): Maximum publication year
+            min_cited_by_count (int | None): Minimum citation count
+            has_doi (bool | None): Whether the works have a DOI
+
+        Returns:
+            WorkTable: Table of the matching rows
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_year is not None:
+            mask &= self.publication_year >= min_year
+        if max_year is not None:
+            mask &= (self.publication_year <= max_year) & (self.publication_year > 0)
+        if min_cited_by_count is not None:
+            mask &= self.cited_by_count >= min_cited_by_count
+        if has_doi is not None:
+            mask &= np.not_equal(self.doi, None) == has_doi
+        return self.take(mask)
+
+    def sort_by(
+        self, column: str = "cited_by_count", descending: bool = True
+    ) -> "WorkTable":
+        """
+        Sort the rows by a numeric column. Ties keep their row order.
+
+        Args:
+            column (str): "cited_by_count" or "publication_year"
+            descending (bool): Whether to sort in descending order
+
+        Returns:
+            WorkTable: Sorted table
+        """
+        values = getattr(self, column)
+        order = np.argsort(-values if descending else values, kind="stable")
+        return self.take(order)
+
+    def top_k(self, k: int, column: str = "cited_by_count") -> "WorkTable":
+        """
+        Select the k rows with the highest values of a numeric column,
+        in descending order. Ties keep their row order, as a stable sort would.
+        Runs in linear time, plus sorting the k selected rows.
+
+        Args:
+            k (int): Number of rows to select
+            column (str): "cited_by_count" or "publication_year"
+
+        Returns:
+            WorkTable: Table of the top k rows
+        """
+        values = getattr(self, column)
+        n = len(values)
+        if k >= n:
+            return self.sort_by(column)
+        if k <= 0:
+            return self.take(np.array([], dtype=np.int64))
+
+        # The k-th highest value splits the rows above it from the ties on it
+        kth = np.partition(values, n - k)[n - k]
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[: k - len(above)]
+        rows = np.concatenate([above, ties])
+        return self.take(rows[np.lexsort((rows, -values[rows]))])
+
+
+class _TableBuilder:
+    """Accumulates works into columns and interns their IDs."""
+
+    def __init__(self) -> None:
+        self.ids: list[str] = []
+        self.index: dict[str, int] = {}
+
+        self.work: list[int] = []
+        self.doi: list[str | None] = []
+        self.publication_year: list[int] = []
+        self.cited_by_count: list[int] = []
+        self.ref_indptr: list[int] = [0]
+        self.ref_indices: list[int] = []
+
+    def intern(self, work_id: str) -> int:
+        """Get the interned integer of a work ID, adding it if new."""
+        i = self.index.get(work_id)
+        if i is None:
+            i = self.index[work_id] = len(self.ids)
+            self.ids.append(work_id)
+        return i
+
+    def add(
+        self,
+        work_id: str,
+        doi: str | None,
+        publication_year: int | None,
+        cited_by_count: int | None,
+        referenced_works: Iterable | None,
+    ) -> None:
+        """Add a row for a work."""
+        self.work.append(self.intern(str(work_id)))
+        self.doi.append(doi)
+        self.publication_year.append(publication_year or 0)
+        self.cited_by_count.append(cited_by_count or 0)
+        self.ref_indices.extend(self.intern(str(r)) for r in referenced_works or [])
+        self.ref_indptr.append(len(self.ref_indices))
+
+    def add_document(self, doc: dict) -> None:
+        """Add a row for a work document."""
+        self.add(
+            doc["id"],
+            doc.get("doi"),
+            doc.get("publication_year"),
+            doc.get("cited_by_count"),
+            doc.get("referenced_works"),
+        )
+
+    def build(self) -> WorkTable:
+        """Build the table from the rows added."""
+        doi = np.empty(len(self.doi), dtype=object)
+        doi[:] = self.doi
+        return WorkTable(
+            self.ids,
+            np.array(self.work, dtype=np.int32),
+            doi,
+            np.array(self.publication_year, dtype=np.int16),
+            np.array(self.cited_by_count, dtype=np.int64),
+            np.array(self.ref_indptr, dtype=np.int64),
+            np.array(self.ref_indices, dtype=np.int32),
+        )
@@ -1,6 +1,8 @@
 """buff.openalex.utils.py"""
 
-import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
 from pydantic import HttpUrl
 
 from .errors import OpenAlexError
@@ -25,9 +27,31 @@ def parse_id_from_url(url: str | HttpUrl) -> str:
     raise OpenAlexError("Invalid OpenAlex URL")
 
 
-def doi_to_entity_id(doi: str) -> str:
+def normalize_doi(doi: str) -> str | None:
+    """
+    Normalize a DOI to the lowercase DOI URL used by OpenAlex.
+    Accepts bare DOIs, `doi:` prefixes and doi.org or dx.doi.org URLs.
+
+    Args:
+        doi (str): DOI to normalize
+
+    Returns:
+        str | None: DOI URL, e.g. "https://doi.org/10.1234/abc", or None if invalid
+    """
+    doi = doi.strip().lower()
+    for prefix in ("https://", "http://", "dx.", "doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix) :]
+    doi = doi.strip()
+    if not doi.startswith("10.") or "/" not in doi:
+        return None
+    return f"https://doi.org/{doi}"
+
+
+async def doi_to_entity_id(doi: str) -> str:
     """
-    Convert a DOI to an OpenAlex entity ID
+    Convert a DOI to an OpenAlex entity ID.
+    See `Work.resolve_dois` to resolve many DOIs at once.
 
     Args:
         doi (str): DOI to convert to an OpenAlex entity ID
@@ -35,17 +59,34 @@ def doi_to_entity_id(doi: str) -> str:
     Returns:
         str: OpenAlex entity ID
     """
+    from .work import Work
 
-    if not doi.startswith("https://doi.org/"):
-        doi = f"https://doi.org/{doi}"
+    ids = await Work.resolve_dois([doi])
+    if doi not in ids:
+        raise OpenAlexError(f"Invalid DOI: {doi}")
+    return parse_id_from_url(ids[doi])
 
-    url = f"https://api.openalex.org/works/doi/{doi}"
-    response = requests.get(url)
-    response.raise_for_status()
 
-    # Check if the request was successful
-    if response.status_code == 200:
-        data = response.json()
-        return parse_id_from_url(data["id"])
-    else:
-        raise OpenAlexError(f"Invalid DOI: {doi}")
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse the value of a `Retry-After` header
+
+    Args:
+        value (str | None): Header value, either seconds or an HTTP date
+
+    Returns:
+        float | None: Seconds to wait, or None if missing or invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
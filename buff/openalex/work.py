@@ -1,25 +1,24 @@
 """buff/openalex/work.py"""
 
-from json import JSONDecodeError
+import asyncio
+import heapq
+from typing import AsyncIterator
 
-import httpx
-from aiolimiter import AsyncLimiter
 from pydantic import ValidationError
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
-from buff.store.mongo import mongo_client
-from config import EMAIL
+from buff.store import get_store
+from buff.store.base import UpsertResult, fetch_timestamp
 
+from .cache import covers, work_cache
+from .client import get_json
+from .construct import load_work
 from .errors import InvalidEntityID, OpenAlexError
 from .models import WorkObject
-from .utils import parse_id_from_url
+from .singleflight import SingleFlight
+from .utils import normalize_doi, parse_id_from_url
 
-limiter = AsyncLimiter(max_rate=10, time_period=1)
+# Coalesces concurrent requests for the same work, citations or references
+flight = SingleFlight()
 
 
 class Work:
@@ -32,10 +31,15 @@ class Work:
     API_URL = "https://api.openalex.org/works/"
     BASE_URL = "https://openalex.org/"
 
-    mongo_db_openalex = mongo_client["openalex"]
-    mongo_collection_works = mongo_db_openalex["works"]
-    mongo_collection_citations = mongo_db_openalex["citations"]
-    mongo_collection_references = mongo_db_openalex["references"]
+    # Fields most call sites need, for lean `select` projections
+    LEAN_FIELDS = [
+        "id",
+        "doi",
+        "title",
+        "cited_by_count",
+        "referenced_works",
+        "best_oa_location",
+    ]
 
     def __init__(self, entity_id: str) -> None:
         """
@@ -57,326 +61,736 @@ class Work:
         self.idx: str = f"{self.BASE_URL}{self.entity_id}"
 
         self._data: WorkObject | None = None
+        self._select: list[str] | None = None
 
     @property
     async def data(self) -> WorkObject:
-        """Get the work object data."""
-        if self._data is None:
+        """Get the full work object data."""
+        if self._data is None or self._select is not None:
             self._data = await self.get()
         return self._data
 
-    @retry(
-        stop=stop_after_attempt(4),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=(
-            retry_if_exception_type(JSONDecodeError)
-            | retry_if_exception_type(httpx.ConnectTimeout)
-            | retry_if_exception_type(OpenAlexError)
-        ),
-    )
-    async def __GET(self, url: str) -> dict:
+    @staticmethod
+    def _select_fields(select: list[str] | None) -> list[str] | None:
         """
-        GET request to the OpenAlex API.
+        Normalize a `select` projection.
+        The `id` field is always selected since works are keyed by it.
 
         Args:
-            url (str): URL to the OpenAlex API endpoint
+            select (list[str] | None): Fields to select, or None for all fields
 
         Returns:
-            dict: Response object from the OpenAlex API
+            list[str] | None: Sorted, deduplicated fields, or None for all fields
         """
-        async with limiter:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url, params={"email": EMAIL}, follow_redirects=True
-                )
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    raise OpenAlexError(f"Error {response.status_code}: GET {url}")
+        if select is None:
+            return None
+        return sorted({"id", *select})
 
-    async def get(self) -> WorkObject:
+    @staticmethod
+    def _select_param(select: list[str] | None) -> str:
+        """
+        Build the `select` query parameter of an OpenAlex API URL.
+
+        Args:
+            select (list[str] | None): Normalized fields to select
+
+        Returns:
+            str: `select=...` parameter, or an empty string for all fields
+        """
+        if select is None:
+            return ""
+        return f"select={','.join(select)}"
+
+    # GET request to the OpenAlex API, rate limited and retried on errors
+    __GET = staticmethod(get_json)
+
+    async def get(self, select: list[str] | None = None) -> WorkObject:
         """
         Get the work data from the OpenAlex API.
 
+        Args:
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
+
         Returns:
             dict: Work data
         """
-        # Try to get the work data from MongoDB
-        data = await self.mongo_collection_works.find_one({"id": self.idx})
-        if data:
-            # Deserialize data into WorkObject
-            self._data = WorkObject(**data)
+        select = self._select_fields(select)
+
+        # Try to get the work data from the in-process cache
+        cached = work_cache.get(self.idx, select)
+        if cached is not None:
+            self._data, self._select = cached.work, cached.partial
             return self._data
 
+        # Coalesce concurrent requests for the same work
+        key = ("get", self.idx, select and tuple(select))
+        self._data, self._select = await flight.do(key, lambda: self._get(select))
+        work_cache.put(self._data, self._select)
+        return self._data
+
+    async def _get(
+        self, select: list[str] | None = None
+    ) -> tuple[WorkObject, list[str] | None]:
+        """
+        Get the work data from the store or the OpenAlex API. See `Work.get`.
+
+        Args:
+            select (list[str] | None): Normalized fields to fetch
+
+        Returns:
+            tuple[WorkObject, list[str] | None]:
+                - Work data
+                - Fields the work data is limited to, or None if it is complete
+        """
+        # Try to get the work data from the store
+        data = await get_store().get_work(self.idx)
+        if data and covers(data.get("_partial"), select):
+            # Deserialize data into WorkObject, skipping validation if trusted
+            return load_work(data), data.get("_partial")
+
         url = f"{self.API_URL}{self.entity_id}"
+        if select is not None:
+            url += f"?{self._select_param(select)}"
 
         # Get the work data from the OpenAlex API
         data = await self.__GET(url)
-        self._data = WorkObject(**data)
+        work = WorkObject(**data)
 
-        # Serialize WorkObject data into a dict and save it to MongoDB
-        await self.mongo_collection_works.update_one(
-            filter={"id": self.idx},
-            update={"$set": self._data.model_dump(mode="json")},
-            upsert=True,
-        )
+        # Serialize WorkObject data into a dict and save it to the store
+        await self._save_works([work], select=select)
 
-        return self._data
+        return work, select
 
-    async def citations(
-        self, limit: int = 1000, save_all: bool = False
-    ) -> tuple[list[str], dict[str, WorkObject]]:
+    @classmethod
+    async def get_many(
+        cls,
+        entity_ids: list[str],
+        batch_size: int = 50,
+        select: list[str] | None = None,
+    ) -> dict[str, WorkObject]:
         """
-        Get the citations of the work from the OpenAlex API.
-        Works that cite the given work. Incoming citations.
+        Get the data of many works at once.
+        Works in the store are fetched in a single lookup and the rest are
+        fetched from the OpenAlex API in batches using the `openalex_id` OR filter.
 
         Args:
-            limit (int): Maximum number of citations to fetch.
-                Default: 1000. Maximum: 10,000.
-            save_all (bool): Whether to save all the citations beyond the limit.
+            entity_ids (list[str]): Entity IDs or ID URLs of the works
+            batch_size (int): Number of works to fetch per API request.
+                Default: 50. Maximum: 50 (OpenAlex OR filter limit).
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
 
         Returns:
-            tuple[list[str], dict[str, WorkObject]]:
-                - List of IDs URLs of the citations
-                - Dictionary of {id: WorkObject} of all the citation works
-
-        TODO: add support for batched requests
+            dict[str, WorkObject]: Dictionary of {id: WorkObject} of the works found
         """
-        # Try to get the citations from MongoDB
-        db_citations = await self.mongo_collection_citations.find_one({"id": self.idx})
-        if db_citations:
-            citation_ids = db_citations["citations"][:limit]
+        batch_size = max(1, min(batch_size, 50))
+        select = cls._select_fields(select)
+
+        # Deduplicate the IDs while preserving their order
+        idxs = list(dict.fromkeys(cls(entity_id).idx for entity_id in entity_ids))
 
-            # Fetch all citation works in a single query
-            citation_works_cursor = self.mongo_collection_works.find(
-                {"id": {"$in": citation_ids}}
+        works = cls._get_from_cache(idxs, select)
+
+        # Fetch all the works in the store in a single lookup
+        missing = [idx for idx in idxs if idx not in works]
+        works.update((await cls._find_works(missing, select))[0])
+
+        missing = [idx for idx in idxs if idx not in works]
+        if not missing:
+            return works
+
+        async def fetch_batch(batch: list[str]) -> list[WorkObject]:
+            """Fetch a batch of works from the OpenAlex API."""
+            ids = "|".join(parse_id_from_url(idx) for idx in batch)
+            url = (
+                "https://api.openalex.org/works"
+                f"?filter=openalex_id:{ids}&per-page={len(batch)}"
             )
+            if select is not None:
+                url += f"&{cls._select_param(select)}"
+            try:
+                data = await cls.__GET(url)
+            except Exception as e:
+                print(f"Error fetching data: {e}")
+                return []
 
-            # Convert cursor to list
-            citation_works_list = await citation_works_cursor.to_list(length=None)
+            batch_works = []
+            for result in data["results"]:
+                try:
+                    batch_works.append(WorkObject(**result))
+                except ValidationError:
+                    pass
+            return batch_works
+
+        batches = [
+            missing[i : i + batch_size] for i in range(0, len(missing), batch_size)
+        ]
+        fetched = [
+            work
+            for batch_works in await asyncio.gather(*map(fetch_batch, batches))
+            for work in batch_works
+        ]
+
+        # Save the fetched works to the store in a single bulk write
+        await cls._save_works(fetched, select=select)
+        work_cache.put_many(fetched, select)
+
+        for work in fetched:
+            works[str(work.id)] = work
+
+        return works
+
+    @classmethod
+    async def resolve_dois(
+        cls, dois: list[str], batch_size: int = 50
+    ) -> dict[str, str]:
+        """
+        Resolve many DOIs to the IDs of their works.
+        DOIs of stored works are resolved with a single lookup of the DOI index
+        of the store. The rest are fetched from the OpenAlex API in batches using
+        the `doi` OR filter, and saved as partial works to extend the index.
+
+        Args:
+            dois (list[str]): DOIs, as bare DOIs or DOI URLs
+            batch_size (int): Number of DOIs to resolve per API request.
+                Default: 50. Maximum: 50 (OpenAlex OR filter limit).
 
-            # Sort the list of works by 'cited_by_count' in descending order
-            sorted_works = sorted(
-                citation_works_list, key=lambda x: x["cited_by_count"], reverse=True
+        Returns:
+            dict[str, str]: {DOI: ID URL} of the DOIs resolved, keyed by the DOIs given
+        """
+        batch_size = max(1, min(batch_size, 50))
+        select = cls._select_fields(["doi"])
+
+        normalized = {doi: normalize_doi(doi) for doi in dois}
+        doi_urls = list(dict.fromkeys(url for url in normalized.values() if url))
+
+        # Look up the DOIs of the stored works first
+        ids = await get_store().get_ids_by_doi(doi_urls)
+
+        # Commas and pipes would break the OR filter, so those DOIs go one by one
+        missing = [url for url in doi_urls if url not in ids]
+        special = [url for url in missing if "," in url or "|" in url]
+        plain = [url for url in missing if url not in special]
+        batches = [plain[i : i + batch_size] for i in range(0, len(plain), batch_size)]
+
+        async def fetch_batch(batch: list[str]) -> list[WorkObject]:
+            """Fetch the works of a batch of DOIs from the OpenAlex API."""
+            filter_ = "|".join(url.removeprefix("https://doi.org/") for url in batch)
+            url = (
+                "https://api.openalex.org/works"
+                f"?filter=doi:{filter_}&per-page={len(batch)}&{cls._select_param(select)}"
             )
+            try:
+                data = await cls.__GET(url)
+            except Exception as e:
+                print(f"Error resolving DOIs: {e}")
+                return []
+            batch_works = []
+            for result in data["results"]:
+                try:
+                    batch_works.append(WorkObject(**result))
+                except ValidationError:
+                    pass
+            return batch_works
 
-            # Extract the sorted IDs
-            sorted_ids = [work["id"] for work in sorted_works]
+        async def fetch_one(doi_url: str) -> list[WorkObject]:
+            """Fetch the work of a single DOI from the OpenAlex API."""
+            url = f"{cls.API_URL}{doi_url}?{cls._select_param(select)}"
+            try:
+                return [WorkObject(**await cls.__GET(url))]
+            except Exception as e:
+                print(f"Error resolving DOI {doi_url}: {e}")
+                return []
 
-            # Limit the number of IDs
-            citation_ids = sorted_ids[:limit]
+        fetches = [*map(fetch_batch, batches), *map(fetch_one, special)]
+        fetched = [work for works in await asyncio.gather(*fetches) for work in works]
 
-            # TODO: what happens if the cursor is missing some works?
-            citation_works = {
-                work["id"]: WorkObject(**work) for work in sorted_works[:limit]
-            }
+        # Save the new DOIs to the store as partial works
+        fetched = [work for work in fetched if work.doi is not None]
+        await cls._save_works(fetched, select=select)
+        ids.update((normalize_doi(str(work.doi)), str(work.id)) for work in fetched)
 
-            return citation_ids, citation_works
+        return {doi: ids[url] for doi, url in normalized.items() if url in ids}
 
-        per_page: int = 200  # OpenAlex supports 1-200 per page
-        limit = min(limit, 10000)  # Ensure limit is under 10,000 (OpenAlex API limit)
+    @staticmethod
+    def _get_from_cache(
+        work_ids: list[str], select: list[str] | None = None
+    ) -> dict[str, WorkObject]:
+        """
+        Get works from the in-process cache.
 
-        url = f"https://api.openalex.org/works?filter=cites:{self.entity_id}"
+        Args:
+            work_ids (list[str]): ID URLs of the works
+            select (list[str] | None): Normalized fields to select
 
-        citations: list[dict] = []
-        total_citations = None
-        page: int = 1
-        max_pages: int = 1
+        Returns:
+            dict[str, WorkObject]: Dictionary of {id: WorkObject} of the cached works
+        """
+        works = {}
+        for work_id in work_ids:
+            cached = work_cache.get(work_id, select)
+            if cached is not None:
+                works[work_id] = cached.work
+        return works
+
+    @classmethod
+    async def _find_works(
+        cls, work_ids: list[str], select: list[str] | None = None
+    ) -> tuple[dict[str, WorkObject], list[str]]:
+        """
+        Find works in the store with a single lookup and add them to the
+        in-process cache.
 
-        citation_ids = []
-        citation_works = {}
+        Args:
+            work_ids (list[str]): ID URLs of the works
+            select (list[str] | None): Normalized fields to select
 
-        await self.data  # Ensure the work data is fetched
-        while len(citations) < limit and len(citations) < self._data.cited_by_count:
-            try:
-                data = await self.__GET(url + f"&page={page}&per-page={per_page}")
-            except Exception as e:
-                print(f"Error fetching data: {e}")
-                break
+        Returns:
+            tuple[dict[str, WorkObject], list[str]]:
+                - Dictionary of {id: WorkObject} of the works found
+                - IDs of the works stored with fewer fields than requested
+        """
+        works, partial_ids = {}, []
+        if not work_ids:
+            return works, partial_ids
+
+        for data in await get_store().get_works(work_ids):
+            partial = data.get("_partial")
+            if covers(partial, select):
+                works[data["id"]] = load_work(data)
+                work_cache.put(works[data["id"]], partial)
+            else:
+                partial_ids.append(data["id"])
+        return works, partial_ids
+
+    @classmethod
+    async def _save_works(
+        cls, works: list[WorkObject], select: list[str] | None = None
+    ) -> UpsertResult:
+        """
+        Upsert works into the store with batched bulk writes.
 
-            new_citations = data["results"]
-            if not new_citations:
-                break
-            citations.extend(new_citations)
+        Args:
+            works (list[WorkObject]): Works to save
+            select (list[str] | None): Normalized fields the works were fetched with
 
-            for citation in new_citations:
-                try:
-                    citation_id = citation.get("id")
-                    if citation_id:
-                        citation_ids.append(citation_id)
-                        citation_works[citation_id] = WorkObject(**citation)
-                    # TODO: handle citations without IDs (shouldn't happen)
-                except OpenAlexError or ValidationError:
-                    pass
+        Returns:
+            UpsertResult: Number of works inserted and modified
+        """
+        if not works:
+            return UpsertResult()
+        return await get_store().upsert_works(works, partial=select)
+
+    @classmethod
+    async def _fetch_pages(
+        cls,
+        url: str,
+        limit: int,
+        per_page: int = 200,
+        parallel: bool = True,
+        offset: int = 0,
+    ) -> tuple[list[dict], int | None]:
+        """
+        Fetch the results of a paginated OpenAlex list endpoint.
+        The first page reveals the total count, after which the remaining pages
+        are fetched concurrently (bounded by the limiter) or one at a time.
 
-            if total_citations is None:
-                total_citations = data["meta"]["count"]
-                max_pages = (total_citations + len(new_citations) - 1) // len(
-                    new_citations
-                )
-                limit = min(limit, total_citations)
+        Args:
+            url (str): URL to the OpenAlex list endpoint, including its filter
+            limit (int): Number of results needed, counting from the first result.
+                Whole pages are fetched, so more results than the limit
+                may be returned.
+            per_page (int): Number of results per page. Maximum: 200.
+            parallel (bool): Whether to fetch the pages after the first concurrently.
+            offset (int): Number of results fetched before, a multiple of
+                `per_page`. Fetching starts at the page after them.
 
-            if page >= max_pages:
-                break
-            page += 1
+        Returns:
+            tuple[list[dict], int | None]:
+                - Results of the fetched pages, in page order
+                - Total count of the results, or None if the first page failed
+        """
+        if limit <= offset:
+            return [], None
+
+        async def fetch_page(page: int) -> list[dict]:
+            """Fetch a single page of results."""
+            data = await cls.__GET(url + f"&page={page}&per-page={per_page}")
+            return data["results"]
+
+        first_page = offset // per_page + 1
+        try:
+            data = await cls.__GET(url + f"&page={first_page}&per-page={per_page}")
+        except Exception as e:
+            print(f"Error fetching data: {e}")
+            return [], None
+
+        results: list[dict] = data["results"]
+        count: int = data["meta"]["count"]
+        if not results:
+            return results, count
+
+        total = min(limit, count)
+        max_pages = (total + per_page - 1) // per_page
+        pages = range(first_page + 1, max_pages + 1)
+
+        if parallel:
+            # Pages are returned in the order they were requested
+            for page_results in await asyncio.gather(
+                *map(fetch_page, pages), return_exceptions=True
+            ):
+                if isinstance(page_results, Exception):
+                    print(f"Error fetching data: {page_results}")
+                    break
+                results.extend(page_results)
+        else:
+            for page in pages:
+                try:
+                    page_results = await fetch_page(page)
+                except Exception as e:
+                    print(f"Error fetching data: {e}")
+                    break
+                if not page_results:
+                    break
+                results.extend(page_results)
+
+        return results, count
+
+    async def _get_cached_works(
+        self, work_ids: list[str], limit: int, select: list[str] | None = None
+    ) -> tuple[list[str], dict[str, WorkObject]]:
+        """
+        Get cached citation or reference works from the store,
+        sorted by `cited_by_count` in descending order, ties in stored order.
+        Works missing from the store or stored with fewer fields than requested
+        are fetched in bulk.
 
-        # Save the Citation IDs to MongoDB
-        await self.mongo_collection_citations.update_one(
-            filter={"id": self.idx},
-            update={"$set": {"citations": citation_ids}},
-            upsert=True,
+        Args:
+            work_ids (list[str]): ID URLs of the works
+            limit (int): Maximum number of works to return
+            select (list[str] | None): Normalized fields to select
+
+        Returns:
+            tuple[list[str], dict[str, WorkObject]]:
+                - List of IDs URLs of the works
+                - Dictionary of {id: WorkObject} of the works
+        """
+        works = self._get_from_cache(work_ids, select)
+
+        # Fetch all the other works in a single query
+        missing = [work_id for work_id in work_ids if work_id not in works]
+        works.update((await self._find_works(missing, select))[0])
+
+        # Fetch the works missing from the store or missing requested fields
+        missing = [work_id for work_id in work_ids if work_id not in works]
+        if missing:
+            works.update(await self.get_many(missing, select=select))
+
+        # Select the top works by 'cited_by_count' in descending order.
+        # Ties keep the stored order, e.g. when the count was not selected.
+        found = [work_id for work_id in dict.fromkeys(work_ids) if work_id in works]
+        sorted_ids = heapq.nlargest(
+            limit, found, key=lambda work_id: works[work_id].cited_by_count or 0
         )
+        return sorted_ids, {work_id: works[work_id] for work_id in sorted_ids}
 
-        if save_all:
-            # Save the Citation Works to MongoDB
-            for citation_work in citation_works.values():
-                await self.mongo_collection_works.update_one(
-                    filter={"id": str(citation_work.id)},
-                    update={"$set": citation_work.model_dump(mode="json")},
-                    upsert=True,
-                )
+    async def citations(
+        self,
+        limit: int = 1000,
+        save_all: bool = False,
+        parallel: bool = True,
+        select: list[str] | None = None,
+    ) -> tuple[list[str], dict[str, WorkObject]]:
+        """
+        Get the citations of the work from the OpenAlex API.
+        Works that cite the given work. Incoming citations.
+        Citations are fetched by descending citation count. When fewer were
+        stored than requested, only the missing pages are fetched.
 
-            return citation_ids, citation_works
-        else:
-            return_citations = {}
-            # Save only the Works within the limit to MongoDB
-            for cit_id in citation_ids[:limit]:
-                citation_work = citation_works[cit_id]
-                return_citations[cit_id] = citation_work
-                await self.mongo_collection_works.update_one(
-                    filter={"id": str(citation_work.id)},
-                    update={"$set": citation_work.model_dump(mode="json")},
-                    upsert=True,
-                )
-            return citation_ids[:limit], return_citations
+        Args:
+            limit (int): Maximum number of citations to fetch.
+                Default: 1000. Maximum: 10,000.
+            save_all (bool): Whether to save and return all the works fetched
+                beyond the limit.
+            parallel (bool): Whether to fetch the pages after the first concurrently.
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
+
+        Returns:
+            tuple[list[str], dict[str, WorkObject]]:
+                - List of IDs URLs of the citations
+                - Dictionary of {id: WorkObject} of all the citation works
+        """
+        select = self._select_fields(select)
+
+        # Coalesce concurrent requests for the same citations
+        key = ("citations", self.idx, limit, save_all, select and tuple(select))
+        ids, works = await flight.do(
+            key, lambda: self._links("citations", limit, save_all, parallel, select)
+        )
+        return list(ids), dict(works)
 
     async def references(
-        self, limit: int = 1000, save_all: bool = False
+        self,
+        limit: int = 1000,
+        save_all: bool = False,
+        parallel: bool = True,
+        select: list[str] | None = None,
     ) -> tuple[list[str], dict[str, WorkObject]]:
         """
         Get the references of the work from the OpenAlex API.
         Works that the given work cites. Outgoing citations.
+        References are fetched by descending citation count. When fewer were
+        stored than requested, only the missing pages are fetched.
 
         Args:
             limit (int): Maximum number of references to fetch.
                 Default: 1000. Maximum: 10,000.
-            save_all (bool): Whether to save all the citations beyond the limit.
+            save_all (bool): Whether to save and return all the works fetched
+                beyond the limit.
+            parallel (bool): Whether to fetch the pages after the first concurrently.
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
 
         Returns:
             tuple[list[str], dict[str, WorkObject]]:
                 - List of IDs URLs of the references
                 - Dictionary of {id: WorkObject} of all the referenced works
         """
-        # Try to get the references from MongoDB
-        db_references = await self.mongo_collection_references.find_one(
-            {"id": self.idx}
-        )
-
-        if db_references:
-            # Get the reference IDs from MongoDB
-            reference_ids = db_references["references"]
-
-            # Fetch all reference works in a single query
-            reference_works_cursor = self.mongo_collection_works.find(
-                {"id": {"$in": reference_ids}}
-            )
-
-            # Convert cursor to list
-            reference_works_list = await reference_works_cursor.to_list(length=None)
+        select = self._select_fields(select)
 
-            # Sort the list of works by 'cited_by_count' in descending order
-            sorted_works = sorted(
-                reference_works_list, key=lambda x: x["cited_by_count"], reverse=True
-            )
+        # Coalesce concurrent requests for the same references
+        key = ("references", self.idx, limit, save_all, select and tuple(select))
+        ids, works = await flight.do(
+            key, lambda: self._links("references", limit, save_all, parallel, select)
+        )
+        return list(ids), dict(works)
+
+    async def _links(
+        self,
+        collection: str,
+        limit: int = 1000,
+        save_all: bool = False,
+        parallel: bool = True,
+        select: list[str] | None = None,
+    ) -> tuple[list[str], dict[str, WorkObject]]:
+        """
+        Get the citations or references of the work. See `Work.citations`.
 
-            # Extract the sorted IDs
-            sorted_ids = [work["id"] for work in sorted_works]
+        Stored lists record the number of results fetched (`limit`), the total
+        count (`count`) and whether they hold every result (`complete`).
+        Lists holding enough results are served from the store, and lists
+        fetched with a lower limit are topped up from the next page on.
+        Lists without a count were built from the referenced works of other
+        works, with no page order, so they are fetched again from page 1.
 
-            # Limit the number of IDs
-            reference_ids = sorted_ids[:limit]
+        Args:
+            collection (str): "citations" or "references"
+            limit (int): Maximum number of works to return. Maximum: 10,000.
+            save_all (bool): Whether to save and return the works fetched
+                beyond the limit
+            parallel (bool): Whether to fetch the pages after the first concurrently
+            select (list[str] | None): Normalized fields to fetch
 
-            # TODO: what happens if the cursor is missing some works?
-            reference_works = {
-                work["id"]: WorkObject(**work) for work in sorted_works[:limit]
-            }
+        Returns:
+            tuple[list[str], dict[str, WorkObject]]:
+                - List of IDs URLs of the works
+                - Dictionary of {id: WorkObject} of the works
+        """
+        limit = min(limit, 10000)  # Ensure limit is under 10,000 (OpenAlex API limit)
+        store = get_store()
+
+        ids, fetched = [], 0
+        doc = await store.get_link(collection, self.idx)
+        if doc is not None and (
+            doc.get("complete", True)
+            or ("count" in doc and doc.get("limit", 0) >= min(limit, doc["count"]))
+        ):
+            return await self._get_cached_works(doc[collection][:limit], limit, select)
+        if doc is not None and "count" in doc:
+            ids, fetched = doc[collection], doc.get("limit", 0)
+
+        if collection == "citations" and not fetched:
+            # Ensure the citation count is fetched, even if the work data is partial
+            if self._data is None or not covers(self._select, ["cited_by_count"]):
+                await self.get(select=None if select is None else ["cited_by_count"])
+            limit = min(limit, self._data.cited_by_count or 0)
+            if limit == 0:
+                # Nothing is stored, so the list is fetched once the work is cited
+                return [], {}
+
+        filter_ = "cites" if collection == "citations" else "cited_by"
+        url = (
+            "https://api.openalex.org/works"
+            f"?filter={filter_}:{self.entity_id}&sort=cited_by_count:desc"
+        )
+        if select is not None:
+            url += f"&{self._select_param(select)}"
 
-            return reference_ids, reference_works
+        results, count = await self._fetch_pages(
+            url, limit, parallel=parallel, offset=fetched
+        )
+        if count is None and limit > 0:
+            # The API request failed, so the stored list is unchanged
+            return await self._get_cached_works(ids[:limit], limit, select)
 
-        per_page: int = 200  # OpenAlex supports 1-200 per page
-        limit = min(limit, 10000)  # Ensure limit is under 10,000 (OpenAlex API limit)
+        works = {}
+        for result in results:
+            try:
+                work_id = result.get("id")
+                if work_id:
+                    works[work_id] = WorkObject(**result)
+            except (OpenAlexError, ValidationError):
+                pass
+        work_cache.put_many(works.values(), select)
+
+        # Pages can overlap if citation counts changed since the previous fetch
+        ids = list(dict.fromkeys([*ids, *works]))
+        fetched += len(results)
+        count = len(ids) if count is None else count
+        await store.upsert_links(
+            collection,
+            [
+                {
+                    "id": self.idx,
+                    collection: ids,
+                    "limit": fetched,
+                    "count": count,
+                    "complete": fetched >= count,
+                    "_fetched_at": fetch_timestamp(),
+                }
+            ],
+        )
 
-        url = f"https://api.openalex.org/works?filter=cited_by:{self.entity_id}"
+        # Save and return the works within the limit, or all the works fetched
+        returned = ids if save_all else ids[:limit]
+        if not save_all:
+            within = set(returned)
+            works = {work_id: w for work_id, w in works.items() if work_id in within}
+        await self._save_works(list(works.values()), select=select)
+
+        return await self._get_cached_works(returned, len(returned), select)
+
+    async def iter_citations(
+        self,
+        limit: int | None = None,
+        per_page: int = 200,
+        save: bool = True,
+        select: list[str] | None = None,
+    ) -> AsyncIterator[WorkObject]:
+        """
+        Iterate over the citations of the work from the OpenAlex API.
+        Works that cite the given work. Incoming citations.
 
-        references: list[dict] = []
-        total_references = None
-        page: int = 1
-        max_pages: int = 1
+        Uses cursor pagination, so there is no 10,000 result cap, and yields
+        the works of each page as soon as it arrives.
 
-        reference_ids = []
-        reference_works = {}
+        Args:
+            limit (int | None): Maximum number of citations to yield.
+                Default: None (all citations).
+            per_page (int): Number of citations to fetch per page. Maximum: 200.
+            save (bool): Whether to save each page of works to the store.
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
+
+        Yields:
+            WorkObject: Citation work
+        """
+        async for work in self._iter_works(
+            f"cites:{self.entity_id}",
+            limit=limit,
+            per_page=per_page,
+            save=save,
+            select=select,
+        ):
+            yield work
+
+    async def iter_references(
+        self,
+        limit: int | None = None,
+        per_page: int = 200,
+        save: bool = True,
+        select: list[str] | None = None,
+    ) -> AsyncIterator[WorkObject]:
+        """
+        Iterate over the references of the work from the OpenAlex API.
+        Works that the given work cites. Outgoing citations.
 
-        while len(references) < limit:
-            try:
-                data = await self.__GET(url + f"&page={page}&per-page={per_page}")
-            except Exception as e:
-                print(f"Error fetching data: {e}")
-                break
+        Uses cursor pagination and yields the works of each page
+        as soon as it arrives.
 
-            new_references = data["results"]
-            if not new_references:
-                break
-            references.extend(new_references)
+        Args:
+            limit (int | None): Maximum number of references to yield.
+                Default: None (all references).
+            per_page (int): Number of references to fetch per page. Maximum: 200.
+            save (bool): Whether to save each page of works to the store.
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
+
+        Yields:
+            WorkObject: Referenced work
+        """
+        async for work in self._iter_works(
+            f"cited_by:{self.entity_id}",
+            limit=limit,
+            per_page=per_page,
+            save=save,
+            select=select,
+        ):
+            yield work
+
+    @classmethod
+    async def _iter_works(
+        cls,
+        filter_: str,
+        limit: int | None = None,
+        per_page: int = 200,
+        save: bool = True,
+        select: list[str] | None = None,
+    ) -> AsyncIterator[WorkObject]:
+        """
+        Iterate over the works matching an OpenAlex filter using cursor pagination.
 
-            for reference in new_references:
+        Args:
+            filter_ (str): OpenAlex filter, e.g. `cites:W2741809807`
+            limit (int | None): Maximum number of works to yield.
+            per_page (int): Number of works to fetch per page. Maximum: 200.
+            save (bool): Whether to save each page of works to the store.
+            select (list[str] | None): Fields to fetch, e.g. `Work.LEAN_FIELDS`.
+                Default: None (all fields).
+
+        Yields:
+            WorkObject: Work matching the filter
+        """
+        per_page = max(1, min(per_page, 200))  # OpenAlex supports 1-200 per page
+        url = f"https://api.openalex.org/works?filter={filter_}&per-page={per_page}"
+        select = cls._select_fields(select)
+        if select is not None:
+            url += f"&{cls._select_param(select)}"
+
+        count = 0
+        cursor = "*"
+        while cursor and (limit is None or count < limit):
+            data = await cls.__GET(f"{url}&cursor={cursor}")
+
+            works = []
+            for result in data["results"]:
                 try:
-                    reference_id = reference.get("id")
-                    if reference_id:
-                        reference_ids.append(reference_id)
-                        reference_works[reference_id] = WorkObject(**reference)
-                    # TODO: handle references without IDs (shouldn't happen)
+                    works.append(WorkObject(**result))
                 except ValidationError:
                     pass
-
-            if total_references is None:
-                total_references = data["meta"]["count"]
-                max_pages = (total_references + len(new_references) - 1) // len(
-                    new_references
-                )
-                limit = min(limit, total_references)
-
-            if page >= max_pages:
+            if not data["results"]:
                 break
-            page += 1
 
-        # Save the Reference IDs to MongoDB
-        await self.mongo_collection_references.update_one(
-            filter={"id": self.idx},
-            update={"$set": {"references": reference_ids}},
-            upsert=True,
-        )
+            if limit is not None:
+                works = works[: limit - count]
+            if save:
+                await cls._save_works(works, select=select)
+            work_cache.put_many(works, select)
 
-        if save_all:
-            # Save the Reference Works to MongoDB
-            for reference_work in reference_works.values():
-                await self.mongo_collection_works.update_one(
-                    filter={"id": str(reference_work.id)},
-                    update={"$set": reference_work.model_dump(mode="json")},
-                    upsert=True,
-                )
+            for work in works:
+                yield work
+            count += len(works)
 
-            return reference_ids, reference_works
-        else:
-            return_references = {}
-            # Save only the Works within the limit to MongoDB
-            for ref_id in reference_ids[:limit]:
-                try:
-                    reference_work = reference_works[ref_id]
-                    return_references[ref_id] = reference_work
-                    await self.mongo_collection_works.update_one(
-                        filter={"id": str(reference_work.id)},
-                        update={"$set": reference_work.model_dump(mode="json")},
-                        upsert=True,
-                    )
-                except KeyError:
-                    pass
-            return reference_ids[:limit], return_references
+            cursor = data["meta"].get("next_cursor")
@@ -1 +1,51 @@
 """buff.store package"""
+
+import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import WorkStore
+
+_store: "WorkStore | None" = None
+
+
+def get_store() -> "WorkStore":
+    """
+    Get the works store.
+    The backend is chosen by the `BUFF_STORE` environment variable:
+    "mongo" (default) for MongoDB or "local" for the embedded SQLite store,
+    whose path can be set with `BUFF_STORE_PATH`.
+
+    Returns:
+        WorkStore: The works store
+    """
+    global _store
+
+    if _store is None:
+        backend = os.getenv("BUFF_STORE", "mongo").lower()
+        if backend == "local":
+            from .local import LOCAL_STORE_FP, LocalStore
+
+            _store = LocalStore(os.getenv("BUFF_STORE_PATH") or LOCAL_STORE_FP)
+        elif backend == "mongo":
+            from .mongo import MongoStore
+
+            _store = MongoStore()
+        else:
+            raise ValueError(f"Invalid BUFF_STORE backend: {backend}")
+
+    return _store
+
+
+def set_store(store: "WorkStore") -> None:
+    """
+    Set the works store, e.g. to use a LocalStore in tests.
+
+    Args:
+        store (WorkStore): The works store
+    """
+    global _store
+    _store = store
+
+
+__all__ = ["get_store", "set_store"]
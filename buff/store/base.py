@@ -0,0 +1,268 @@
+"""buff/store/base.py"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, AsyncIterator, NamedTuple
+
+if TYPE_CHECKING:
+    from buff.openalex.models import WorkObject
+
+# Collections holding the citation and reference ID lists of works
+LINK_COLLECTIONS = ("citations", "references")
+
+# Number of documents written per bulk write
+DEFAULT_BATCH_SIZE = 1000
+
+
+def fetch_timestamp() -> str:
+    """
+    Get the current time as the timestamp stored under `_fetched_at`.
+
+    Returns:
+        str: UTC time in ISO 8601 format, which sorts chronologically
+    """
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class UpsertResult(NamedTuple):
+    """Number of documents inserted and modified by an upsert"""
+
+    inserted: int = 0
+    modified: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(
+            self.inserted + other.inserted, self.modified + other.modified
+        )
+
+
+class WorkStore(ABC):
+    """
+    Storage backend for OpenAlex works and their citation and reference lists.
+
+    Works are stored as documents shaped like `WorkObject.model_dump(mode="json")`.
+    Works fetched with a `select` projection are partial: they only hold their
+    selected fields, which are recorded under `_partial`.
+    Works are tagged under `_model_version` with the version of the models
+    they were validated against, so they can be loaded without validation,
+    and under `_fetched_at` with the time they were last saved or confirmed
+    up to date, so stale works can be refreshed.
+    Citation and reference lists are stored as `{"id": ..., "<collection>": [...]}`.
+
+    Upserts are written in unordered bulk writes of `batch_size` documents.
+    """
+
+    batch_size: int = DEFAULT_BATCH_SIZE
+
+    @abstractmethod
+    async def get_work(self, work_id: str) -> dict | None:
+        """
+        Get a work document.
+
+        Args:
+            work_id (str): ID URL of the work
+
+        Returns:
+            dict | None: Work document, or None if not stored
+        """
+
+    @abstractmethod
+    async def get_works(self, work_ids: list[str]) -> list[dict]:
+        """
+        Get many work documents in a single lookup.
+
+        Args:
+            work_ids (list[str]): ID URLs of the works
+
+        Returns:
+            list[dict]: Work documents found, in no particular order
+        """
+
+    @abstractmethod
+    def iter_works(
+        self, fields: list[str] | None = None, batch_size: int | None = None
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over all the stored work documents, fetched in batches.
+
+        Args:
+            fields (list[str] | None): Top-level fields to project the documents on,
+                or None for all fields. Fields missing from a work are omitted.
+            batch_size (int | None): Number of documents fetched per round-trip.
+                Default: the store's `batch_size`.
+
+        Yields:
+            dict: Work documents, in no particular order
+        """
+
+    @abstractmethod
+    async def get_ids_by_doi(self, dois: list[str]) -> dict[str, str]:
+        """
+        Look up the IDs of the stored works with the given DOIs.
+
+        Args:
+            dois (list[str]): DOI URLs, e.g. "https://doi.org/10.1234/abc"
+
+        Returns:
+            dict[str, str]: {DOI URL: ID URL} of the DOIs found
+        """
+
+    @abstractmethod
+    async def upsert_works(
+        self,
+        works: list["WorkObject"],
+        partial: list[str] | None = None,
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        """
+        Insert or update many works.
+        Complete works replace every field and clear the partial marker.
+        Partial works only set their selected fields and are marked partial
+        if newly inserted.
+
+        Args:
+            works (list[WorkObject]): Works to save
+            partial (list[str] | None): Fields the works were fetched with,
+                or None if the works are complete
+            batch_size (int | None): Number of works per bulk write.
+                Default: the store's `batch_size`.
+
+        Returns:
+            UpsertResult: Number of works inserted and modified
+        """
+
+    @abstractmethod
+    async def get_link(self, collection: str, work_id: str) -> dict | None:
+        """
+        Get the citations or references document of a work.
+
+        Args:
+            collection (str): "citations" or "references"
+            work_id (str): ID URL of the work
+
+        Returns:
+            dict | None: Citations or references document, or None if not stored
+        """
+
+    @abstractmethod
+    async def get_links(self, collection: str, work_ids: list[str]) -> list[dict]:
+        """
+        Get the citations or references documents of many works.
+
+        Args:
+            collection (str): "citations" or "references"
+            work_ids (list[str]): ID URLs of the works
+
+        Returns:
+            list[dict]: Citations or references documents found
+        """
+
+    @abstractmethod
+    async def upsert_links(
+        self, collection: str, docs: list[dict], batch_size: int | None = None
+    ) -> UpsertResult:
+        """
+        Insert or update the citations or references documents of many works.
+        The fields of each document are set on the stored document.
+
+        Args:
+            collection (str): "citations" or "references"
+            docs (list[dict]): Documents to save, each with an `id`
+            batch_size (int | None): Number of documents per bulk write.
+                Default: the store's `batch_size`.
+
+        Returns:
+            UpsertResult: Number of documents inserted and modified
+        """
+
+    @abstractmethod
+    async def add_links(
+        self,
+        collection: str,
+        links: dict[str, list[str]],
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        """
+        Add IDs to the citations or references lists of many works,
+        skipping the IDs already in the lists.
+        Documents created this way are marked `complete: False`, since they
+        only hold the links seen so far.
+
+        Args:
+            collection (str): "citations" or "references"
+            links (dict[str, list[str]]): {id: [ID URLs to add]} of the works
+            batch_size (int | None): Number of documents per bulk write.
+                Default: the store's `batch_size`.
+
+        Returns:
+            UpsertResult: Number of documents inserted and modified
+        """
+
+    @abstractmethod
+    async def mark_fetched(
+        self, collection: str, ids: list[str], fetched_at: str | None = None
+    ) -> None:
+        """
+        Set the `_fetched_at` timestamp of stored documents, e.g. of works
+        confirmed unchanged by a refresh.
+
+        Args:
+            collection (str): "works", "citations" or "references"
+            ids (list[str]): ID URLs of the documents
+            fetched_at (str | None): Timestamp. Default: `fetch_timestamp()`.
+        """
+
+    @abstractmethod
+    async def set_work_fields(self, values: dict[str, dict]) -> UpsertResult:
+        """
+        Set fields of stored works, e.g. their graph ranks under `_ranks`.
+        Works that are not stored are skipped.
+
+        Args:
+            values (dict[str, dict]): {id: {field: value}} of the works
+
+        Returns:
+            UpsertResult: Number of works modified
+        """
+
+    async def get_citations(self, work_id: str) -> dict | None:
+        """Get the citations document of a work."""
+        return await self.get_link("citations", work_id)
+
+    async def get_many_citations(self, work_ids: list[str]) -> list[dict]:
+        """Get the citations documents of many works."""
+        return await self.get_links("citations", work_ids)
+
+    async def upsert_citations(self, docs: list[dict]) -> UpsertResult:
+        """Insert or update the citations documents of many works."""
+        return await self.upsert_links("citations", docs)
+
+    async def add_citations(self, links: dict[str, list[str]]) -> UpsertResult:
+        """Add IDs to the citations lists of many works."""
+        return await self.add_links("citations", links)
+
+    async def get_references(self, work_id: str) -> dict | None:
+        """Get the references document of a work."""
+        return await self.get_link("references", work_id)
+
+    async def get_many_references(self, work_ids: list[str]) -> list[dict]:
+        """Get the references documents of many works."""
+        return await self.get_links("references", work_ids)
+
+    async def upsert_references(self, docs: list[dict]) -> UpsertResult:
+        """Insert or update the references documents of many works."""
+        return await self.upsert_links("references", docs)
+
+    async def migrate(self) -> list[int]:
+        """
+        Apply the pending schema migrations, e.g. index builds, of the store.
+
+        Returns:
+            list[int]: Versions of the migrations applied
+        """
+        return []
+
+    def _batches(self, items: list, batch_size: int | None = None) -> list[list]:
+        """Split items into batches of `batch_size`, or the store's batch size."""
+        batch_size = max(1, batch_size or self.batch_size)
+        return [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
@@ -0,0 +1,342 @@
+"""buff/store/local.py"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+from buff.openalex.construct import get_model_version
+from buff.openalex.models import WorkObject
+from config import DATA_DIR
+
+from .base import (
+    DEFAULT_BATCH_SIZE,
+    LINK_COLLECTIONS,
+    UpsertResult,
+    WorkStore,
+    fetch_timestamp,
+)
+
+LOCAL_STORE_FP = DATA_DIR.joinpath("openalex.db")
+
+# SQLite limits the number of host parameters in a single statement
+MAX_PARAMS = 900
+
+
+class LocalStore(WorkStore):
+    """
+    WorkStore backed by an embedded SQLite database on local disk.
+
+    Documents are stored as JSON, keyed by the work ID, with the DOI and
+    publication year of works kept in their own indexed columns.
+    The schema and its indexes are created when the store is opened.
+    """
+
+    def __init__(
+        self, db_fp: Path | str = LOCAL_STORE_FP, batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> None:
+        """
+        Initialize the LocalStore object.
+
+        Args:
+            db_fp (Path | str): Path to the SQLite database, or ":memory:"
+            batch_size (int): Number of documents written per transaction
+        """
+        self.db_fp = db_fp
+        self.batch_size = batch_size
+
+        self._lock = threading.RLock()
+        # Wait for the other processes writing to the database, e.g. ingest workers
+        self._conn = sqlite3.connect(db_fp, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS works ("
+            "id TEXT PRIMARY KEY, doi TEXT, publication_year INTEGER, data TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS works_doi ON works (doi)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS works_publication_year "
+            "ON works (publication_year)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS works_pdf_url "
+            "ON works (json_extract(data, '$.best_oa_location.pdf_url')) "
+            "WHERE json_extract(data, '$.best_oa_location.pdf_url') IS NOT NULL"
+        )
+        for collection in LINK_COLLECTIONS:
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{collection}" '
+                "(id TEXT PRIMARY KEY, data TEXT)"
+            )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    async def get_work(self, work_id: str) -> dict | None:
+        docs = await asyncio.to_thread(self._select, "works", [work_id])
+        return docs[0] if docs else None
+
+    async def get_works(self, work_ids: list[str]) -> list[dict]:
+        return await asyncio.to_thread(self._select, "works", work_ids)
+
+    async def iter_works(
+        self, fields: list[str] | None = None, batch_size: int | None = None
+    ) -> AsyncIterator[dict]:
+        # Page through the works by ID, so writes between pages are not blocked
+        after = ""
+        while True:
+            docs = await asyncio.to_thread(
+                self._select_page, after, batch_size or self.batch_size, fields
+            )
+            for doc in docs:
+                yield doc
+            if not docs:
+                return
+            after = docs[-1]["id"]
+
+    async def get_ids_by_doi(self, dois: list[str]) -> dict[str, str]:
+        return await asyncio.to_thread(self._select_ids_by_doi, dois)
+
+    async def upsert_works(
+        self,
+        works: list[WorkObject],
+        partial: list[str] | None = None,
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        result = UpsertResult()
+        for batch in self._batches(works, batch_size):
+            result += await asyncio.to_thread(self._upsert_works, batch, partial)
+        return result
+
+    async def get_link(self, collection: str, work_id: str) -> dict | None:
+        docs = await asyncio.to_thread(self._select, collection, [work_id])
+        return docs[0] if docs else None
+
+    async def get_links(self, collection: str, work_ids: list[str]) -> list[dict]:
+        return await asyncio.to_thread(self._select, collection, work_ids)
+
+    async def upsert_links(
+        self, collection: str, docs: list[dict], batch_size: int | None = None
+    ) -> UpsertResult:
+        result = UpsertResult()
+        for batch in self._batches(docs, batch_size):
+            result += await asyncio.to_thread(self._upsert_links, collection, batch)
+        return result
+
+    async def add_links(
+        self,
+        collection: str,
+        links: dict[str, list[str]],
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        result = UpsertResult()
+        for batch in self._batches(list(links.items()), batch_size):
+            result += await asyncio.to_thread(self._add_links, collection, batch)
+        return result
+
+    async def mark_fetched(
+        self, collection: str, ids: list[str], fetched_at: str | None = None
+    ) -> None:
+        fetched_at = fetched_at or fetch_timestamp()
+        await asyncio.to_thread(self._mark_fetched, collection, ids, fetched_at)
+
+    async def set_work_fields(self, values: dict[str, dict]) -> UpsertResult:
+        return await asyncio.to_thread(self._set_work_fields, values)
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        """
+        Hold the write lock of the database for a read-modify-write.
+        The documents read inside cannot be changed by other processes, e.g.
+        ingest workers, before they are written back, and the writes are
+        committed together, or rolled back on error.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def _select(self, table: str, ids: list[str]) -> list[dict]:
+        """Select the documents with the given IDs from a table."""
+        ids = list(dict.fromkeys(ids))
+        docs = []
+        with self._lock:
+            for i in range(0, len(ids), MAX_PARAMS):
+                batch = ids[i : i + MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f'SELECT data FROM "{table}" WHERE id IN ({placeholders})', batch
+                )
+                docs.extend(json.loads(data) for (data,) in rows)
+        return docs
+
+    def _select_page(
+        self, after: str, limit: int, fields: list[str] | None
+    ) -> list[dict]:
+        """Select the works after an ID, in ID order, projected on the fields."""
+        if fields is None:
+            data = "data"
+        else:
+            # Extract the fields in SQLite rather than decoding whole documents
+            data = "json_object({})".format(
+                ", ".join(f"'{f}', data -> '$.{f}'" for f in {"id", *fields})
+            )
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {data} FROM works WHERE id > ? ORDER BY id LIMIT ?",
+                (after, limit),
+            ).fetchall()
+
+        docs = [json.loads(doc) for (doc,) in rows]
+        if fields is not None:
+            docs = [{k: v for k, v in doc.items() if v is not None} for doc in docs]
+        return docs
+
+    def _select_ids_by_doi(self, dois: list[str]) -> dict[str, str]:
+        """Select the IDs of the works with the given DOIs."""
+        dois = list(dict.fromkeys(dois))
+        ids = {}
+        with self._lock:
+            for i in range(0, len(dois), MAX_PARAMS):
+                batch = dois[i : i + MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT doi, id FROM works WHERE doi IN ({placeholders})", batch
+                )
+                ids.update(rows)
+        return ids
+
+    def _upsert_works(
+        self, works: list[WorkObject], partial: list[str] | None
+    ) -> UpsertResult:
+        """Merge the works into their stored documents, mirroring MongoStore."""
+        with self._write():
+            existing = {
+                doc["id"]: doc
+                for doc in self._select("works", [str(w.id) for w in works])
+            }
+
+            rows = []
+            inserted = modified = 0
+            model_version = get_model_version()
+            fetched_at = fetch_timestamp()
+            for work in works:
+                work_id = str(work.id)
+                doc = existing.get(work_id)
+                previous = None if doc is None else dict(doc)
+                if partial is None:
+                    # Complete works replace every field and clear the marker
+                    doc = {**(doc or {}), **work.model_dump(mode="json")}
+                    doc["_model_version"] = model_version
+                    doc.pop("_partial", None)
+                elif doc is None:
+                    doc = {**work.model_dump(mode="json", exclude_unset=True)}
+                    doc["_partial"] = partial
+                    doc["_model_version"] = model_version
+                else:
+                    doc.update(work.model_dump(mode="json", exclude_unset=True))
+                    # Partial works gain the newly selected fields
+                    if "_partial" in doc:
+                        doc["_partial"] = sorted({*doc["_partial"], *partial})
+                existing[work_id] = doc
+                if previous is None:
+                    inserted += 1
+                elif doc != previous:
+                    modified += 1
+                # Stamped after comparing, so unchanged works are not modified
+                doc["_fetched_at"] = fetched_at
+                rows.append(
+                    (
+                        work_id,
+                        doc.get("doi"),
+                        doc.get("publication_year"),
+                        json.dumps(doc),
+                    )
+                )
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?)", rows
+            )
+        return UpsertResult(inserted, modified)
+
+    def _set_work_fields(self, values: dict[str, dict]) -> UpsertResult:
+        """Merge the fields into the stored work documents."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                "UPDATE works SET data = json_patch(data, ?) WHERE id = ?",
+                [(json.dumps(fields), work_id) for work_id, fields in values.items()],
+            )
+        return UpsertResult(modified=cursor.rowcount)
+
+    def _mark_fetched(self, collection: str, ids: list[str], fetched_at: str) -> None:
+        """Set the `_fetched_at` timestamp of the documents."""
+        with self._lock, self._conn:
+            for i in range(0, len(ids), MAX_PARAMS):
+                batch = ids[i : i + MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                self._conn.execute(
+                    f'UPDATE "{collection}" '
+                    "SET data = json_set(data, '$._fetched_at', ?) "
+                    f"WHERE id IN ({placeholders})",
+                    [fetched_at, *batch],
+                )
+
+    def _upsert_links(self, collection: str, docs: list[dict]) -> UpsertResult:
+        """Merge the fields of the documents into their stored documents."""
+        with self._write():
+            existing = {
+                doc["id"]: doc
+                for doc in self._select(collection, [d["id"] for d in docs])
+            }
+
+            inserted = modified = 0
+            for doc in docs:
+                previous = existing.get(doc["id"])
+                existing[doc["id"]] = {**(previous or {}), **doc}
+                if previous is None:
+                    inserted += 1
+                elif existing[doc["id"]] != previous:
+                    modified += 1
+
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO "{collection}" VALUES (?, ?)',
+                [(doc_id, json.dumps(doc)) for doc_id, doc in existing.items()],
+            )
+        return UpsertResult(inserted, modified)
+
+    def _add_links(
+        self, collection: str, links: list[tuple[str, list[str]]]
+    ) -> UpsertResult:
+        """Add the IDs missing from the lists of the stored documents."""
+        with self._write():
+            existing = {
+                doc["id"]: doc
+                for doc in self._select(collection, [work_id for work_id, _ in links])
+            }
+
+            inserted = modified = 0
+            for work_id, ids in links:
+                doc = existing.get(work_id)
+                if doc is None:
+                    doc = existing[work_id] = {"id": work_id, "complete": False}
+                    inserted += 1
+                elif not set(ids).issubset(doc.get(collection, [])):
+                    modified += 1
+                doc[collection] = list(dict.fromkeys([*doc.get(collection, []), *ids]))
+
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO "{collection}" VALUES (?, ?)',
+                [(doc_id, json.dumps(doc)) for doc_id, doc in existing.items()],
+            )
+        return UpsertResult(inserted, modified)
@@ -1,8 +1,229 @@
 """buff/store/mongo.py"""
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import AsyncIterator
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import UpdateOne
 
 from buff import SECRETS
+from buff.openalex.construct import get_model_version
+from buff.openalex.models import WorkObject
+
+from . import schema
+from .base import DEFAULT_BATCH_SIZE, UpsertResult, WorkStore, fetch_timestamp
 
 MONGO_URI = f"mongodb+srv://{SECRETS.MONGO_USERNAME}:{SECRETS.MONGO_PASSWORD}@{SECRETS.MONGO_DB}.{SECRETS.MONGO_HOST}/?retryWrites=true&w=majority"
 mongo_client = AsyncIOMotorClient(MONGO_URI)
+
+
+class MongoStore(WorkStore):
+    """WorkStore backed by the `openalex` MongoDB database"""
+
+    def __init__(
+        self,
+        client: AsyncIOMotorClient = mongo_client,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> None:
+        """
+        Initialize the MongoStore object.
+
+        Args:
+            client (AsyncIOMotorClient): MongoDB client
+            batch_size (int): Number of operations per bulk write
+        """
+        self.batch_size = batch_size
+        self.mongo_db_openalex = client["openalex"]
+        self.mongo_collection_works = self.mongo_db_openalex["works"]
+
+    async def get_work(self, work_id: str) -> dict | None:
+        return await self.mongo_collection_works.find_one({"id": work_id})
+
+    async def get_works(self, work_ids: list[str]) -> list[dict]:
+        if not work_ids:
+            return []
+        cursor = self.mongo_collection_works.find({"id": {"$in": work_ids}})
+        return await cursor.to_list(length=None)
+
+    async def iter_works(
+        self, fields: list[str] | None = None, batch_size: int | None = None
+    ) -> AsyncIterator[dict]:
+        projection = None if fields is None else {"_id": 0, **dict.fromkeys(fields, 1)}
+        cursor = self.mongo_collection_works.find(
+            {}, projection=projection, batch_size=batch_size or self.batch_size
+        )
+        async for doc in cursor:
+            yield doc
+
+    async def get_ids_by_doi(self, dois: list[str]) -> dict[str, str]:
+        if not dois:
+            return {}
+        cursor = self.mongo_collection_works.find(
+            {"doi": {"$in": dois}}, projection={"_id": 0, "id": 1, "doi": 1}
+        )
+        return {doc["doi"]: doc["id"] async for doc in cursor}
+
+    async def upsert_works(
+        self,
+        works: list[WorkObject],
+        partial: list[str] | None = None,
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        fetched_at = fetch_timestamp()
+        operations = [
+            UpdateOne(
+                filter={"id": str(work.id)},
+                update=self._work_update(work, partial, fetched_at),
+                upsert=True,
+            )
+            for work in works
+        ]
+        result = await self._bulk_write(
+            self.mongo_collection_works, operations, batch_size
+        )
+
+        # Works already stored partial gain the newly selected fields.
+        # Complete works have no `_partial` and are left complete.
+        if partial is not None:
+            ids = [str(work.id) for work in works]
+            for batch in self._batches(ids, batch_size):
+                await self.mongo_collection_works.update_many(
+                    {"id": {"$in": batch}, "_partial": {"$exists": True}},
+                    {"$addToSet": {"_partial": {"$each": partial}}},
+                )
+        return result
+
+    async def get_link(self, collection: str, work_id: str) -> dict | None:
+        return await self.mongo_db_openalex[collection].find_one({"id": work_id})
+
+    async def get_links(self, collection: str, work_ids: list[str]) -> list[dict]:
+        if not work_ids:
+            return []
+        cursor = self.mongo_db_openalex[collection].find({"id": {"$in": work_ids}})
+        return await cursor.to_list(length=None)
+
+    async def upsert_links(
+        self, collection: str, docs: list[dict], batch_size: int | None = None
+    ) -> UpsertResult:
+        operations = [
+            UpdateOne(filter={"id": doc["id"]}, update={"$set": doc}, upsert=True)
+            for doc in docs
+        ]
+        return await self._bulk_write(
+            self.mongo_db_openalex[collection], operations, batch_size
+        )
+
+    async def add_links(
+        self,
+        collection: str,
+        links: dict[str, list[str]],
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        operations = [
+            UpdateOne(
+                filter={"id": work_id},
+                update={
+                    "$addToSet": {collection: {"$each": ids}},
+                    "$setOnInsert": {"complete": False},
+                },
+                upsert=True,
+            )
+            for work_id, ids in links.items()
+        ]
+        return await self._bulk_write(
+            self.mongo_db_openalex[collection], operations, batch_size
+        )
+
+    async def mark_fetched(
+        self, collection: str, ids: list[str], fetched_at: str | None = None
+    ) -> None:
+        update = {"$set": {"_fetched_at": fetched_at or fetch_timestamp()}}
+        for batch in self._batches(ids):
+            await self.mongo_db_openalex[collection].update_many(
+                {"id": {"$in": batch}}, update
+            )
+
+    async def set_work_fields(self, values: dict[str, dict]) -> UpsertResult:
+        operations = [
+            UpdateOne({"id": work_id}, {"$set": fields})
+            for work_id, fields in values.items()
+        ]
+        return await self._bulk_write(self.mongo_db_openalex["works"], operations)
+
+    async def migrate(self) -> list[int]:
+        return await schema.migrate(self.mongo_db_openalex)
+
+    async def verify_indexes(self) -> dict[str, list[str]]:
+        """
+        Find the indexes defined by the migrations that are missing.
+
+        Returns:
+            dict[str, list[str]]: {collection: [index name]} of the missing indexes
+        """
+        return await schema.verify_indexes(self.mongo_db_openalex)
+
+    async def _bulk_write(
+        self,
+        collection: AsyncIOMotorCollection,
+        operations: list[UpdateOne],
+        batch_size: int | None = None,
+    ) -> UpsertResult:
+        """
+        Run the operations in unordered bulk writes of `batch_size` operations.
+
+        Args:
+            collection (AsyncIOMotorCollection): Collection to write to
+            operations (list[UpdateOne]): Operations to run
+            batch_size (int | None): Number of operations per bulk write
+
+        Returns:
+            UpsertResult: Number of documents inserted and modified
+        """
+        result = UpsertResult()
+        for batch in self._batches(operations, batch_size):
+            bulk_result = await collection.bulk_write(batch, ordered=False)
+            result += UpsertResult(
+                bulk_result.upserted_count, bulk_result.modified_count
+            )
+        return result
+
+    @staticmethod
+    def _work_update(
+        work: WorkObject,
+        partial: list[str] | None = None,
+        fetched_at: str | None = None,
+    ) -> dict:
+        """
+        Build the MongoDB update document that saves a work.
+        Full works clear the partial marker, while partial works only set
+        their selected fields and are marked partial if newly inserted.
+        The fields of works already stored partial are merged by `upsert_works`.
+        Works are tagged with the model version they were validated against,
+        which partial updates keep so older fields are still validated on load.
+
+        Args:
+            work (WorkObject): Work to save
+            partial (list[str] | None): Fields the work was fetched with
+            fetched_at (str | None): Time the work was fetched.
+                Default: `fetch_timestamp()`.
+
+        Returns:
+            dict: MongoDB update document
+        """
+        model_version = get_model_version()
+        fetched_at = fetched_at or fetch_timestamp()
+        if partial is None:
+            return {
+                "$set": {
+                    **work.model_dump(mode="json"),
+                    "_model_version": model_version,
+                    "_fetched_at": fetched_at,
+                },
+                "$unset": {"_partial": ""},
+            }
+        return {
+            "$set": {
+                **work.model_dump(mode="json", exclude_unset=True),
+                "_fetched_at": fetched_at,
+            },
+            "$setOnInsert": {"_partial": partial, "_model_version": model_version},
+        }
@@ -0,0 +1,159 @@
+"""buff/store/schema.py"""
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, NamedTuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+
+from .base import LINK_COLLECTIONS
+
+# Collection recording the migrations applied to the database
+MIGRATIONS_COLLECTION = "migrations"
+
+
+class Migration(NamedTuple):
+    """Versioned change to the `openalex` database"""
+
+    version: int
+    description: str
+    indexes: dict[str, list[IndexModel]]
+    prepare: Callable[[AsyncIOMotorDatabase], Awaitable[None]] | None = None
+
+
+async def drop_duplicate_ids(db: AsyncIOMotorDatabase) -> None:
+    """
+    Drop the duplicate documents of each work, keeping the most recent one,
+    so the unique `id` indexes can be built.
+
+    Args:
+        db (AsyncIOMotorDatabase): The `openalex` database
+    """
+    for collection in ("works", *LINK_COLLECTIONS):
+        pipeline = [
+            {"$group": {"_id": "$id", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]
+        duplicates = []
+        async for group in db[collection].aggregate(pipeline, allowDiskUse=True):
+            duplicates.extend(sorted(group["ids"])[:-1])
+        if duplicates:
+            await db[collection].delete_many({"_id": {"$in": duplicates}})
+            print(f"Dropped {len(duplicates)} duplicate documents from {collection}")
+
+
+MIGRATIONS = [
+    Migration(
+        version=1,
+        description="Unique id indexes on works, citations and references",
+        indexes={
+            collection: [IndexModel([("id", ASCENDING)], name="id", unique=True)]
+            for collection in ("works", *LINK_COLLECTIONS)
+        },
+        prepare=drop_duplicate_ids,
+    ),
+    Migration(
+        version=2,
+        description="DOI and publication year indexes on works",
+        indexes={
+            "works": [
+                IndexModel([("doi", ASCENDING)], name="doi"),
+                IndexModel([("publication_year", ASCENDING)], name="publication_year"),
+            ]
+        },
+    ),
+    Migration(
+        version=3,
+        description="Partial index on the PDF URLs of open access works",
+        indexes={
+            "works": [
+                IndexModel(
+                    [("best_oa_location.pdf_url", ASCENDING)],
+                    name="best_oa_location.pdf_url",
+                    partialFilterExpression={
+                        "best_oa_location.pdf_url": {"$type": "string"}
+                    },
+                )
+            ]
+        },
+    ),
+]
+
+# Latest version of the database schema
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+async def get_schema_version(db: AsyncIOMotorDatabase) -> int:
+    """
+    Get the version of the last migration applied to the database.
+
+    Args:
+        db (AsyncIOMotorDatabase): The `openalex` database
+
+    Returns:
+        int: Schema version, or 0 if no migration was applied
+    """
+    latest = await db[MIGRATIONS_COLLECTION].find_one(sort=[("version", -1)])
+    return latest["version"] if latest else 0
+
+
+async def migrate(db: AsyncIOMotorDatabase) -> list[int]:
+    """
+    Apply the migrations newer than the database schema version, in order.
+    Index builds are idempotent, so an interrupted migration is safe to rerun.
+
+    Args:
+        db (AsyncIOMotorDatabase): The `openalex` database
+
+    Returns:
+        list[int]: Versions of the migrations applied
+    """
+    version = await get_schema_version(db)
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+
+        print(f"Applying migration {migration.version}: {migration.description}")
+        if migration.prepare is not None:
+            await migration.prepare(db)
+        for collection, indexes in migration.indexes.items():
+            await db[collection].create_indexes(indexes)
+
+        await db[MIGRATIONS_COLLECTION].insert_one(
+            {
+                "version": migration.version,
+                "description": migration.description,
+                "applied_at": datetime.now(timezone.utc),
+            }
+        )
+        applied.append(migration.version)
+
+    return applied
+
+
+async def verify_indexes(db: AsyncIOMotorDatabase) -> dict[str, list[str]]:
+    """
+    Find the indexes defined by the migrations that are missing from the database.
+
+    Args:
+        db (AsyncIOMotorDatabase): The `openalex` database
+
+    Returns:
+        dict[str, list[str]]: {collection: [index name]} of the missing indexes
+    """
+    expected: dict[str, list[str]] = {}
+    for migration in MIGRATIONS:
+        for collection, indexes in migration.indexes.items():
+            expected.setdefault(collection, []).extend(
+                index.document["name"] for index in indexes
+            )
+
+    missing = {}
+    for collection, names in expected.items():
+        existing = await db[collection].index_information()
+        absent = [name for name in names if name not in existing]
+        if absent:
+            missing[collection] = absent
+    return missing
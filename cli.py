@@ -9,7 +9,7 @@ from buff.openalex import Work
 from buff.openalex.models import WorkObject
 
 
-async def get_papers(entity_id: str, max_depth: int = 25, max_count: int = 10000, batch_size: int = 10) -> list[WorkObject]:
+async def get_papers(entity_id: str, max_depth: int = 25, max_count: int = 10000, batch_size: int = 50) -> list[WorkObject]:
     """
     Get papers from the OpenAlex API with batching, with limits on depth and count, and a customizable batch size.
 
@@ -17,7 +17,7 @@ async def get_papers(entity_id: str, max_depth: int = 25, max_count: int = 10000
         entity_id (str): The ID of the entity for which to get papers.
         max_depth (int): Maximum depth for fetching referenced works.
         max_count (int): Maximum number of papers to fetch.
-        batch_size (int): Number of requests to batch together.
+        batch_size (int): Number of works to fetch per batched lookup.
 
     Returns:
         List[WorkObject]: A list of WorkObject instances representing papers.
@@ -37,28 +37,25 @@ async def get_papers(entity_id: str, max_depth: int = 25, max_count: int = 10000
         unprocessed_entities = [eid for eid in pending_entities if eid not in processed_entities]
         batches = [unprocessed_entities[i:i + batch_size] for i in range(0, len(unprocessed_entities), batch_size)]
 
-        for batch in batches:
-            # Use tqdm.gather for progress bar support
-            results = await tqdm.gather(
-                *(Work(eid).get() for eid in batch),
-                total=len(batch),
-                desc="Fetching papers"
-            )
-
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"Error during request: {result}")
-                else:
-                    papers.append(result)
-                    processed_entities.add(result.id)
-
-                    # Process results to get next entities
-                    for url in result.referenced_works:
-                        url = str(url)
-                        if url.startswith("https://openalex.org/"):
-                            next_entity_id = url[21:]
-                            if next_entity_id not in processed_entities:
-                                next_entities.append(next_entity_id)
+        for batch in tqdm(batches, desc="Fetching papers"):
+            # Fetch the whole batch with a single lookup
+            try:
+                results = await Work.get_many(batch)
+            except Exception as e:
+                print(f"Error during request: {e}")
+                continue
+            processed_entities.update(batch)
+
+            for result in results.values():
+                papers.append(result)
+
+                # Process results to get next entities
+                for url in result.referenced_works or []:
+                    url = str(url)
+                    if url.startswith("https://openalex.org/"):
+                        next_entity_id = url[21:]
+                        if next_entity_id not in processed_entities:
+                            next_entities.append(next_entity_id)
 
                 # Early exit if max_count is reached
                 if len(papers) >= max_count:
@@ -0,0 +1,79 @@
+"""scripts/benchmark_abstracts.py"""
+
+import argparse
+import random
+import time
+
+from buff.openalex.abstract import (
+    get_abstracts,
+    reconstruct_abstract,
+    reconstruct_abstracts,
+)
+from buff.openalex.models import WorkObject
+
+VOCABULARY = [f"word{i}" for i in range(2000)]
+# Word frequencies follow Zipf's law, so common words repeat within an abstract
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+
+def make_index(rng: random.Random) -> dict[str, list[int]]:
+    """Make the inverted index of an abstract of about 200 words."""
+    index: dict[str, list[int]] = {}
+    size = rng.randint(100, 300)
+    for position, word in enumerate(rng.choices(VOCABULARY, WEIGHTS, k=size)):
+        index.setdefault(word, []).append(position)
+    return index
+
+
+def sort_per_word(index: dict[str, list[int]]) -> str:
+    """Baseline: sort the (position, word) pairs of the abstract."""
+    pairs = sorted((p, word) for word, positions in index.items() for p in positions)
+    return " ".join(word for _, word in pairs)
+
+
+def timed_us(fn, count: int, repeat: int) -> float:
+    """Best time over `repeat` runs of fn, in microseconds per abstract."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / count * 1e6
+
+
+def main(count: int = 5000, repeat: int = 5) -> None:
+    """Compare the ways to reconstruct abstracts from inverted indexes"""
+    rng = random.Random(0)
+    indexes = [make_index(rng) for _ in range(count)]
+    works = [
+        WorkObject(
+            id=f"https://openalex.org/W{1000000 + i}", abstract_inverted_index=index
+        )
+        for i, index in enumerate(indexes)
+    ]
+
+    expected = [sort_per_word(index) for index in indexes]
+    assert [reconstruct_abstract(index) for index in indexes] == expected
+    assert reconstruct_abstracts(indexes) == expected
+
+    results = {
+        "Sort per word": lambda: [sort_per_word(index) for index in indexes],
+        "Single": lambda: [reconstruct_abstract(index) for index in indexes],
+        "Batch": lambda: reconstruct_abstracts(indexes),
+    }
+    print(f"Abstracts: {count}")
+    for name, fn in results.items():
+        print(f"{name}: {timed_us(fn, count, repeat):.1f} us/abstract")
+
+    get_abstracts(works)
+    cached = timed_us(lambda: get_abstracts(works), count, repeat)
+    print(f"Cached: {cached:.1f} us/abstract")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--count", type=int, default=5000, help="Number of abstracts")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs")
+    args = parser.parse_args()
+
+    main(count=args.count, repeat=args.repeat)
@@ -0,0 +1,123 @@
+"""scripts/benchmark_work_construct.py"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from buff.openalex.construct import get_model_version, load_work
+from buff.openalex.models import WorkObject
+from buff.store.local import LocalStore
+
+
+def make_work(i: int, rng: random.Random) -> WorkObject:
+    """Make a work shaped like a typical OpenAlex work."""
+    return WorkObject(
+        id=f"https://openalex.org/W{1000000 + i}",
+        doi=f"https://doi.org/10.1234/example.{i}",
+        title=f"Work {i}",
+        display_name=f"Work {i}",
+        publication_year=rng.randint(1990, 2024),
+        publication_date=f"{rng.randint(1990, 2024)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        created_date="2016-06-24",
+        updated_date="2024-02-21T20:03:35.551808",
+        cited_by_count=rng.randint(0, 5000),
+        cited_by_api_url=f"https://api.openalex.org/works?filter=cites:W{1000000 + i}",
+        language="en",
+        type="article",
+        ids={
+            "openalex": f"https://openalex.org/W{1000000 + i}",
+            "doi": f"https://doi.org/10.1234/example.{i}",
+            "mag": 1000000 + i,
+        },
+        authorships=[
+            {
+                "author_position": "first" if a == 0 else "middle",
+                "author": {
+                    "id": f"https://openalex.org/A{5000000 + a}",
+                    "display_name": f"Author {a}",
+                    "orcid": "https://orcid.org/0000-0002-1825-0097",
+                },
+                "institutions": [
+                    {
+                        "id": f"https://openalex.org/I{100000 + a}",
+                        "display_name": f"Institution {a}",
+                        "ror": "https://ror.org/00f54p054",
+                        "country_code": "US",
+                        "type": "education",
+                    }
+                ],
+            }
+            for a in range(rng.randint(1, 8))
+        ],
+        concepts=[
+            {
+                "id": f"https://openalex.org/C{10000 + c}",
+                "wikidata": f"https://www.wikidata.org/wiki/Q{c + 1}",
+                "display_name": f"Concept {c}",
+                "level": c % 4,
+                "score": rng.random(),
+            }
+            for c in range(rng.randint(3, 12))
+        ],
+        best_oa_location={
+            "is_oa": True,
+            "landing_page_url": f"https://doi.org/10.1234/example.{i}",
+            "pdf_url": f"https://arxiv.org/pdf/{i}.pdf",
+            "version": "publishedVersion",
+        },
+        counts_by_year=[
+            {"year": year, "cited_by_count": rng.randint(0, 500)}
+            for year in range(2012, 2025)
+        ],
+        referenced_works=[
+            f"https://openalex.org/W{rng.randint(1000000, 9999999)}"
+            for _ in range(rng.randint(10, 60))
+        ],
+        related_works=[
+            f"https://openalex.org/W{rng.randint(1000000, 9999999)}" for _ in range(10)
+        ],
+    )
+
+
+def per_object_us(fn, docs: list[dict], repeat: int) -> float:
+    """Best time over `repeat` runs of fn on every document, in microseconds per object."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best / len(docs) * 1e6
+
+
+async def main(count: int = 3000, repeat: int = 5) -> None:
+    """Compare validating and trusted construction of stored works"""
+    rng = random.Random(0)
+    works = [make_work(i, rng) for i in range(count)]
+
+    store = LocalStore(":memory:")
+    await store.upsert_works(works)
+    docs = await store.get_works([str(work.id) for work in works])
+    assert all(doc["_model_version"] == get_model_version() for doc in docs)
+
+    # The trusted works must dump to the same JSON as the validated ones
+    for doc in docs[:100]:
+        trusted, validated = load_work(doc), WorkObject(**doc)
+        assert trusted.model_dump(mode="json") == validated.model_dump(mode="json")
+
+    validated = per_object_us(lambda doc: WorkObject(**doc), docs, repeat)
+    trusted = per_object_us(load_work, docs, repeat)
+
+    print(f"Stored works: {len(docs)}")
+    print(f"Validated: {validated:.1f} us/work")
+    print(f"Trusted:   {trusted:.1f} us/work ({validated / trusted:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--count", type=int, default=3000, help="Number of works")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs")
+    args = parser.parse_args()
+
+    asyncio.run(main(count=args.count, repeat=args.repeat))
@@ -4,6 +4,8 @@ import json
 
 from buff.network.data import build_network_around_work
 from buff.network.download import download_papers
+from buff.openalex import openalex_client
+from buff.store import get_store
 from config import DATA_DIR
 from download_papers import map_work_id_to_doi
 
@@ -14,6 +16,13 @@ WORKS_FP = DATA_DIR.joinpath(f"works_{EID}.json")
 
 async def main() -> None:
     """main function"""
+    await get_store().migrate()
+    async with openalex_client():
+        await build_and_download()
+
+
+async def build_and_download() -> None:
+    """Build the network around the work and download its papers"""
     nodes, edges = await build_network_around_work(
         entity_id=EID, depth=1, citations_limit=100, references_limit=100
     )
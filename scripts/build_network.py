@@ -1,26 +1,73 @@
 #!/usr/bin/env python
 
+import argparse
 import asyncio
-import json
 
-from buff.network.data import build_network_around_work
+from buff.network.best_first import CrawlBudget
+from buff.network.data import build_best_first_network, build_network_around_work
+from buff.network.graph import CitationGraph
+from buff.network.scoring import SCORERS
 from config import DATA_DIR
 
-NETWORK_FP = DATA_DIR.joinpath("network.json")
+NETWORK_DIR = DATA_DIR.joinpath("network")
 
 EID = "W2994792393"
 
-res = asyncio.run(
-    build_network_around_work(
-        entity_id=EID, depth=4, citations_limit=10, references_limit=10
+
+async def main() -> None:
+    """Crawl the citation network around a work and save it as a graph"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--eid", default=EID, help="Entity ID of the work")
+    parser.add_argument("--depth", type=int, default=None, help="Links to follow")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume the crawl from its last checkpoint",
+    )
+    parser.add_argument(
+        "--best-first",
+        action="store_true",
+        help="Expand the most relevant works first, within the budget",
     )
-)
-
-# Save the result to a file
-print(f"Saving network to {NETWORK_FP}")
-data = {
-    "nodes": [str(work_id) for work_id in res[0]],
-    "edges": [(str(src), str(dst)) for src, dst in res[1]],
-}
-with open(NETWORK_FP, "w", encoding="utf-8") as f:
-    json.dump(data, f, indent=2)
+    parser.add_argument(
+        "--score",
+        choices=sorted(SCORERS),
+        default="citations",
+        help="Relevance of the works for --best-first",
+    )
+    parser.add_argument("--max-works", type=int, help="Works to expand")
+    parser.add_argument("--max-requests", type=int, help="API requests to send")
+    parser.add_argument("--max-seconds", type=float, help="Seconds to crawl for")
+    args = parser.parse_args()
+
+    if args.best_first:
+        budget = CrawlBudget(args.max_works, args.max_requests, args.max_seconds)
+        if budget == CrawlBudget():
+            budget = CrawlBudget(max_works=1000)
+        nodes, edges = await build_best_first_network(
+            entity_id=args.eid,
+            budget=budget,
+            scorer=SCORERS[args.score](),
+            depth=args.depth,
+            citations_limit=10,
+            references_limit=10,
+        )
+    else:
+        nodes, edges = await build_network_around_work(
+            entity_id=args.eid,
+            depth=args.depth or 4,
+            citations_limit=10,
+            references_limit=10,
+            checkpoint_dir=DATA_DIR.joinpath(f"crawl_{args.eid}"),
+            resume=args.resume,
+        )
+
+    # Save the result as a compact graph that loads memory-mapped
+    graph = CitationGraph.from_edges(edges, nodes)
+    print(f"Saving network of {len(graph)} works and {graph.num_edges} links")
+    print(f"to {NETWORK_DIR}")
+    graph.save(NETWORK_DIR)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import time
+
+from buff.openalex.bm25 import BM25_INDEX_FP, BM25Index
+
+
+async def main() -> None:
+    """Build the local BM25 index of the stored works and optionally search it"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--query", help="Search the index after building it")
+    parser.add_argument("-k", type=int, default=10, help="Number of works to return")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Works per write")
+    parser.add_argument(
+        "--skip-build", action="store_true", help="Search without building first"
+    )
+    args = parser.parse_args()
+
+    index = BM25Index(BM25_INDEX_FP)
+
+    if not args.skip_build:
+        start = time.perf_counter()
+        indexed = await index.build(batch_size=args.batch_size)
+        print(
+            f"Indexed {indexed} new or changed works in {time.perf_counter() - start:.1f}s"
+        )
+        print(f"Works in the index: {len(index)}")
+
+    if args.query:
+        start = time.perf_counter()
+        results = await index.search(args.query, k=args.k)
+        print(f"Results in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for work_id, score in results:
+            print(f"{score:8.3f}  {work_id}")
+
+    index.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
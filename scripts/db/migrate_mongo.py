@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+
+from buff.store.mongo import MongoStore
+from buff.store.schema import SCHEMA_VERSION, get_schema_version
+
+
+async def main(verify: bool = False) -> None:
+    """Apply the pending migrations of the openalex database, or verify its indexes"""
+    store = MongoStore()
+
+    if not verify:
+        applied = await store.migrate()
+        print(f"Applied migrations: {applied or 'none'}")
+
+    version = await get_schema_version(store.mongo_db_openalex)
+    print(f"Schema version: {version} (latest: {SCHEMA_VERSION})")
+
+    missing = await store.verify_indexes()
+    for collection, names in missing.items():
+        print(f"Missing indexes on {collection}: {', '.join(names)}")
+    if missing:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--verify", action="store_true", help="Only verify the indexes exist"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(verify=args.verify))
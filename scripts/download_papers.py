@@ -5,16 +5,16 @@ import json
 from tqdm import tqdm
 
 from buff.network.download import download_papers
+from buff.network.graph import CitationGraph
 from buff.openalex import Work
 from buff.utils import sanitize_name
 from config import DATA_DIR, PAPERS_DIR
 
 PAPERS_TXT_DIR = PAPERS_DIR.joinpath("txt")
-NETWORK_FP = DATA_DIR.joinpath("network.json")
+NETWORK_DIR = DATA_DIR.joinpath("network")
 WORKS_FP = DATA_DIR.joinpath("works.json")
 
-with open(NETWORK_FP, "r", encoding="utf-8") as f:
-    WORKS = json.load(f).get("nodes", [])
+WORKS = CitationGraph.load(NETWORK_DIR).ids.tolist()
 
 
 async def map_work_id_to_doi(works: list[str]) -> dict[str, str]:
@@ -29,8 +29,11 @@ async def map_work_id_to_doi(works: list[str]) -> dict[str, str]:
     """
 
     work_doi = {}
+    work_objects = await Work.get_many(works, select=["doi"])
     for work_id in tqdm(works, desc="Mapping"):
-        work = await Work(work_id).data
+        work = work_objects.get(Work(work_id).idx)
+        if work is None:
+            continue
         doi = str(work.doi)
 
         # Check if the txt file exists
@@ -6,12 +6,12 @@ from buff.llm.embed import embed_texts
 from buff.llm.models import Document, DocumentMetadata
 from buff.llm.split import split_text
 from buff.openalex import Work
+from buff.openalex.abstract import get_abstract
 from buff.store.vector import pc_papers
 from buff.utils import sanitize_name
 from config import DATA_DIR, PAPERS_DIR
 
 PAPERS_TXT_DIR = PAPERS_DIR.joinpath("txt")
-NETWORK_FP = DATA_DIR.joinpath("network.json")
 WORKS_FP = DATA_DIR.joinpath("works.json")
 EMBEDDED_WORKS_FP = DATA_DIR.joinpath("embedded_works.txt")
 
@@ -46,12 +46,13 @@ async def process_paper(work_id: str) -> None:
     filename = sanitize_name(doi) + ".txt"
     txt_fp = PAPERS_TXT_DIR.joinpath(filename)
 
-    if not txt_fp.exists():
-        print(f"TXT not found: {work_id} - {doi}")
-        return
-
-    with open(txt_fp, "r", encoding="utf-8") as f:
-        text = f.read()
+    if txt_fp.exists():
+        with open(txt_fp, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        # Fall back to the abstract of works without an OA PDF
+        print(f"TXT not found, using abstract: {work_id} - {doi}")
+        text = get_abstract(work)
 
     text = text.strip()
     if not text:
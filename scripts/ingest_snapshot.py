@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import argparse
+
+from buff.openalex.snapshot import SNAPSHOT_PROGRESS_FP, SnapshotFilter, ingest_snapshot
+
+
+def main() -> None:
+    """Ingest the works of an OpenAlex snapshot into the works store"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("snapshot_dir", help="Snapshot directory or works partitions")
+    parser.add_argument(
+        "--concept", action="append", help="Concept ID to keep, e.g. C41008148"
+    )
+    parser.add_argument("--min-year", type=int, help="Minimum publication year")
+    parser.add_argument("--max-year", type=int, help="Maximum publication year")
+    parser.add_argument("--ids", help="File of the work IDs to keep, one per line")
+    parser.add_argument("--processes", type=int, help="Number of worker processes")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Works per write")
+    parser.add_argument(
+        "--restart", action="store_true", help="Ingest the partitions ingested before"
+    )
+    args = parser.parse_args()
+
+    work_ids = None
+    if args.ids:
+        with open(args.ids, "r", encoding="utf-8") as f:
+            work_ids = [line.strip() for line in f if line.strip()]
+
+    filter_ = SnapshotFilter.create(
+        concepts=args.concept,
+        min_year=args.min_year,
+        max_year=args.max_year,
+        work_ids=work_ids,
+    )
+    results = ingest_snapshot(
+        args.snapshot_dir,
+        filter_,
+        processes=args.processes,
+        batch_size=args.batch_size,
+        progress_fp=SNAPSHOT_PROGRESS_FP,
+        resume=not args.restart,
+    )
+
+    print(f"Partitions ingested: {len(results)}")
+    print(f"Works: {sum(r.works for r in results)}")
+    print(f"Invalid works: {sum(r.invalid for r in results)}")
+    print(f"Inserted: {sum(r.inserted for r in results)}")
+    print(f"Modified: {sum(r.modified for r in results)}")
+
+
+if __name__ == "__main__":
+    main()
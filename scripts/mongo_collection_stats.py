@@ -11,16 +11,16 @@ async def stats():
     total_count = await mongo_collection_works.count_documents({})
     print("# Works: ", total_count)
 
-    count = await mongo_collection_works.count_documents({"best_oa_location.pdf_url": {"$exists": True, "$ne": None}})
+    count = await mongo_collection_works.count_documents({"best_oa_location.pdf_url": {"$type": "string"}})
     print("# OA Works: ", count)
 
     # Get the count of PDF URLs ending with ".pdf"
-    pdf_count = await mongo_collection_works.count_documents({"best_oa_location.pdf_url": {"$regex": "\\.pdf$"}})
+    pdf_count = await mongo_collection_works.count_documents({"best_oa_location.pdf_url": {"$type": "string", "$regex": "\\.pdf$"}})
     print("# PDF URLs ending with '.pdf': ", pdf_count)
 
     # Print the DOI and PDF URL for each document
     print("# Documents with DOI and PDF URL:")
-    async for doc in mongo_collection_works.find({"best_oa_location.pdf_url": {"$exists": True, "$ne": None}}):
+    async for doc in mongo_collection_works.find({"best_oa_location.pdf_url": {"$type": "string"}}):
         doi = doc.get("doi")
         pdf_url = doc["best_oa_location"]["pdf_url"]
         print(f"  DOI: {doi}, PDF URL: {pdf_url}")
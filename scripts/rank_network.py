@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+
+from buff.network.analytics import rank_graph, write_ranks
+from buff.network.graph import CitationGraph
+from config import DATA_DIR
+
+NETWORK_DIR = DATA_DIR.joinpath("network")
+
+
+async def main() -> None:
+    """Rank the works of the crawled network and save the ranks to the store"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--graph", default=NETWORK_DIR, help="Graph directory")
+    parser.add_argument(
+        "--seeds", nargs="*", help="Work ID URLs to personalize PageRank on"
+    )
+    parser.add_argument("-k", type=int, default=10, help="Top works to print")
+    parser.add_argument("--no-write", action="store_true", help="Skip saving the ranks")
+    args = parser.parse_args()
+
+    graph = CitationGraph.load(args.graph)
+    print(f"Ranking {len(graph)} works and {graph.num_edges} links")
+    ranks = rank_graph(graph, seeds=args.seeds)
+
+    for node in ranks.pagerank.argsort()[::-1][: args.k].tolist():
+        print(f"{ranks.pagerank[node]:.6f}  {graph.ids[node]}")
+
+    if not args.no_write:
+        result = await write_ranks(graph, ranks)
+        print(f"Works updated: {result.modified}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
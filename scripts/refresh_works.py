@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from buff.openalex.refresh import DEFAULT_MAX_AGE, refresh_works
+
+
+async def main() -> None:
+    """Refresh the stored works and citation lists that changed in OpenAlex"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=DEFAULT_MAX_AGE.days,
+        help="Refresh the works fetched more than this many days ago",
+    )
+    parser.add_argument("--ids", help="File of the work IDs to refresh, one per line")
+    parser.add_argument(
+        "--no-citations", action="store_true", help="Skip the new citations"
+    )
+    args = parser.parse_args()
+
+    work_ids = None
+    if args.ids:
+        with open(args.ids, "r", encoding="utf-8") as f:
+            work_ids = [line.strip() for line in f if line.strip()]
+
+    result = await refresh_works(
+        work_ids=work_ids,
+        max_age=timedelta(days=args.max_age),
+        citations=not args.no_citations,
+    )
+
+    print(f"Works checked: {result.checked}")
+    print(f"Works changed: {result.changed}")
+    print(f"Citations added: {result.citations}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
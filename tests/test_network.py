@@ -0,0 +1,303 @@
+"""tests/test_network.py"""
+
+import numpy as np
+import pytest
+
+from buff.network.analytics import (
+    hits,
+    pagerank,
+    personalized_pagerank,
+    rank_graph,
+    write_ranks,
+)
+from buff.network.best_first import BestFirstCrawler, CrawlBudget
+from buff.network.checkpoint import CrawlCheckpoint
+from buff.network.crawl import Crawler
+from buff.network.graph import CitationGraph
+from buff.network.scoring import ConceptScorer, Scorer
+from buff.openalex.models import WorkObject
+from buff.store.local import LocalStore
+
+# Citations and references of a small network, keyed by entity ID
+GRAPH = {
+    "W1": (["W2", "W3"], ["W4"]),
+    "W2": (["W3", "W5"], ["W1"]),
+    "W3": (["W6"], ["W1", "W2"]),
+    "W4": ([], []),
+}
+
+
+def url(entity_id: str) -> str:
+    """Get the ID URL of an entity ID"""
+    return f"https://openalex.org/{entity_id}"
+
+
+class GraphCrawler(Crawler):
+    """Crawler over GRAPH that records the works it fetches"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fetched: list[str] = []
+
+    async def fetch_links(self, work_id: str) -> tuple[list[str], list[str]]:
+        self.fetched.append(work_id)
+        citations, references = GRAPH.get(work_id.rsplit("/", 1)[-1], ([], []))
+        return (
+            [url(i) for i in citations[: self.citations_limit]],
+            [url(i) for i in references[: self.references_limit]],
+        )
+
+
+class TestCrawler:
+    """Test the frontier crawler of the citation network"""
+
+    @pytest.mark.asyncio
+    async def test_crawl(self) -> None:
+        """Test each work is fetched once and the edges point to the citing works"""
+        crawler = GraphCrawler()
+        nodes, edges = await crawler.crawl("W1", depth=2)
+
+        assert sorted(crawler.fetched) == [url(i) for i in ["W1", "W2", "W3", "W4"]]
+        assert nodes == {url(i) for i in ["W1", "W2", "W3", "W4", "W5", "W6"]}
+        assert (url("W1"), url("W2")) in edges
+        assert (url("W4"), url("W1")) in edges
+        assert (url("W3"), url("W6")) in edges
+        assert (url("W2"), url("W3")) in edges
+
+    @pytest.mark.asyncio
+    async def test_direction_limits(self) -> None:
+        """Test the limits of each direction are applied per work"""
+        crawler = GraphCrawler(citations_limit=1, references_limit=0)
+        nodes, edges = await crawler.crawl("W1", depth=3)
+
+        assert nodes == {url("W2"), url("W3"), url("W6")}
+        assert edges == {
+            (url("W1"), url("W2")),
+            (url("W2"), url("W3")),
+            (url("W3"), url("W6")),
+        }
+
+
+class CrashingCrawler(GraphCrawler):
+    """Crawler that dies without a final snapshot when it reaches a work"""
+
+    def __init__(self, crash_at: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.crash_at = crash_at
+        self.crashed = False
+
+    async def fetch_links(self, work_id: str) -> tuple[list[str], list[str]]:
+        if work_id == url(self.crash_at):
+            self.crashed = True
+            raise RuntimeError("crash")
+        return await super().fetch_links(work_id)
+
+    def save_checkpoint(self) -> None:
+        if not self.crashed:
+            super().save_checkpoint()
+
+
+class TestCrawlCheckpoint:
+    """Test crawls resume from their checkpoint"""
+
+    @pytest.mark.asyncio
+    async def test_resume(self, tmp_path) -> None:
+        """Test a crashed crawl resumes from its snapshot and log"""
+        expected = await GraphCrawler().crawl("W1", depth=3)
+
+        crashing = CrashingCrawler(
+            "W3", max_concurrency=1, checkpoint=CrawlCheckpoint(tmp_path)
+        )
+        with pytest.raises(ExceptionGroup):
+            await crashing.crawl("W1", depth=3)
+
+        # W1 is in the snapshot of the first level and W2 in the log
+        resumed = GraphCrawler(checkpoint=CrawlCheckpoint(tmp_path))
+        assert await resumed.crawl("W1", depth=3, resume=True) == expected
+        assert url("W1") not in resumed.fetched
+        assert url("W2") not in resumed.fetched
+        assert url("W3") in resumed.fetched
+
+        # A finished crawl resumes without fetching anything
+        finished = GraphCrawler(checkpoint=CrawlCheckpoint(tmp_path))
+        assert await finished.crawl("W1", depth=3, resume=True) == expected
+        assert not finished.fetched
+
+    def test_torn_log(self, tmp_path) -> None:
+        """Test a record torn by a crash is dropped from the log"""
+        checkpoint = CrawlCheckpoint(tmp_path, min_log_bytes=0)
+        checkpoint.snapshot({"root": url("W1"), "level": 0})
+
+        # A snapshot is due once the log is larger than the snapshot
+        assert not checkpoint.append({"work": url("W1")})
+        assert checkpoint.append({"work": url("W2")})
+        checkpoint.close()
+        with open(checkpoint.log_fp, "a", encoding="utf-8") as f:
+            f.write('{"work": "https://openalex.org/W')
+
+        snapshot, records = checkpoint.load()
+        assert snapshot["root"] == url("W1")
+        assert records == [{"work": url("W1")}, {"work": url("W2")}]
+
+
+class BestFirstGraphCrawler(BestFirstCrawler):
+    """Best-first crawler over GRAPH, whose works are cited by their number"""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.fetched: list[str] = []
+
+    @staticmethod
+    def work(work_id: str) -> WorkObject:
+        number = int(work_id.rsplit("W", 1)[-1])
+        concepts = [{"id": url(f"C{number % 2}"), "score": 1.0}]
+        return WorkObject(id=work_id, cited_by_count=number, concepts=concepts)
+
+    async def fetch_work(self, work_id: str) -> WorkObject:
+        return self.work(work_id)
+
+    async def fetch_linked_works(
+        self, work_id: str
+    ) -> tuple[list[str], list[str], dict[str, WorkObject]]:
+        # Records the fetch too
+        citations, references = await GraphCrawler.fetch_links(self, work_id)
+        works = {i: self.work(i) for i in [*citations, *references]}
+        return citations, references, works
+
+
+class TestBestFirstCrawler:
+    """Test the budgeted best-first crawl"""
+
+    @pytest.mark.asyncio
+    async def test_budget(self) -> None:
+        """Test the budget of works goes to the most cited works first"""
+        crawler = BestFirstGraphCrawler(
+            budget=CrawlBudget(max_works=3), max_concurrency=1
+        )
+        nodes, edges = await crawler.crawl("W1")
+
+        assert crawler.fetched == [url("W1"), url("W4"), url("W3")]
+        assert nodes == {url(i) for i in ["W1", "W2", "W3", "W4", "W6"]}
+        assert (url("W3"), url("W6")) in edges
+        assert crawler.scores[url("W6")] > crawler.scores[url("W2")]
+
+    @pytest.mark.asyncio
+    async def test_scorer(self) -> None:
+        """Test a pluggable scorer orders the frontier"""
+        crawler = BestFirstGraphCrawler(
+            scorer=ConceptScorer(), budget=CrawlBudget(max_works=2), max_concurrency=1
+        )
+        await crawler.crawl("W1", depth=2)
+
+        # W3 shares the concept of W1, W2 and W4 do not
+        assert crawler.fetched == [url("W1"), url("W3")]
+        assert crawler.scores[url("W3")] == 1.0
+        assert crawler.scores[url("W2")] == 0.0
+
+    def test_abstract_scorer(self) -> None:
+        """Test scorers must implement score"""
+
+        class NoScorer(Scorer):
+            fields = ["cited_by_count"]
+
+        with pytest.raises(TypeError):
+            NoScorer()
+
+
+class TestCitationGraph:
+    """Test the compact citation graph"""
+
+    EDGES = [
+        (url("W1"), url("W2")),
+        (url("W1"), url("W3")),
+        (url("W2"), url("W3")),
+        (url("W4"), url("W1")),
+        (url("W1"), url("W2")),
+    ]
+
+    def test_adjacency(self) -> None:
+        """Test the forward and backward adjacency of the graph"""
+        graph = CitationGraph.from_edges(self.EDGES, nodes=[url("W5")])
+
+        assert len(graph) == 5
+        assert graph.num_edges == 4
+        assert graph.index(url("W5")) == 0
+        assert graph.index(url("W9")) is None
+
+        w1, w3 = graph.index(url("W1")), graph.index(url("W3"))
+        assert [graph.ids[i] for i in graph.successors(w1)] == [url("W2"), url("W3")]
+        assert [graph.ids[i] for i in graph.predecessors(w1)] == [url("W4")]
+        assert [graph.ids[i] for i in graph.predecessors(w3)] == [url("W1"), url("W2")]
+        assert graph.out_degree().sum() == graph.in_degree().sum() == 4
+        assert sorted(graph.edges()) == sorted(set(self.EDGES))
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_save_load(self, tmp_path, mmap: bool) -> None:
+        """Test a saved graph loads back the same"""
+        graph = CitationGraph.from_edges(self.EDGES, nodes=["https://openalex.org/Wé"])
+        graph.save(tmp_path)
+        loaded = CitationGraph.load(tmp_path, mmap=mmap)
+
+        assert loaded.ids.tolist() == graph.ids.tolist()
+        assert loaded.ids[0] == "https://openalex.org/Wé"
+        assert sorted(loaded.edges()) == sorted(graph.edges())
+        for name in ["out_indptr", "out_indices", "in_indptr", "in_indices"]:
+            assert (getattr(loaded, name) == getattr(graph, name)).all()
+        assert isinstance(loaded.out_indices, np.memmap) == mmap
+
+
+class TestAnalytics:
+    """Test the ranking of the works of a citation graph"""
+
+    # W1 is cited by every other work, and W4 cites every other work
+    EDGES = [
+        (url("W1"), url("W2")),
+        (url("W1"), url("W3")),
+        (url("W1"), url("W4")),
+        (url("W2"), url("W4")),
+        (url("W3"), url("W4")),
+    ]
+
+    def test_pagerank(self) -> None:
+        """Test rank flows to the cited works"""
+        graph = CitationGraph.from_edges(self.EDGES)
+        rank = pagerank(graph)
+
+        assert rank.sum() == pytest.approx(1.0)
+        assert rank.argmax() == graph.index(url("W1"))
+        assert rank.argmin() == graph.index(url("W4"))
+
+        seeded = personalized_pagerank(graph, [url("W2")])
+        assert seeded.sum() == pytest.approx(1.0)
+        assert seeded[graph.index(url("W2"))] > rank[graph.index(url("W2"))]
+        assert seeded[graph.index(url("W3"))] < rank[graph.index(url("W3"))]
+
+        with pytest.raises(ValueError):
+            personalized_pagerank(graph, [url("W9")])
+
+    def test_hits(self) -> None:
+        """Test the citing works are hubs and the cited works authorities"""
+        graph = CitationGraph.from_edges(self.EDGES)
+        hubs, authorities = hits(graph)
+
+        assert hubs.argmax() == graph.index(url("W4"))
+        assert authorities.argmax() == graph.index(url("W1"))
+        assert authorities[graph.index(url("W4"))] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_write_ranks(self) -> None:
+        """Test the ranks are saved to the stored works"""
+        store = LocalStore(":memory:")
+        await store.upsert_works([WorkObject(id=url("W1"), title="T")])
+
+        graph = CitationGraph.from_edges(self.EDGES)
+        ranks = rank_graph(graph)
+        result = await write_ranks(graph, ranks, store=store)
+        assert result.modified == 1
+
+        doc = await store.get_work(url("W1"))
+        node = graph.index(url("W1"))
+        assert doc["title"] == "T"
+        assert doc["_ranks"]["pagerank"] == pytest.approx(ranks.pagerank[node])
+        assert doc["_ranks"]["out_degree"] == 3
+        assert doc["_ranks"]["in_degree"] == 0
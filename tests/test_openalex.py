@@ -1,8 +1,121 @@
 """tests/test_openalex.py"""
 
+import asyncio
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
 import pytest
+from pydantic import ValidationError
 
+import buff.openalex.refresh
+import buff.openalex.search
+import buff.store
 from buff.openalex import Work
+from buff.openalex.abstract import reconstruct_abstract, reconstruct_abstracts
+from buff.openalex.cache import SearchCache, WorkCache, work_cache
+from buff.openalex.client import close_client, get_client
+from buff.openalex.construct import get_model_version, load_work, trusted_model
+from buff.openalex.errors import OpenAlexError, QuotaExceeded
+from buff.openalex.models import WorkObject
+from buff.openalex.ratelimit import RateLimiter
+from buff.openalex.refresh import refresh_works
+from buff.openalex.search import normalize_filters, normalize_query, search_page
+from buff.openalex.singleflight import SingleFlight
+from buff.openalex.table import WorkTable
+from buff.openalex.utils import normalize_doi
+from buff.store import set_store
+from buff.store.local import LocalStore
+
+
+class FakeOpenAlex:
+    """In-memory OpenAlex API serving the works endpoints, recording the URLs"""
+
+    def __init__(self) -> None:
+        self.works: dict[str, dict] = {}
+        self.urls: list[str] = []
+        self.failing_pages: set[int] = set()
+
+    def add(self, *works: dict) -> None:
+        """Add works, given with their ID URLs"""
+        self.works.update((work["id"], work) for work in works)
+
+    async def get(self, url: str) -> dict:
+        """Serve a GET request like `get_json`"""
+        self.urls.append(url)
+        await asyncio.sleep(0)
+
+        parts = urlsplit(url)
+        params = dict(parse_qsl(parts.query))
+        select = params["select"].split(",") if "select" in params else None
+        if parts.path.startswith("/works/"):
+            work = self.works.get("https://openalex.org/" + parts.path[7:])
+            if work is None:
+                raise OpenAlexError(f"Error 404: GET {url}")
+            return self.project(work, select)
+
+        results = list(self.works.values())
+        for condition in params["filter"].split(","):
+            key, value = condition.split(":", 1)
+            ids = {f"https://openalex.org/{i}" for i in value.split("|")}
+            if key == "openalex_id":
+                results = [w for w in results if w["id"] in ids]
+            elif key == "cites":
+                results = [w for w in results if ids & {*w["referenced_works"]}]
+            elif key == "cited_by":
+                cited = {r for i in ids for r in self.works[i]["referenced_works"]}
+                results = [w for w in results if w["id"] in cited]
+            elif key == "from_publication_date":
+                results = [w for w in results if w["publication_date"] >= value]
+        if params.get("sort") == "cited_by_count:desc":
+            results.sort(key=lambda w: -w["cited_by_count"])
+
+        # Cursors are the offsets of the next results
+        per_page = int(params["per-page"])
+        if "cursor" in params:
+            start = 0 if params["cursor"] == "*" else int(params["cursor"])
+        else:
+            page = int(params.get("page", 1))
+            if page in self.failing_pages:
+                raise OpenAlexError(f"Error 500: GET {url}")
+            start = (page - 1) * per_page
+        end = start + per_page
+        return {
+            "meta": {
+                "count": len(results),
+                "next_cursor": str(end) if end < len(results) else None,
+            },
+            "results": [self.project(w, select) for w in results[start:end]],
+        }
+
+    @staticmethod
+    def project(work: dict, select: list[str] | None) -> dict:
+        """Project a work on the selected fields"""
+        return work if select is None else {k: work[k] for k in select if k in work}
+
+
+def make_work(i: int, **fields) -> dict:
+    """Raw work with the ID W{i}"""
+    return {
+        "id": f"https://openalex.org/W{i}",
+        "title": f"Work {i}",
+        "publication_date": "2020-01-01",
+        "updated_date": "2024-01-01T00:00:00",
+        "cited_by_count": 0,
+        "referenced_works": [],
+        **fields,
+    }
+
+
+@pytest.fixture
+def openalex(monkeypatch: pytest.MonkeyPatch) -> FakeOpenAlex:
+    """Fake OpenAlex API, with an empty in-memory store and work cache"""
+    api = FakeOpenAlex()
+    monkeypatch.setattr(Work, "_Work__GET", staticmethod(api.get))
+    monkeypatch.setattr(buff.openalex.refresh, "get_json", api.get)
+    monkeypatch.setattr(buff.store, "_store", LocalStore(":memory:"))
+    work_cache.clear()
+    yield api
+    work_cache.clear()
 
 
 class TestWork:
@@ -18,6 +131,64 @@ class TestWork:
             == "The state of OA: a large-scale analysis of the prevalence and impact of Open Access articles"
         )
 
+    @pytest.mark.asyncio
+    async def test_get_select(self, openalex: FakeOpenAlex) -> None:
+        """Test Work.get() with a field projection"""
+        openalex.add(make_work(1, publication_year=2018))
+        store = buff.store.get_store()
+
+        work = Work("W1")
+        work_data = await work.get(select=["title"])
+        assert work_data.title == "Work 1"
+        assert work_data.publication_year is None
+        assert openalex.urls == ["https://api.openalex.org/works/W1?select=id,title"]
+        assert (await store.get_work("https://openalex.org/W1"))["_partial"] == [
+            "id",
+            "title",
+        ]
+
+        # Fields covered by the partial data are served without a request
+        work_cache.clear()
+        assert (await Work("W1").get(select=["id"])).title == "Work 1"
+        assert len(openalex.urls) == 1
+
+        # The full data is fetched when the cached data is partial
+        full_data = await work.data
+        assert full_data.publication_year == 2018
+        assert openalex.urls[1] == "https://api.openalex.org/works/W1"
+        assert "_partial" not in await store.get_work("https://openalex.org/W1")
+
+    @pytest.mark.asyncio
+    async def test_get_many(self, openalex: FakeOpenAlex) -> None:
+        """Test Work.get_many() fetches the works missing from the store in batches"""
+        openalex.add(*(make_work(i) for i in range(1, 61)))
+        stored = [
+            WorkObject(**openalex.works[f"https://openalex.org/W{i}"])
+            for i in range(1, 6)
+        ]
+        await buff.store.get_store().upsert_works(stored)
+
+        ids = [f"W{i}" for i in range(1, 61)]
+        works = await Work.get_many([*ids, "https://openalex.org/W1"])
+        assert set(works) == {f"https://openalex.org/W{i}" for i in range(1, 61)}
+        assert works["https://openalex.org/W60"].title == "Work 60"
+
+        # Only the 55 works missing from the store are fetched, in batches of 50
+        batches = [
+            dict(parse_qsl(urlsplit(url).query))["filter"]
+            .removeprefix("openalex_id:")
+            .split("|")
+            for url in openalex.urls
+        ]
+        assert sorted(map(len, batches)) == [5, 50]
+        assert {i for batch in batches for i in batch} == set(ids[5:])
+
+        # The fetched works are saved, so they are not fetched again
+        work_cache.clear()
+        openalex.urls.clear()
+        assert len(await Work.get_many(ids)) == 60
+        assert openalex.urls == []
+
     @pytest.mark.skip
     async def test_citations(self) -> None:
         """Test Work.citations()"""
@@ -33,3 +204,649 @@ class TestWork:
         references_ids, references_works = await work.references()
         assert len(references_ids) == 35
         assert len(references_works) == 35
+
+    @pytest.mark.asyncio
+    async def test_iter_references(self, openalex: FakeOpenAlex) -> None:
+        """Test Work.iter_references() follows the cursor and saves each page"""
+        references = [f"https://openalex.org/W{i}" for i in range(2, 37)]
+        openalex.add(
+            make_work(1, referenced_works=references),
+            *(make_work(i) for i in range(2, 37)),
+        )
+
+        works = [ref async for ref in Work("W1").iter_references(per_page=10)]
+        assert [str(work.id) for work in works] == references
+        cursors = [
+            dict(parse_qsl(urlsplit(url).query))["cursor"] for url in openalex.urls
+        ]
+        assert cursors == ["*", "10", "20", "30"]
+        assert len(await buff.store.get_store().get_works(references)) == 35
+
+        # The limit stops the pages early and trims the last one
+        openalex.urls.clear()
+        works = [ref async for ref in Work("W1").iter_references(limit=15, per_page=10)]
+        assert len(works) == 15
+        assert len(openalex.urls) == 2
+
+
+class TestFetchPages:
+    """Test the concurrent fetch of the pages of a list endpoint"""
+
+    URL = "https://api.openalex.org/works?filter=cites:W1&sort=cited_by_count:desc"
+
+    @pytest.fixture
+    def api(
+        self, openalex: FakeOpenAlex, monkeypatch: pytest.MonkeyPatch
+    ) -> FakeOpenAlex:
+        """Fake API with 25 citing works, answering later pages first"""
+        openalex.add(
+            *(
+                make_work(
+                    i,
+                    cited_by_count=100 - i,
+                    referenced_works=["https://openalex.org/W1"],
+                )
+                for i in range(2, 27)
+            )
+        )
+
+        async def get(url: str) -> dict:
+            page = int(dict(parse_qsl(urlsplit(url).query))["page"])
+            await asyncio.sleep(0.01 * (5 - page))
+            return await openalex.get(url)
+
+        monkeypatch.setattr(Work, "_Work__GET", staticmethod(get))
+        return openalex
+
+    @staticmethod
+    def pages(api: FakeOpenAlex) -> list[int]:
+        """Pages answered, in order"""
+        return [int(dict(parse_qsl(urlsplit(url).query))["page"]) for url in api.urls]
+
+    @pytest.mark.asyncio
+    async def test_page_order(self, api: FakeOpenAlex) -> None:
+        """Test the pages are fetched concurrently and returned in page order"""
+        results, count = await Work._fetch_pages(self.URL, 100, per_page=10)
+        assert count == 25
+        assert [r["id"] for r in results] == [
+            f"https://openalex.org/W{i}" for i in range(2, 27)
+        ]
+        # The pages after the first were in flight together, so page 3 came first
+        assert self.pages(api) == [1, 3, 2]
+
+    @pytest.mark.asyncio
+    async def test_limit_and_offset(self, api: FakeOpenAlex) -> None:
+        """Test only the pages within the limit and after the offset are fetched"""
+        results, _ = await Work._fetch_pages(self.URL, 15, per_page=10)
+        assert len(results) == 20
+        assert self.pages(api) == [1, 2]
+
+        api.urls.clear()
+        results, count = await Work._fetch_pages(self.URL, 25, per_page=10, offset=10)
+        assert count == 25
+        assert results[0]["id"] == "https://openalex.org/W12"
+        assert len(results) == 15
+        assert self.pages(api) == [2, 3]
+
+        assert await Work._fetch_pages(self.URL, 10, per_page=10, offset=10) == (
+            [],
+            None,
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("parallel", [True, False])
+    async def test_failed_page(self, api: FakeOpenAlex, parallel: bool) -> None:
+        """Test the pages before a failed page are returned"""
+        api.failing_pages.add(2)
+        results, count = await Work._fetch_pages(
+            self.URL, 100, per_page=10, parallel=parallel
+        )
+        assert count == 25
+        assert len(results) == 10
+
+        api.failing_pages.add(1)
+        assert await Work._fetch_pages(self.URL, 100, per_page=10) == ([], None)
+
+
+class TestClient:
+    """Test the shared OpenAlex HTTP client"""
+
+    @pytest.mark.asyncio
+    async def test_get_client_reuses_connection_pool(self) -> None:
+        """Test get_client() returns the same client until it is closed"""
+        client = await get_client()
+        assert await get_client() is client
+
+        await close_client()
+        assert client.is_closed
+        assert await get_client() is not client
+        await close_client()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_get_client(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test concurrent get_client() calls replace a closed client only once"""
+        await (await get_client()).aclose()
+
+        # Closing the stale client yields to the other callers
+        aclose = httpx.AsyncClient.aclose
+
+        async def slow_aclose(client: httpx.AsyncClient) -> None:
+            await asyncio.sleep(0)
+            await aclose(client)
+
+        monkeypatch.setattr(httpx.AsyncClient, "aclose", slow_aclose)
+        clients = await asyncio.gather(*(get_client() for _ in range(10)))
+        assert all(client is clients[0] for client in clients)
+        assert not clients[0].is_closed
+        await close_client()
+
+
+class TestRateLimiter:
+    """Test the shared OpenAlex rate limiter"""
+
+    @pytest.mark.asyncio
+    async def test_daily_quota(self, tmp_path) -> None:
+        """Test the limiter counts requests against the daily quota"""
+        limiter = RateLimiter(daily_quota=3, db_fp=tmp_path.joinpath("limiter.db"))
+        for _ in range(3):
+            async with limiter:
+                pass
+        assert await limiter.usage() == 3
+
+        with pytest.raises(QuotaExceeded):
+            await limiter.acquire()
+
+    @pytest.mark.asyncio
+    async def test_shared_bucket(self, tmp_path) -> None:
+        """Test limiters using the same database share one token bucket"""
+        db_fp = tmp_path.joinpath("limiter.db")
+        first = RateLimiter(max_rate=2, time_period=60, db_fp=db_fp)
+        second = RateLimiter(max_rate=2, time_period=60, db_fp=db_fp)
+
+        await first.acquire()
+        await second.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(first.acquire(), timeout=0.5)
+
+    @pytest.mark.asyncio
+    async def test_reuses_connection(self, tmp_path) -> None:
+        """Test concurrent waiters share one connection to the database"""
+        limiter = RateLimiter(max_rate=5, time_period=0.1, db_fp=tmp_path / "l.db")
+        await asyncio.gather(*(limiter.acquire() for _ in range(20)))
+
+        conn = limiter._conn
+        await limiter.acquire()
+        assert limiter._conn is conn
+        assert await limiter.usage() == 21
+
+        limiter.close()
+        assert limiter._conn is None
+
+
+class TestSingleFlight:
+    """Test request coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_do_coalesces_concurrent_calls(self) -> None:
+        """Test concurrent calls with the same key share one call"""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch() -> int:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(10)))
+        assert results == [1] * 10
+        assert len(flight) == 0
+
+        # A new call is made once the previous one has finished
+        assert await flight.do("key", fetch) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_work_gets(self, openalex: FakeOpenAlex) -> None:
+        """Test concurrent gets of the same work make a single request"""
+        openalex.add(make_work(1))
+
+        works = await asyncio.gather(Work("W1").get(), Work("W1").get())
+        assert [work.title for work in works] == ["Work 1", "Work 1"]
+        assert openalex.urls == ["https://api.openalex.org/works/W1"]
+
+
+class TestWorkCache:
+    """Test the in-process work cache"""
+
+    def test_lru_eviction(self) -> None:
+        """Test the least recently used work is evicted first"""
+        cache = WorkCache(maxsize=2)
+        for entity_id in ["W1000", "W2000"]:
+            cache.put(WorkObject(id=f"https://openalex.org/{entity_id}"))
+
+        assert cache.get("https://openalex.org/W1000") is not None
+        cache.put(WorkObject(id="https://openalex.org/W3000"))
+
+        assert "https://openalex.org/W1000" in cache
+        assert "https://openalex.org/W2000" not in cache
+        assert cache.stats()["hits"] == 1
+
+    def test_ttl_and_partial(self) -> None:
+        """Test expired and partial works are cache misses"""
+        cache = WorkCache(ttl=0)
+        cache.put(WorkObject(id="https://openalex.org/W1000"))
+        assert cache.get("https://openalex.org/W1000") is None
+
+        cache = WorkCache()
+        cache.put(WorkObject(id="https://openalex.org/W1000"), partial=["id", "doi"])
+        assert cache.get("https://openalex.org/W1000", select=["doi", "id"])
+        assert cache.get("https://openalex.org/W1000") is None
+        assert cache.stats()["misses"] == 1
+
+
+class TestLoadWork:
+    """Test loading works from stored documents"""
+
+    def test_trusted_work(self) -> None:
+        """Test tagged documents load without validation and dump the same JSON"""
+        work = WorkObject(
+            id="https://openalex.org/W1000",
+            doi="https://doi.org/10.1234/example",
+            publication_date="2020-01-01",
+            authorships=[{"author": {"id": "https://openalex.org/A1000"}}],
+        )
+        doc = {**work.model_dump(mode="json"), "_model_version": get_model_version()}
+
+        trusted = load_work(doc)
+        assert isinstance(trusted, WorkObject)
+        assert isinstance(trusted, trusted_model(WorkObject))
+        assert trusted.model_dump(mode="json") == work.model_dump(mode="json")
+        assert trusted.authorships[0].author.id == "https://openalex.org/A1000"
+
+    def test_stale_work(self) -> None:
+        """Test untagged or outdated documents are validated"""
+        doc = {"ids": {"openalex": "https://openalex.org/X1000"}, "_model_version": "1"}
+        with pytest.raises(ValidationError):
+            load_work(doc)
+
+
+class TestWorkTable:
+    """Test the columnar work table"""
+
+    @staticmethod
+    def make_table() -> WorkTable:
+        """Table of works W1 to W5 where W1 to W4 reference each other"""
+        docs = [
+            {
+                "id": f"https://openalex.org/W{i}",
+                "doi": f"https://doi.org/10.1234/{i}" if i % 2 else None,
+                "publication_year": 2000 + i,
+                "cited_by_count": [10, 30, 20, 30, 5][i - 1],
+                "referenced_works": [f"https://openalex.org/W{j}" for j in range(1, i)],
+            }
+            for i in range(1, 6)
+        ]
+        return WorkTable.from_documents(docs)
+
+    def test_interning(self) -> None:
+        """Test IDs are interned once and references are packed per row"""
+        table = self.make_table()
+        assert len(table) == 5
+        assert len(table.ids) == 5
+        assert table.references(2) == [
+            "https://openalex.org/W1",
+            "https://openalex.org/W2",
+        ]
+        assert table.reference_counts().tolist() == [0, 1, 2, 3, 4]
+        assert table.row("https://openalex.org/W3") == 2
+
+    def test_filter(self) -> None:
+        """Test filtering keeps the references of the selected rows"""
+        table = self.make_table().filter(min_year=2003, has_doi=True)
+        assert table.work_ids() == [
+            "https://openalex.org/W3",
+            "https://openalex.org/W5",
+        ]
+        assert table.references(0) == [
+            "https://openalex.org/W1",
+            "https://openalex.org/W2",
+        ]
+        assert len(table.references(1)) == 4
+
+    def test_top_k(self) -> None:
+        """Test the top k match a stable sort by citation count"""
+        table = self.make_table()
+        assert table.top_k(3).work_ids() == [
+            "https://openalex.org/W2",
+            "https://openalex.org/W4",
+            "https://openalex.org/W3",
+        ]
+        assert table.top_k(1).work_ids() == ["https://openalex.org/W2"]
+        assert table.top_k(10).work_ids() == table.sort_by().work_ids()
+        assert table.top_k(3).references(1) == table.references(3)
+
+
+class TestAbstract:
+    """Test the reconstruction of abstracts from inverted indexes"""
+
+    INDEX = {
+        "Despite": [0],
+        "the": [1, 4],
+        "growing": [2],
+        "interest": [3],
+        "field": [5],
+    }
+
+    def test_reconstruct_abstract(self) -> None:
+        """Test the words are placed at their positions"""
+        work = WorkObject(abstract_inverted_index=self.INDEX)
+        assert work.abstract_inverted_index.terms == self.INDEX
+        assert (
+            reconstruct_abstract(work.abstract_inverted_index)
+            == "Despite the growing interest the field"
+        )
+        assert reconstruct_abstract(None) == ""
+
+    def test_reconstruct_abstracts(self) -> None:
+        """Test a batch matches the abstracts reconstructed one by one"""
+        indexes = [self.INDEX, None, {"gap": [2], "after": [0]}, {}]
+        assert reconstruct_abstracts(indexes) == [
+            reconstruct_abstract(index) for index in indexes
+        ]
+        assert reconstruct_abstracts(indexes)[2] == "after gap"
+
+
+class TestResolveDOIs:
+    """Test the resolution of DOIs to work IDs"""
+
+    def test_normalize_doi(self) -> None:
+        """Test DOIs are normalized to lowercase DOI URLs"""
+        expected = "https://doi.org/10.1234/abc"
+        for doi in [
+            "10.1234/ABC",
+            "doi:10.1234/abc",
+            "https://doi.org/10.1234/abc",
+            "http://dx.doi.org/10.1234/abc",
+        ]:
+            assert normalize_doi(doi) == expected
+        assert normalize_doi("not a doi") is None
+
+    @pytest.mark.asyncio
+    async def test_resolve_stored_dois(self) -> None:
+        """Test DOIs of stored works resolve without API requests"""
+        store = LocalStore(":memory:")
+        await store.upsert_works(
+            [WorkObject(id="https://openalex.org/W1000", doi="https://doi.org/10.1/a")]
+        )
+
+        previous = buff.store._store
+        set_store(store)
+        try:
+            ids = await Work.resolve_dois(["10.1/A", "doi:10.1/a", "invalid"])
+        finally:
+            set_store(previous)
+        assert ids == {
+            "10.1/A": "https://openalex.org/W1000",
+            "doi:10.1/a": "https://openalex.org/W1000",
+        }
+
+
+class TestSearch:
+    """Test the cached OpenAlex search"""
+
+    def test_normalize(self) -> None:
+        """Test equivalent queries and filters normalize the same way"""
+        assert normalize_query("  Graph   Neural Networks ") == "graph neural networks"
+        assert (
+            normalize_filters({"is_oa": True, "concepts.id": ["C2", "C1"]})
+            == normalize_filters({"concepts.id": ("C1", "C2"), "is_oa": True})
+            == "concepts.id:C1|C2,is_oa:true"
+        )
+        assert normalize_filters({}) is None
+
+    @pytest.mark.asyncio
+    async def test_search_cache_ttl(self, tmp_path) -> None:
+        """Test cached pages are shared by cache objects until they expire"""
+        db_fp = tmp_path.joinpath("search.db")
+        key = SearchCache.make_key(search="graph", cursor="*")
+        await SearchCache(db_fp=db_fp).put(key, {"results": []})
+
+        assert await SearchCache(db_fp=db_fp).get(key) == {"results": []}
+        assert await SearchCache(db_fp=db_fp, ttl=0).get(key) is None
+        assert await SearchCache(db_fp=db_fp).get("missing") is None
+
+    @pytest.mark.asyncio
+    async def test_search_page_cached(self, tmp_path) -> None:
+        """Test a cached page is served without an API request"""
+        cache = SearchCache(db_fp=tmp_path.joinpath("search.db"))
+        key = cache.make_key(search="graph neural", **{"per-page": 25, "cursor": "*"})
+        await cache.put(
+            key,
+            {
+                "results": [{"id": "https://openalex.org/W1000", "title": "Graph"}],
+                "count": 40,
+                "next_cursor": "next",
+            },
+        )
+
+        previous = buff.openalex.search.search_cache
+        buff.openalex.search.search_cache = cache
+        try:
+            page = await search_page(" Graph  NEURAL")
+        finally:
+            buff.openalex.search.search_cache = previous
+        assert [str(work.id) for work in page.works] == ["https://openalex.org/W1000"]
+        assert (page.count, page.next_cursor) == (40, "next")
+        assert cache.stats()["hits"] == 1
+
+
+class TestCachedLinks:
+    """Test citation lists are served from the store when they hold enough works"""
+
+    @pytest.mark.asyncio
+    async def test_partial_list(self) -> None:
+        """Test a list fetched with a higher limit serves a lower limit"""
+        store = LocalStore(":memory:")
+        citing = [
+            WorkObject(id=f"https://openalex.org/W{2000 + i}", cited_by_count=10 - i)
+            for i in range(5)
+        ]
+        await store.upsert_works(citing)
+        await store.upsert_citations(
+            [
+                {
+                    "id": "https://openalex.org/W1000",
+                    "citations": [str(work.id) for work in citing],
+                    "limit": 5,
+                    "count": 40,
+                    "complete": False,
+                }
+            ]
+        )
+
+        previous = buff.store._store
+        set_store(store)
+        try:
+            ids, works = await Work("W1000").citations(limit=3)
+        finally:
+            set_store(previous)
+        assert ids == [
+            "https://openalex.org/W2000",
+            "https://openalex.org/W2001",
+            "https://openalex.org/W2002",
+        ]
+        assert set(works) == set(ids)
+
+    @pytest.mark.asyncio
+    async def test_stored_order(self, openalex: FakeOpenAlex) -> None:
+        """Test works selected without their citation count keep the stored order"""
+        store = buff.store.get_store()
+        citing = [f"https://openalex.org/W{2000 + i}" for i in (2, 0, 1)]
+        await store.upsert_works(
+            [WorkObject(id=work_id, title="Citing") for work_id in citing],
+            partial=["id", "title"],
+        )
+        await store.upsert_citations(
+            [{"id": "https://openalex.org/W1000", "citations": citing}]
+        )
+
+        ids, works = await Work("W1000").citations(limit=2, select=["title"])
+        assert ids == citing[:2]
+        assert set(works) == set(ids)
+        assert openalex.urls == []
+
+    @pytest.mark.asyncio
+    async def test_top_up(self, openalex: FakeOpenAlex) -> None:
+        """Test a list fetched with a lower limit is topped up from the next page"""
+        citing = [
+            make_work(
+                i, cited_by_count=1000 - i, referenced_works=["https://openalex.org/W1"]
+            )
+            for i in range(2, 252)
+        ]
+        openalex.add(make_work(1, cited_by_count=250), *citing)
+        store = buff.store.get_store()
+        await store.upsert_works([WorkObject(**work) for work in citing[:200]])
+        await store.upsert_citations(
+            [
+                {
+                    "id": "https://openalex.org/W1",
+                    "citations": [work["id"] for work in citing[:200]],
+                    "limit": 200,
+                    "count": 250,
+                    "complete": False,
+                }
+            ]
+        )
+
+        ids, works = await Work("W1").citations(limit=300)
+        assert ids == [work["id"] for work in citing]
+        assert set(works) == set(ids)
+        assert [url for url in openalex.urls if "cites:" in url] == [
+            "https://api.openalex.org/works?filter=cites:W1"
+            "&sort=cited_by_count:desc&page=2&per-page=200"
+        ]
+
+        doc = await store.get_citations("https://openalex.org/W1")
+        assert (doc["limit"], doc["count"], doc["complete"]) == (250, 250, True)
+
+    @pytest.mark.asyncio
+    async def test_save_all(self, openalex: FakeOpenAlex) -> None:
+        """Test every work fetched is returned and saved with save_all"""
+        citing = [
+            make_work(
+                i, cited_by_count=1000 - i, referenced_works=["https://openalex.org/W1"]
+            )
+            for i in range(2, 252)
+        ]
+        openalex.add(make_work(1, cited_by_count=250), *citing)
+
+        # Whole pages are fetched, so the second page goes beyond the limit
+        ids, works = await Work("W1").citations(limit=210, save_all=True)
+        assert ids == [work["id"] for work in citing]
+        assert set(works) == set(ids)
+        stored = await buff.store.get_store().get_works(ids)
+        assert len(stored) == 250
+
+    @pytest.mark.asyncio
+    async def test_partial_work_data(self, openalex: FakeOpenAlex) -> None:
+        """Test the citation count is fetched when the work data lacks it"""
+        openalex.add(
+            make_work(1, cited_by_count=2),
+            make_work(
+                2, cited_by_count=5, referenced_works=["https://openalex.org/W1"]
+            ),
+            make_work(
+                3, cited_by_count=3, referenced_works=["https://openalex.org/W1"]
+            ),
+        )
+        work = Work("W1")
+        await work.get(select=["title"])
+
+        ids, _ = await work.citations(select=["title"])
+        assert ids == ["https://openalex.org/W2", "https://openalex.org/W3"]
+
+    @pytest.mark.asyncio
+    async def test_uncited_work(self, openalex: FakeOpenAlex) -> None:
+        """Test the citations of an uncited work are not requested nor stored"""
+        openalex.add(make_work(1))
+
+        assert await Work("W1").citations() == ([], {})
+        assert not any("cites:" in url for url in openalex.urls)
+        assert (
+            await buff.store.get_store().get_citations("https://openalex.org/W1")
+            is None
+        )
+
+
+class TestRefresh:
+    """Test stored works are refreshed when they change in OpenAlex"""
+
+    @pytest.mark.asyncio
+    async def test_refresh_works(self, openalex: FakeOpenAlex) -> None:
+        """Test only changed works are fetched again, with their new citations"""
+        store = buff.store.get_store()
+        openalex.add(
+            make_work(1, cited_by_count=1),
+            make_work(2, referenced_works=["https://openalex.org/W1"]),
+        )
+        await Work.get_many(["W1", "W2"])
+        await store.upsert_citations(
+            [
+                {
+                    "id": "https://openalex.org/W1",
+                    "citations": ["https://openalex.org/W2"],
+                    "complete": True,
+                    "_fetched_at": "2024-01-01T00:00:00+00:00",
+                }
+            ]
+        )
+
+        openalex.add(
+            make_work(
+                1, title="New", cited_by_count=2, updated_date="2024-02-01T00:00:00"
+            ),
+            make_work(
+                3,
+                publication_date="2024-01-15",
+                referenced_works=["https://openalex.org/W1"],
+            ),
+        )
+        openalex.urls.clear()
+        result = await refresh_works(
+            ["https://openalex.org/W1", "https://openalex.org/W2"]
+        )
+        assert (result.checked, result.changed, result.citations) == (2, 1, 1)
+
+        # The update times are compared, then only the changed work is fetched
+        assert "select=id,updated_date" in openalex.urls[0]
+        assert "filter=openalex_id:W1&" in openalex.urls[1]
+        assert not any("from_updated_date" in url for url in openalex.urls)
+
+        assert (await store.get_work("https://openalex.org/W1"))["title"] == "New"
+        citations = await store.get_citations("https://openalex.org/W1")
+        assert citations["citations"] == [
+            "https://openalex.org/W2",
+            "https://openalex.org/W3",
+        ]
+        assert (citations["limit"], citations["count"]) == (2, 2)
+        assert citations["complete"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_partial_work(self, openalex: FakeOpenAlex) -> None:
+        """Test partial works are saved with the fields fetched to refresh them"""
+        store = buff.store.get_store()
+        openalex.add(make_work(1))
+        await Work("W1").get(select=["title"])
+
+        result = await refresh_works(["https://openalex.org/W1"], citations=False)
+        assert result.changed == 1
+        assert (await store.get_work("https://openalex.org/W1"))["_partial"] == [
+            "cited_by_count",
+            "id",
+            "title",
+            "updated_date",
+        ]
+
+        # The stored update time is compared on the next refresh
+        result = await refresh_works(["https://openalex.org/W1"], citations=False)
+        assert (result.checked, result.changed) == (1, 0)
@@ -0,0 +1,331 @@
+"""tests/test_store.py"""
+
+import asyncio
+import gzip
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+import buff.store
+from buff.openalex.bm25 import BM25Index
+from buff.openalex.cache import covers
+from buff.openalex.models import WorkObject
+from buff.openalex.refresh import find_stale_works
+from buff.openalex.snapshot import SnapshotFilter, ingest_snapshot
+from buff.store import set_store
+from buff.store.base import UpsertResult
+from buff.store.local import LocalStore
+from buff.store.schema import MIGRATIONS, SCHEMA_VERSION
+
+
+@pytest.fixture
+def store() -> LocalStore:
+    """Local store backed by an in-memory database"""
+    return LocalStore(":memory:")
+
+
+class TestLocalStore:
+    """Test the embedded SQLite works store"""
+
+    @pytest.mark.asyncio
+    async def test_upsert_works(self, store: LocalStore) -> None:
+        """Test works are saved and fetched by ID"""
+        works = [
+            WorkObject(id=f"https://openalex.org/W{i}000", cited_by_count=i)
+            for i in range(1, 4)
+        ]
+        await store.upsert_works(works)
+
+        work = await store.get_work("https://openalex.org/W2000")
+        assert work["cited_by_count"] == 2
+
+        docs = await store.get_works(
+            ["https://openalex.org/W1000", "https://openalex.org/W9000"]
+        )
+        assert [doc["id"] for doc in docs] == ["https://openalex.org/W1000"]
+
+    @pytest.mark.asyncio
+    async def test_upsert_works_in_batches(self, store: LocalStore) -> None:
+        """Test batched upserts report the works inserted and modified"""
+        works = [
+            WorkObject(id=f"https://openalex.org/W{i}000", cited_by_count=i)
+            for i in range(1, 6)
+        ]
+        result = await store.upsert_works(works, batch_size=2)
+        assert result == UpsertResult(inserted=5, modified=0)
+
+        works[0].cited_by_count = 100
+        result = await store.upsert_works(works, batch_size=2)
+        assert result == UpsertResult(inserted=0, modified=1)
+        assert len(await store.get_works([str(work.id) for work in works])) == 5
+
+    @pytest.mark.asyncio
+    async def test_upsert_partial_works(self, store: LocalStore) -> None:
+        """Test partial works are marked and upgraded by complete works"""
+        work_id = "https://openalex.org/W1000"
+
+        await store.upsert_works(
+            [WorkObject(id=work_id, title="Title")], partial=["id", "title"]
+        )
+        assert (await store.get_work(work_id))["_partial"] == ["id", "title"]
+
+        await store.upsert_works([WorkObject(id=work_id, title="Title", language="en")])
+        work = await store.get_work(work_id)
+        assert "_partial" not in work
+        assert work["language"] == "en"
+
+        # A partial update does not downgrade a complete work
+        await store.upsert_works(
+            [WorkObject(id=work_id, title="New Title")], partial=["id", "title"]
+        )
+        work = await store.get_work(work_id)
+        assert "_partial" not in work
+        assert work["title"] == "New Title"
+        assert work["language"] == "en"
+
+    @pytest.mark.asyncio
+    async def test_upsert_partial_works_merges_fields(self, store: LocalStore) -> None:
+        """Test successive partial updates merge their selected fields"""
+        work_id = "https://openalex.org/W1000"
+
+        await store.upsert_works(
+            [WorkObject(id=work_id, doi="https://doi.org/10.1/a")],
+            partial=["doi", "id"],
+        )
+        await store.upsert_works(
+            [WorkObject(id=work_id, title="Title", cited_by_count=3)],
+            partial=["cited_by_count", "id", "title"],
+        )
+
+        work = await store.get_work(work_id)
+        assert work["_partial"] == ["cited_by_count", "doi", "id", "title"]
+        assert work["doi"] == "https://doi.org/10.1/a"
+        assert work["title"] == "Title"
+        assert covers(work["_partial"], ["doi", "id", "title"])
+
+    @pytest.mark.asyncio
+    async def test_get_ids_by_doi(self, store: LocalStore) -> None:
+        """Test stored works are looked up by DOI"""
+        await store.upsert_works(
+            [
+                WorkObject(
+                    id="https://openalex.org/W1000", doi="https://doi.org/10.1234/abc"
+                )
+            ]
+        )
+        ids = await store.get_ids_by_doi(
+            ["https://doi.org/10.1234/abc", "https://doi.org/10.1234/xyz"]
+        )
+        assert ids == {"https://doi.org/10.1234/abc": "https://openalex.org/W1000"}
+
+    @pytest.mark.asyncio
+    async def test_iter_works(self, store: LocalStore) -> None:
+        """Test all the works are iterated in batches, projected on the fields"""
+        await store.upsert_works(
+            [
+                WorkObject(id=f"https://openalex.org/W{i}000", title="T")
+                for i in range(5)
+            ]
+        )
+        docs = [doc async for doc in store.iter_works(["title"], batch_size=2)]
+        assert len(docs) == 5
+        assert docs[0] == {"id": "https://openalex.org/W0000", "title": "T"}
+
+    @pytest.mark.asyncio
+    async def test_fetched_at(self, store: LocalStore) -> None:
+        """Test works are stamped when saved and found stale once too old"""
+        work_ids = ["https://openalex.org/W1000", "https://openalex.org/W2000"]
+        await store.upsert_works([WorkObject(id=work_id) for work_id in work_ids])
+        assert all(doc["_fetched_at"] for doc in await store.get_works(work_ids))
+
+        assert await find_stale_works(store=store) == []
+        stale = await find_stale_works(timedelta(0), store=store)
+        assert sorted(doc["id"] for doc in stale) == work_ids
+
+        await store.mark_fetched("works", work_ids[:1], "2020-01-01T00:00:00+00:00")
+        stale = await find_stale_works(store=store)
+        assert [doc["id"] for doc in stale] == work_ids[:1]
+
+    @pytest.mark.asyncio
+    async def test_upsert_citations(self, store: LocalStore) -> None:
+        """Test citation lists are saved and merged"""
+        work_id = "https://openalex.org/W1000"
+        await store.upsert_citations(
+            [{"id": work_id, "citations": ["https://openalex.org/W2000"]}]
+        )
+        assert (await store.get_citations(work_id))["citations"] == [
+            "https://openalex.org/W2000"
+        ]
+        assert await store.get_references(work_id) is None
+
+
+class TestBM25Index:
+    """Test the local BM25 index of the stored works"""
+
+    @pytest.mark.asyncio
+    async def test_build_and_search(self, store: LocalStore) -> None:
+        """Test works are ranked by BM25 and only changed works are re-indexed"""
+        await store.upsert_works(
+            [
+                WorkObject(
+                    id="https://openalex.org/W1000",
+                    title="Graph neural networks",
+                    abstract_inverted_index={"Message": [0], "passing": [1]},
+                    concepts=[{"display_name": "Deep learning"}],
+                ),
+                WorkObject(id="https://openalex.org/W2000", title="Neural networks"),
+                WorkObject(id="https://openalex.org/W3000", title="Medieval history"),
+            ]
+        )
+
+        index = BM25Index(":memory:")
+        assert await index.build(store, batch_size=2) == 3
+        assert len(index) == 3
+
+        results = await index.search("graph neural message passing")
+        assert [work_id for work_id, _ in results] == [
+            "https://openalex.org/W1000",
+            "https://openalex.org/W2000",
+        ]
+        assert [w for w, _ in await index.search("deep learning", k=5)] == [
+            "https://openalex.org/W1000"
+        ]
+        assert await index.search("the") == []
+
+        # Only the changed work is indexed again
+        assert await index.build(store) == 0
+        await store.upsert_works(
+            [
+                WorkObject(
+                    id="https://openalex.org/W3000",
+                    title="History of graph theory",
+                    updated_date="2024-01-01",
+                )
+            ]
+        )
+        assert await index.build(store) == 1
+        assert (await index.search("history"))[0][0] == "https://openalex.org/W3000"
+        assert (await index.search("medieval")) == []
+
+
+class TestSchema:
+    """Test the migrations of the openalex MongoDB database"""
+
+    def test_migration_versions(self) -> None:
+        """Test migrations are numbered in order without gaps"""
+        versions = [migration.version for migration in MIGRATIONS]
+        assert versions == list(range(1, len(MIGRATIONS) + 1))
+        assert SCHEMA_VERSION == versions[-1]
+
+    def test_unique_id_indexes(self) -> None:
+        """Test every collection gets a unique id index"""
+        indexes = MIGRATIONS[0].indexes
+        for collection in ("works", "citations", "references"):
+            assert indexes[collection][0].document["unique"]
+
+
+class TestSnapshotIngest:
+    """Test the ingest of OpenAlex snapshot partitions"""
+
+    @staticmethod
+    def write_partition(fp: Path, works: list[dict]) -> None:
+        """Write works as a gzipped JSON Lines partition"""
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(fp, "wt", encoding="utf-8") as f:
+            for work in works:
+                f.write(json.dumps(work) + "\n")
+
+    def test_ingest_snapshot(self, tmp_path: Path) -> None:
+        """Test works, references and citations are ingested once per partition"""
+        works_dir = tmp_path.joinpath("snapshot", "data", "works")
+        self.write_partition(
+            works_dir.joinpath("updated_date=2024-01-01", "part_000.gz"),
+            [
+                {"id": "https://openalex.org/W1000", "publication_year": 2020},
+                {
+                    "id": "https://openalex.org/W2000",
+                    "publication_year": 2021,
+                    "referenced_works": ["https://openalex.org/W1000"],
+                },
+            ],
+        )
+        self.write_partition(
+            works_dir.joinpath("updated_date=2024-01-02", "part_000.gz"),
+            [
+                {
+                    "id": "https://openalex.org/W3000",
+                    "publication_year": 2022,
+                    "referenced_works": ["https://openalex.org/W1000"],
+                },
+                {"id": "https://openalex.org/W4000", "publication_year": 1999},
+            ],
+        )
+
+        store = LocalStore(tmp_path.joinpath("openalex.db"))
+        previous = buff.store._store
+        set_store(store)
+        try:
+            progress_fp = tmp_path.joinpath("progress.json")
+            filter_ = SnapshotFilter.create(min_year=2000)
+            results = ingest_snapshot(
+                tmp_path.joinpath("snapshot"), filter_, 0, progress_fp=progress_fp
+            )
+            assert [r.works for r in results] == [2, 1]
+
+            # Ingested partitions are skipped when resuming
+            assert (
+                ingest_snapshot(
+                    tmp_path.joinpath("snapshot"), filter_, 0, progress_fp=progress_fp
+                )
+                == []
+            )
+        finally:
+            set_store(previous)
+
+        async def check() -> None:
+            assert await store.get_work("https://openalex.org/W4000") is None
+            citations = await store.get_citations("https://openalex.org/W1000")
+            assert citations["citations"] == [
+                "https://openalex.org/W2000",
+                "https://openalex.org/W3000",
+            ]
+            assert citations["complete"] is False
+            references = await store.get_references("https://openalex.org/W2000")
+            assert references["references"] == ["https://openalex.org/W1000"]
+
+        asyncio.run(check())
+
+    def test_ingest_snapshot_processes(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test concurrent workers add every citation of a work they all cite"""
+        works_dir = tmp_path.joinpath("snapshot", "data", "works")
+        for i in range(8):
+            self.write_partition(
+                works_dir.joinpath(f"updated_date=2024-01-0{i + 1}", "part_000.gz"),
+                [
+                    {
+                        "id": f"https://openalex.org/W{i}{j:03}",
+                        "referenced_works": ["https://openalex.org/W1"],
+                    }
+                    for j in range(100)
+                ],
+            )
+
+        # The spawned workers open the store from the environment
+        db_fp = tmp_path.joinpath("openalex.db")
+        monkeypatch.setenv("BUFF_STORE", "local")
+        monkeypatch.setenv("BUFF_STORE_PATH", str(db_fp))
+        results = ingest_snapshot(
+            tmp_path.joinpath("snapshot"),
+            processes=4,
+            batch_size=10,
+            progress_fp=tmp_path.joinpath("progress.json"),
+        )
+        assert sum(r.works for r in results) == 800
+
+        store = LocalStore(db_fp)
+        citations = asyncio.run(store.get_citations("https://openalex.org/W1"))
+        assert len(citations["citations"]) == 800